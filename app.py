@@ -1,11 +1,12 @@
-from flask import Flask, render_template, jsonify, request
-import subprocess
-import threading
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 import os
-import sys
 import logging
-import importlib.util
+import json
 import traceback
+from jobs import JobManager
+from nova_runtime import get_runtime
+from job_queue import JobQueue, JOB_QUEUE, register_queue_gauges
+import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -14,43 +15,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Run pre-start checks
+# Run pre-start checks. They import nothing and are cached until the
+# installed packages change, so worker boot stays fast.
 try:
-    # Check if pre_start module exists and run checks
-    if importlib.util.find_spec("pre_start") is not None:
-        import pre_start
-        pre_start.run_checks()
-    else:
-        logger.warning("pre_start module not found, skipping pre-start checks")
-        
-    # Check for werkzeug.urls.url_quote (the specific import that fails in the error log)
-    try:
-        from werkzeug.urls import url_quote
-        logger.info("Successfully imported url_quote from werkzeug.urls")
-    except ImportError as e:
-        logger.error(f"ImportError: {e}")
-        logger.error("This is likely causing the deployment error on Render")
-        logger.error("Please ensure werkzeug==2.0.3 is installed")
-        
-        # Try to fix the issue by installing the correct version
-        if os.environ.get('RENDER'):
-            logger.info("Attempting to fix werkzeug version...")
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", "werkzeug==2.0.3"], 
-                              check=True, capture_output=True)
-                logger.info("Successfully installed werkzeug==2.0.3")
-                
-                # Try importing again
-                try:
-                    from werkzeug.urls import url_quote
-                    logger.info("Successfully imported url_quote after fixing werkzeug version")
-                except ImportError as e:
-                    logger.error(f"Still cannot import url_quote after fixing werkzeug version: {e}")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install werkzeug==2.0.3: {e.stderr}")
-            except Exception as e:
-                logger.error(f"Unexpected error while fixing werkzeug version: {e}")
-                
+    import pre_start
+    pre_start.run_checks()
 except Exception as e:
     logger.error(f"Error during pre-start checks: {e}")
     logger.error(traceback.format_exc())
@@ -64,22 +33,28 @@ app.config['PRODUCTION'] = os.environ.get('RENDER', False)
 # Disable debug mode in production
 app.config['DEBUG'] = not app.config['PRODUCTION']
 
-def run_nova():
-    try:
-        logger.info("Starting Nova AI assistant...")
-        # Use absolute path for better reliability in production
-        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
-        result = subprocess.run([sys.executable, script_path], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.error(f"Nova process failed with error: {result.stderr}")
-            return False
-        
-        logger.info("Nova AI assistant started successfully")
-        return True
-    except Exception as e:
-        logger.exception(f"Error running Nova: {e}")
-        return False
+# Nova sessions run on a bounded worker pool and are tracked by job ID. With
+# the job queue on, all workers share one queue that job_runner.py processes
+# drain, so the session limit holds for the whole host.
+if JOB_QUEUE:
+    job_manager = JobQueue()
+    register_queue_gauges(metrics.registry, job_manager)
+else:
+    # Sessions fork from a runtime that has main.py imported already. It is
+    # started by the first session, not here, so importing the app (every
+    # gunicorn worker, tests, tools) never loads main.py's dependencies.
+    job_manager = JobManager(runtime=get_runtime())
+metrics.registry.register_gauge(
+    "nova_jobs",
+    lambda: [({"state": state}, count) for state, count in job_manager.counts().items()],
+    "Nova sessions tracked by the web app, by current state",
+)
+
+# Seconds between keep-alive comments on idle event streams
+SSE_KEEPALIVE = 15
+
+def sse_message(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
 
 @app.route("/")
 def index():
@@ -89,19 +64,79 @@ def index():
 def start():
     try:
         logger.info("Received request to start Nova")
-        # Use a daemon thread to ensure it doesn't block app shutdown
-        thread = threading.Thread(target=run_nova, daemon=True)
-        thread.start()
-        logger.info("Nova thread started")
-        return jsonify({"message": "Nova started successfully!", "status": "success"})
+        # Repeated clicks with the same key return the job that is already running
+        payload = request.get_json(silent=True) or {}
+        idempotency_key = request.headers.get("Idempotency-Key") or payload.get("idempotency_key")
+        job, created = job_manager.submit(idempotency_key)
+        if created:
+            logger.info(f"Nova job {job.id} queued")
+            message = "Nova started successfully!"
+        else:
+            logger.info(f"Duplicate start request, returning job {job.id}")
+            message = "Nova is already running."
+        return jsonify({
+            "message": message,
+            "status": "success",
+            "job_id": job.id,
+            "duplicate": not created,
+            "job": job.to_dict(),
+        }), 202 if created else 200
     except Exception as e:
         logger.exception(f"Failed to start Nova: {e}")
         return jsonify({"message": f"Failed to start Nova: {str(e)}", "status": "error"}), 500
 
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"message": "Job not found", "status": "error"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"message": "Job not found", "status": "error"}), 404
+
+    def generate():
+        # Subscribe before the snapshot so no event falls between the two
+        subscription = job.subscribe()
+        try:
+            yield sse_message("snapshot", job.to_dict())
+            if job.finished:
+                yield sse_message("end", job.to_dict())
+                return
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_message(event["type"], event)
+                if event["type"] == "end":
+                    return
+        finally:
+            job.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
 # Add a health check endpoint for monitoring
 @app.route("/health")
 def health_check():
-    return jsonify({"status": "healthy"})
+    if not JOB_QUEUE:
+        return jsonify({"status": "healthy"})
+    # Without a live runner, queued sessions would never start
+    runners = job_manager.runners()
+    if not runners:
+        return jsonify({"status": "unhealthy", "error": "No Nova job runner is alive", "runners": 0}), 503
+    return jsonify({"status": "healthy", "runners": len(runners)})
 
 if __name__ == "__main__":
     # Use environment variables for host and port if available
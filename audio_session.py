@@ -0,0 +1,167 @@
+# audio_session.py
+
+import os
+import time
+import atexit
+import audioop
+import threading
+from collections import deque
+import speech_recognition as sr
+from speech_output import get_speech_output
+from stt_backends import get_recognizer
+
+RECALIBRATE_INTERVAL = float(os.environ.get('NOVA_RECALIBRATE_INTERVAL', 60))
+
+
+class AudioSession:
+    """One microphone stream and recognizer shared by every listen path.
+
+    The device is opened and calibrated once. Afterwards the energy
+    threshold tracks the room through the recognizer's dynamic threshold
+    and a background recalibration that only runs while nobody is listening.
+    """
+
+    def __init__(self, recalibrate_interval=RECALIBRATE_INTERVAL):
+        self.recognizer = sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True
+        self.recalibrate_interval = recalibrate_interval
+        self._lock = threading.Lock()
+        self._microphone = None
+        self._source = None
+        self._last_used = 0.0
+        self._closed = threading.Event()
+        self._thread = None
+
+    def open(self):
+        with self._lock:
+            if self._source is not None:
+                return self
+            microphone = sr.Microphone()
+            self._source = microphone.__enter__()
+            self._microphone = microphone
+            self.recognizer.adjust_for_ambient_noise(self._source, duration=1)
+            self._last_used = time.monotonic()
+        if self._thread is None and self.recalibrate_interval > 0:
+            self._thread = threading.Thread(target=self._recalibrate_loop, name="audio-recalibrate", daemon=True)
+            self._thread.start()
+        return self
+
+    def open_in_background(self):
+        # Calibrate while Nova is still speaking its first prompt
+        def run():
+            try:
+                self.open()
+            except Exception as e:
+                print(f"Note: Could not open microphone: {e}")
+        threading.Thread(target=run, name="audio-open", daemon=True).start()
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            if self._microphone is not None:
+                try:
+                    self._microphone.__exit__(None, None, None)
+                except Exception as e:
+                    print(f"Note: Error closing microphone: {e}")
+            self._microphone = None
+            self._source = None
+
+    def listen(self, timeout=None, phrase_time_limit=None):
+        # Speech plays in the background; don't record Nova's own voice
+        get_speech_output().wait_idle()
+        self.open()
+        with self._lock:
+            try:
+                return self.recognizer.listen(self._source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            finally:
+                self._last_used = time.monotonic()
+
+    def recognize(self, audio, language='en-US'):
+        return self.recognizer.recognize_google(audio, language=language)
+
+    @property
+    def sample_rate(self):
+        return self._source.SAMPLE_RATE if self._source is not None else None
+
+    @property
+    def sample_width(self):
+        return self._source.SAMPLE_WIDTH if self._source is not None else None
+
+    def stream(self, timeout=None, phrase_time_limit=None):
+        """Yield raw 16-bit mono chunks of one phrase as they are captured.
+
+        Uses the same energy threshold and pause rules as `listen`, but hands
+        audio over while the user is still talking. Raises sr.WaitTimeoutError
+        if no speech starts within `timeout`.
+        """
+        get_speech_output().wait_idle()
+        self.open()
+        with self._lock:
+            try:
+                yield from self._capture(timeout, phrase_time_limit)
+            finally:
+                self._last_used = time.monotonic()
+
+    def _capture(self, timeout, phrase_time_limit):
+        source, recognizer = self._source, self.recognizer
+        seconds_per_chunk = source.CHUNK / float(source.SAMPLE_RATE)
+        # Keep a little audio from before the onset so the first word isn't clipped
+        preroll = deque(maxlen=max(1, int(recognizer.non_speaking_duration / seconds_per_chunk)))
+        waited = 0.0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if audioop.rms(chunk, source.SAMPLE_WIDTH) > recognizer.energy_threshold:
+                break
+            preroll.append(chunk)
+            waited += seconds_per_chunk
+            if timeout and waited > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+        for buffered in preroll:
+            yield buffered
+        yield chunk
+        spoken, silence = seconds_per_chunk, 0.0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            yield chunk
+            spoken += seconds_per_chunk
+            if audioop.rms(chunk, source.SAMPLE_WIDTH) > recognizer.energy_threshold:
+                silence = 0.0
+            else:
+                silence += seconds_per_chunk
+            if silence > recognizer.pause_threshold:
+                return
+            if phrase_time_limit and spoken > phrase_time_limit:
+                return
+
+    def transcribe(self, timeout=None, phrase_time_limit=None, language='en-US'):
+        """Listen for one phrase and return its text with the configured STT backend."""
+        def show_partial(text):
+            print(f"🗣️ ... {text}")
+        return get_recognizer().transcribe(self, timeout, phrase_time_limit, language, on_partial=show_partial)
+
+    def _recalibrate_loop(self):
+        while not self._closed.wait(self.recalibrate_interval):
+            # Skip the round if a listen is in progress or just finished
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._source is not None and time.monotonic() - self._last_used >= self.recalibrate_interval:
+                    self.recognizer.adjust_for_ambient_noise(self._source, duration=0.3)
+            except Exception as e:
+                print(f"Note: Background recalibration failed: {e}")
+            finally:
+                self._lock.release()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_audio_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = AudioSession()
+            atexit.register(_session.close)
+        return _session
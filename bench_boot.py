@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Worker boot benchmark for the pre-start checks
+
+Starts fresh interpreters that import app.py the way a gunicorn worker
+does and answer one /health request through Flask's test client, and
+reports how long that takes and what -X importtime says was imported.
+
+Three boots are compared: the previous checks, which imported every
+critical module to see whether it was there; a first boot, where the
+checks look modules up without importing them and write the fingerprint
+file; and a cached boot, which only compares the fingerprint.
+
+Usage:
+    python bench_boot.py
+    python bench_boot.py -n 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from pre_start import CRITICAL_MODULES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BOOT = """
+{preload}
+import app
+assert app.app.test_client().get("/health").status_code == 200
+"""
+
+# What the checks used to import on every worker boot
+LEGACY_PRELOAD = "\n".join(f"import {name}" for name, _ in CRITICAL_MODULES) + "\nfrom werkzeug.urls import url_quote"
+
+
+def parse_importtime(stderr):
+    """(total seconds, module names, {top-level package: cumulative seconds})"""
+    total, modules, packages = 0, set(), {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules.add(name.strip())
+        # Nested imports are indented under the module that imported them
+        if not name[1:].startswith(" "):
+            packages[name.strip()] = int(cumulative_us) / 1e6
+    return total / 1e6, modules, packages
+
+
+def boot(preload, cache_path):
+    env = dict(os.environ, NOVA_PRESTART_CACHE=cache_path)
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT.format(preload=preload)],
+        cwd=HERE, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.monotonic() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Boot failed:\n{result.stderr[-2000:]}")
+    total, modules, packages = parse_importtime(result.stderr)
+    return {"health": elapsed, "import": total, "modules": len(modules), "names": modules, "packages": packages}
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def run_report(iterations=5):
+    rows = {}
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "pre_start.json")
+
+        def first_boot():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            return boot("", cache_path)
+
+        configurations = (
+            ("previous checks", lambda: boot(LEGACY_PRELOAD, os.path.join(directory, "unused.json"))),
+            ("first boot", first_boot),
+            ("cached boot", lambda: boot("", cache_path)),
+        )
+        runs = {name: [] for name, _ in configurations}
+        # Interleaved, so drift in machine load hits every configuration alike
+        for _ in range(iterations):
+            for name, run in configurations:
+                runs[name].append(run())
+        for name, results in runs.items():
+            rows[name] = {key: _median([r[key] for r in results]) for key in ("health", "import", "modules")}
+            rows[name]["names"] = results[-1]["names"]
+            rows[name]["packages"] = results[-1]["packages"]
+    return rows
+
+
+def print_report(rows):
+    print("\n📊 Worker boot to first /health response (median)\n")
+    print(f"{'boot':<16} {'to /health ms':>14} {'imports ms':>11} {'modules':>8}")
+    for name, row in rows.items():
+        print(f"{name:<16} {row['health'] * 1000:>14.0f} {row['import'] * 1000:>11.0f} {row['modules']:>8}")
+    before, after = rows["previous checks"], rows["cached boot"]
+    print(f"\nCached checks: boot to /health {1 - after['health'] / before['health']:.0%} faster, "
+          f"{before['modules'] - after['modules']} fewer modules imported")
+    heavy = sorted(before["packages"].items(), key=lambda item: -item[1])[:8]
+    print("\nSlowest top-level imports before (cumulative ms, from -X importtime):")
+    for package, seconds in heavy:
+        marker = "" if package in after["names"] else "  (no longer imported)"
+        print(f"  {package:<28} {seconds * 1000:>7.0f}{marker}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="boots per configuration (median reported)")
+    args = parser.parse_args(argv)
+    print_report(run_report(args.iterations))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Matcher benchmark on recorded transcripts
+
+Scores the fuzzy matcher used for ride names and commands against the
+substring checks it replaced, on recognizer transcripts with the answer the
+user meant (recordings/transcripts.json). A transcript is either matched
+correctly, re-prompted (another TTS and STT round trip), or mismatched: a
+wrong ride or command picked, or something picked when nothing was meant.
+
+Usage:
+    python bench_matcher.py
+    python bench_matcher.py --thresholds 0.5,0.6,0.7,0.8   # calibrate NOVA_MATCH_THRESHOLD
+"""
+
+import os
+import sys
+import json
+import argparse
+from options import ride_matcher
+from main import COMMANDS
+from fuzzy_match import FuzzyMatcher, MATCH_THRESHOLD
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "recordings", "transcripts.json")
+
+
+def load_corpus(path=CORPUS):
+    with open(path) as f:
+        return json.load(f)
+
+
+# === The checks the matcher replaced ===
+def substring_ride(names, transcript):
+    for name in names:
+        key = name.lower()
+        if key in transcript or transcript in key:
+            return name
+    return None
+
+
+def substring_command(transcript):
+    if "introduce" in transcript or "who are you" in transcript:
+        return "introduce"
+    if "sleep" in transcript:
+        return "sleep"
+    if "exit" in transcript or "quit" in transcript:
+        return "exit"
+    if "book a cab" in transcript or "open uber" in transcript:
+        return "book"
+    return None
+
+
+def fuzzy_ride(threshold):
+    matchers = {}
+
+    def pick(names, transcript):
+        key = tuple(names)
+        if key not in matchers:
+            matchers[key] = ride_matcher(names)
+            matchers[key].threshold = threshold
+        index = matchers[key].match(transcript)
+        return None if index is None else names[index]
+    return pick
+
+
+def fuzzy_command(threshold):
+    matcher = FuzzyMatcher(COMMANDS, threshold=threshold)
+    return matcher.match
+
+
+# === Scoring ===
+def evaluate(corpus, pick_ride, pick_command):
+    """Counts correct, reprompt and mismatch per kind of answer."""
+    cases = [("rides", case, lambda case: pick_ride(corpus["ride_sets"][case["set"]], case["transcript"]))
+             for case in corpus["rides"]]
+    cases += [("commands", case, lambda case: pick_command(case["transcript"])) for case in corpus["commands"]]
+
+    results, failures = {}, []
+    for kind, case, pick in cases:
+        counts = results.setdefault(kind, {"total": 0, "correct": 0, "reprompt": 0, "mismatch": 0})
+        picked = pick(case)
+        counts["total"] += 1
+        if picked == case["expected"]:
+            counts["correct"] += 1
+            continue
+        counts["reprompt" if picked is None else "mismatch"] += 1
+        failures.append((kind, case["transcript"], case["expected"], picked))
+
+    total = {key: sum(counts[key] for counts in results.values()) for key in ("total", "correct", "reprompt", "mismatch")}
+    results["total"] = total
+    for counts in results.values():
+        counts["mismatch_rate"] = counts["mismatch"] / float(counts["total"])
+        counts["error_rate"] = (counts["mismatch"] + counts["reprompt"]) / float(counts["total"])
+    return results, failures
+
+
+def run_benchmark(corpus=None, threshold=MATCH_THRESHOLD):
+    corpus = corpus or load_corpus()
+    baseline, _ = evaluate(corpus, substring_ride, substring_command)
+    fuzzy, failures = evaluate(corpus, fuzzy_ride(threshold), fuzzy_command(threshold))
+    return {"threshold": threshold, "substring": baseline, "fuzzy": fuzzy, "failures": failures}
+
+
+def print_report(result):
+    print(f"\n📊 Matcher benchmark (threshold {result['threshold']:.2f})\n")
+    print(f"{'matcher':<10} {'kind':<9} {'total':>6} {'correct':>8} {'reprompt':>9} {'mismatch':>9} {'error rate':>11}")
+    for name in ("substring", "fuzzy"):
+        for kind, counts in result[name].items():
+            print(f"{name:<10} {kind:<9} {counts['total']:>6} {counts['correct']:>8} {counts['reprompt']:>9} "
+                  f"{counts['mismatch']:>9} {counts['error_rate']:>10.1%}")
+    if result["failures"]:
+        print("\nFuzzy matcher misses:")
+        for kind, transcript, expected, picked in result["failures"]:
+            print(f"  {kind:<9} {transcript!r:<28} expected {expected!r}, got {picked!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS, help="transcript corpus (JSON)")
+    parser.add_argument("--thresholds", help="comma-separated thresholds to compare")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if args.thresholds:
+        print(f"{'threshold':>9} {'reprompt':>9} {'mismatch':>9} {'error rate':>11}")
+        for threshold in (float(value) for value in args.thresholds.split(",")):
+            total = run_benchmark(corpus, threshold)["fuzzy"]["total"]
+            print(f"{threshold:>9.2f} {total['reprompt']:>9} {total['mismatch']:>9} {total['error_rate']:>10.1%}")
+        return 0
+    print_report(run_benchmark(corpus))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""
+Page load benchmark for the resource policy
+
+Serves a recorded Uber home page (recordings/pages/uber_home.json: every
+request with its recorded transfer size) from a local HTTP stand-in with
+per-request latency and limited bandwidth, and loads it with and without
+the resource policy and with the normal and eager page-load strategies.
+Third-party requests are served from /<host>/<path> so the policy's URL
+patterns see the original host name.
+
+For each configuration it reports requests and bytes the server sent,
+time to interactive (DOM parsed, render-blocking CSS and scripts done),
+time to the load event, and how long driver.get() blocks.
+
+By default the page is loaded by a small fetcher that follows the same
+rules as the browser: render-blocking resources first, the rest after,
+six connections at a time, blocked URLs never requested. --browser loads
+it in headless Chrome instead and reads the timings from the page.
+
+Usage:
+    python bench_page_load.py
+    python bench_page_load.py --browser -n 5
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from resource_policy import blocked_url_patterns, url_blocked, apply_resource_policy, DEFAULT_CATEGORIES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RECORDING = os.path.join(HERE, "recordings", "pages", "uber_home.json")
+CONNECTIONS = 6
+CONTENT_TYPES = {
+    "document": "text/html", "stylesheet": "text/css", "script": "application/javascript",
+    "font": "font/woff2", "image": "image/png", "xhr": "application/json",
+}
+
+
+def load_page(path=RECORDING):
+    with open(path) as f:
+        return json.load(f)
+
+
+# === Local HTTP Stand-in ===
+def render_document(page):
+    """HTML that requests every recorded resource the way the real page does."""
+    head, body = [], []
+    for resource in page["resources"]:
+        path, kind = resource["path"], resource["type"]
+        if kind == "stylesheet":
+            head.append(f'<link rel="stylesheet" href="{path}">')
+        elif kind == "script":
+            head.append(f'<script src="{path}" {resource.get("attrs", "")}></script>')
+        elif kind == "image":
+            body.append(f'<img src="{path}" width="40" height="40">')
+        elif kind == "xhr":
+            body.append(f'<script>window.addEventListener("load", function () {{ fetch("{path}"); }});</script>')
+    html = ("<!doctype html><html><head><title>Uber</title>" + "".join(head) + "</head><body>"
+            "<button>Where to?</button>" + "".join(body) + "</body></html>")
+    return html.encode("utf-8")
+
+
+def render_resource(page, resource):
+    if resource["type"] == "stylesheet":
+        # Fonts are only requested once a stylesheet uses them
+        faces = "".join(
+            f'@font-face{{font-family:f{index};src:url("{font["path"]}")}}body{{font-family:f{index}}}'
+            for index, font in enumerate(r for r in page["resources"] if r["type"] == "font")
+        )
+        return faces.encode("utf-8")
+    return b""
+
+
+def _padded(data, size, kind):
+    # Recorded transfer size, padded with a comment so the content stays valid
+    if len(data) >= size:
+        return data
+    fill = size - len(data)
+    if kind == "document":
+        return data + b"<!--" + b"x" * max(0, fill - 7) + b"-->"
+    if kind in ("stylesheet", "script"):
+        return data + b"/*" + b"x" * max(0, fill - 4) + b"*/"
+    return data + b"\0" * fill
+
+
+class PageServer:
+    """Serves one recorded page; counts the requests and bytes it sends."""
+
+    def __init__(self, page, latency=None, kb_per_second=None):
+        self.page = page
+        # Per request: a round trip plus the body at the connection's throughput
+        self.latency = page.get("latency_ms", 40) / 1000.0 if latency is None else latency
+        self.bytes_per_second = (kb_per_second or page.get("kb_per_second", 500)) * 1024.0
+        self._bodies = {page["document"]["path"]: ("document", _padded(render_document(page), page["document"]["size"], "document"))}
+        for resource in page["resources"]:
+            data = _padded(render_resource(page, resource), resource["size"], resource["type"])
+            self._bodies[resource["path"]] = (resource["type"], data)
+        self._lock = threading.Lock()
+        self.reset()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="page-server", daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.paths = []
+
+    def _serve(self, handler):
+        kind, body = self._bodies.get(handler.path, (None, None))
+        if body is None:
+            handler.send_error(404)
+            return
+        time.sleep(self.latency + len(body) / self.bytes_per_second)
+        handler.send_response(200)
+        handler.send_header("Content-Type", CONTENT_TYPES.get(kind, "application/octet-stream"))
+        handler.send_header("Content-Length", str(len(body)))
+        handler.send_header("Cache-Control", "no-store")
+        handler.end_headers()
+        handler.wfile.write(body)
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(body)
+            self.paths.append(handler.path)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# === Loaders ===
+def _fetch_all(urls):
+    """Fetch URLs over CONNECTIONS parallel connections; returns when all are done."""
+    pending = queue.Queue()
+    for url in urls:
+        pending.put(url)
+
+    def worker():
+        while True:
+            try:
+                url = pending.get_nowait()
+            except queue.Empty:
+                return
+            with urllib.request.urlopen(url) as response:
+                response.read()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(CONNECTIONS, len(urls)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def fetch_load(server, patterns, strategy):
+    """Load the page like the browser would; returns timings in seconds."""
+    base, page = server.base_url, server.page
+    started = time.monotonic()
+    _fetch_all([base + page["document"]["path"]])
+
+    def allowed(resources):
+        return [base + r["path"] for r in resources if not url_blocked(base + r["path"], patterns)]
+
+    resources = page["resources"]
+    blocking = [r for r in resources if r["type"] == "stylesheet" or (r["type"] == "script" and not r.get("attrs"))]
+    _fetch_all(allowed(blocking))
+    interactive = time.monotonic() - started
+    _fetch_all(allowed([r for r in resources if r not in blocking and r["type"] != "xhr"]))
+    loaded = time.monotonic() - started
+    # Requests the page makes after the load event
+    _fetch_all(allowed([r for r in resources if r["type"] == "xhr"]))
+    return {"interactive": interactive, "load": loaded, "get": interactive if strategy == "eager" else loaded}
+
+
+def browser_load(server, patterns, strategy):
+    """Load the page in headless Chrome; returns timings in seconds."""
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.page_load_strategy = strategy
+    driver = webdriver.Chrome(options=options)
+    try:
+        apply_resource_policy(driver, patterns)
+        started = time.monotonic()
+        driver.get(server.base_url + server.page["document"]["path"])
+        returned = time.monotonic() - started
+        # Let the rest of the page finish so every byte is counted
+        deadline = time.monotonic() + 30
+        while driver.execute_script("return document.readyState") != "complete" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        timing = driver.execute_script(
+            "var t = performance.timing; return [t.domInteractive - t.navigationStart, t.loadEventEnd - t.navigationStart];"
+        )
+        time.sleep(server.latency * 2)  # requests made after the load event
+        return {"interactive": timing[0] / 1000.0, "load": timing[1] / 1000.0, "get": returned}
+    finally:
+        driver.quit()
+
+
+# === Report ===
+CONFIGURATIONS = (
+    ("no policy, normal", False, "normal"),
+    ("no policy, eager", False, "eager"),
+    ("policy, normal", True, "normal"),
+    ("policy, eager", True, "eager"),
+)
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def run_report(iterations=3, browser=False, categories=DEFAULT_CATEGORIES, latency=None, kb_per_second=None, path=RECORDING):
+    page = load_page(path)
+    patterns = blocked_url_patterns(categories, extra="")
+    load = browser_load if browser else fetch_load
+    results = {}
+    with PageServer(page, latency, kb_per_second) as server:
+        for name, use_policy, strategy in CONFIGURATIONS:
+            runs = []
+            for _ in range(iterations):
+                server.reset()
+                timings = load(server, patterns if use_policy else [], strategy)
+                timings.update(requests=server.requests, bytes=server.bytes_sent, paths=list(server.paths))
+                runs.append(timings)
+            results[name] = {key: _median([run[key] for run in runs]) for key in ("interactive", "load", "get", "requests", "bytes")}
+            results[name]["paths"] = runs[-1]["paths"]
+    return {"mode": "browser" if browser else "fetch", "categories": categories, "configurations": results}
+
+
+def print_report(report):
+    print(f"\n📊 Page load ({report['mode']} mode, blocking {report['categories']})\n")
+    print(f"{'configuration':<20} {'requests':>8} {'KB':>8} {'interactive ms':>15} {'load ms':>8} {'get() ms':>9}")
+    for name, row in report["configurations"].items():
+        print(f"{name:<20} {row['requests']:>8} {row['bytes'] / 1024:>8.0f} {row['interactive'] * 1000:>15.0f} "
+              f"{row['load'] * 1000:>8.0f} {row['get'] * 1000:>9.0f}")
+    before, after = report["configurations"]["no policy, normal"], report["configurations"]["policy, eager"]
+    print(f"\nPolicy and eager loading: {1 - after['bytes'] / float(before['bytes']):.0%} fewer bytes, "
+          f"driver.get() {1 - after['get'] / before['get']:.0%} faster")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=3, help="loads per configuration (median reported)")
+    parser.add_argument("--browser", action="store_true", help="load the page in headless Chrome")
+    parser.add_argument("--block", default=DEFAULT_CATEGORIES, help="resource categories to block")
+    parser.add_argument("--recording", default=RECORDING, help="recorded page (JSON)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_report(args.iterations, args.browser, args.block, path=args.recording)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
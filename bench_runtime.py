@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Session start benchmark for the preforked Nova runtime
+
+Starts sessions the previous way, as a new `python main.py` interpreter
+each, and by forking them from a runtime that has main.py imported, and
+reports for each:
+
+- session start latency: from the request to the session having main.py
+  and its libraries imported and ready to run (median over the sessions)
+- memory with N sessions alive at once, from /proc/<pid>/smaps_rollup:
+  RSS and private (USS) memory per session, and the total proportional
+  set size (PSS) of all of them, which counts shared pages once. For the
+  runtime the runtime process itself is included in the total.
+
+The sessions only import main.py and wait; no browser is launched.
+
+Usage:
+    python bench_runtime.py
+    python bench_runtime.py -n 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+import tempfile
+import subprocess
+from nova_runtime import NovaRuntime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+READY = "session ready"
+
+
+def idle_session():
+    """Stand-in session: everything main.py imports, then wait to be killed."""
+    # The import is the work being measured; a forked session finds main.py
+    # already imported. import_module binds no name, so nothing looks unused
+    # and this module's own main() is not shadowed.
+    importlib.import_module("main")
+    print(READY, flush=True)
+    time.sleep(3600)
+
+
+def memory(pid):
+    """{"rss", "pss", "uss"} in bytes, or None where smaps_rollup is not available."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {line.split(":")[0]: int(line.split()[1]) * 1024 for line in f if line.endswith("kB\n")}
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _wait_ready(lines):
+    for line in lines:
+        if line.strip() == READY:
+            return
+    raise RuntimeError("Session exited before it was ready")
+
+
+def start_subprocess():
+    process = subprocess.Popen(
+        [sys.executable, "-u", "-c", "from bench_runtime import idle_session; idle_session()"],
+        cwd=HERE, stdout=subprocess.PIPE, text=True,
+    )
+    _wait_ready(process.stdout)
+    return process
+
+
+def measure(start, sessions, extra_pids=()):
+    processes, latencies = [], []
+    try:
+        for _ in range(sessions):
+            began = time.monotonic()
+            processes.append(start())
+            latencies.append(time.monotonic() - began)
+        samples = [memory(process.pid) for process in processes]
+        extra = [memory(pid) for pid in extra_pids]
+    finally:
+        for process in processes:
+            process.kill()
+            process.wait()
+    latencies.sort()
+    row = {"start_ms": latencies[len(latencies) // 2] * 1000, "sessions": sessions}
+    if all(samples) and all(extra):
+        row["rss_mb"] = sum(s["rss"] for s in samples) / len(samples) / 2 ** 20
+        row["uss_mb"] = sum(s["uss"] for s in samples) / len(samples) / 2 ** 20
+        row["total_pss_mb"] = sum(s["pss"] for s in samples + extra) / 2 ** 20
+    return row
+
+
+def run_report(sessions=4):
+    rows = {"subprocess": measure(start_subprocess, sessions)}
+    with tempfile.TemporaryDirectory() as directory:
+        runtime = NovaRuntime(os.path.join(directory, "runtime.sock"), entry="bench_runtime:idle_session",
+                              modules=("main", "bench_runtime"))
+        began = time.monotonic()
+        runtime.start()
+        runtime._connect().close()
+        warm_up = time.monotonic() - began
+
+        def start_forked():
+            session = runtime.spawn({})
+            _wait_ready(session.stdout)
+            return session
+
+        try:
+            rows["prefork"] = measure(start_forked, sessions, extra_pids=[runtime._process.pid])
+        finally:
+            runtime.stop()
+    rows["prefork"]["warm_up_ms"] = warm_up * 1000
+    return rows
+
+
+def print_report(rows):
+    sessions = rows["subprocess"]["sessions"]
+    print(f"\n📊 Session start and memory ({sessions} sessions alive at once)\n")
+    print(f"{'mode':<12} {'start ms':>9} {'RSS MB':>8} {'USS MB':>8} {'total PSS MB':>13}")
+    for name, row in rows.items():
+        if "rss_mb" in row:
+            print(f"{name:<12} {row['start_ms']:>9.0f} {row['rss_mb']:>8.1f} {row['uss_mb']:>8.1f} {row['total_pss_mb']:>13.1f}")
+        else:
+            print(f"{name:<12} {row['start_ms']:>9.0f} {'n/a':>8} {'n/a':>8} {'n/a':>13}")
+    before, after = rows["subprocess"], rows["prefork"]
+    print(f"\nRuntime warm-up, once per web worker: {after['warm_up_ms']:.0f} ms")
+    print(f"Session start {before['start_ms'] / after['start_ms']:.0f}x faster", end="")
+    if "total_pss_mb" in after:
+        print(f", {before['total_pss_mb'] - after['total_pss_mb']:.1f} MB less memory in total")
+    else:
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--sessions", type=int, default=4, help="sessions started and kept alive at once")
+    args = parser.parse_args(argv)
+    print_report(run_report(args.sessions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
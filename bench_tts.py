@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+TTS backend benchmark
+
+Synthesizes Nova's phrase bank with every installed TTS backend, bypassing
+the audio cache, and reports synthesis latency and real-time factor
+(synthesis time divided by audio length; below 1 is faster than playback).
+Use it to pick NOVA_TTS_BACKEND and a NOVA_TTS_BUDGET that the cloud
+backend meets on a normal day.
+
+Usage:
+    python bench_tts.py
+    python bench_tts.py --backends gtts,espeak --repeat 3 --json
+"""
+
+import sys
+import json
+import time
+import argparse
+from tts_backends import BACKENDS, get_backend, audio_duration
+from tts_cache import PHRASE_BANK
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_backend(backend, phrases=PHRASE_BANK, repeat=1, lang='en'):
+    if not backend.available():
+        return {"backend": backend.name, "available": False}
+    latencies, audio_seconds, errors = [], 0.0, []
+    for _ in range(repeat):
+        for phrase in phrases:
+            started = time.perf_counter()
+            try:
+                data = backend.synthesize(phrase, lang)
+            except Exception as e:
+                errors.append(f"{phrase[:30]}: {e}")
+                continue
+            latencies.append(time.perf_counter() - started)
+            audio_seconds += audio_duration(data, backend.ext) or 0.0
+
+    result = {
+        "backend": backend.name,
+        "available": True,
+        "local": backend.local,
+        "phrases": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+    if latencies:
+        result.update({
+            "latency_mean": round(sum(latencies) / len(latencies), 4),
+            "latency_p50": round(_percentile(latencies, 0.5), 4),
+            "latency_p95": round(_percentile(latencies, 0.95), 4),
+            "latency_max": round(max(latencies), 4),
+            "audio_seconds": round(audio_seconds, 2),
+            "real_time_factor": round(sum(latencies) / audio_seconds, 4) if audio_seconds else None,
+        })
+    return result
+
+
+def print_report(results):
+    print(f"   {'backend':<10}{'phrases':>8}{'errors':>8}{'mean s':>9}{'p95 s':>9}{'max s':>9}{'RTF':>8}")
+    for result in results:
+        if not result["available"]:
+            print(f"   {result['backend']:<10}  not installed")
+            continue
+        if not result["phrases"]:
+            print(f"   {result['backend']:<10}{0:>8}{result['errors']:>8}  {result['first_error']}")
+            continue
+        rtf = result["real_time_factor"]
+        print(
+            f"   {result['backend']:<10}{result['phrases']:>8}{result['errors']:>8}"
+            f"{result['latency_mean']:>9.3f}{result['latency_p95']:>9.3f}{result['latency_max']:>9.3f}"
+            f"{(f'{rtf:.3f}' if rtf is not None else '-'):>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare TTS backends on Nova's phrase bank")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    print(f"\n🔊 Synthesizing {len(PHRASE_BANK)} phrases x{args.repeat} per backend\n")
+    results = [
+        bench_backend(get_backend(name.strip()), repeat=args.repeat, lang=args.lang)
+        for name in args.backends.split(",") if name.strip()
+    ]
+    print_report(results)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 0 if any(result.get("phrases") for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
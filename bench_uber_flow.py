@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+"""
+Offline benchmark for the Uber booking flow
+
+Replays a recorded m.uber.com session through click_login_button,
+enter_location_details, read_ride_options and confirm_and_request_ride using
+a fake WebDriver, scripted speech and a virtual clock, so thousands of runs
+take seconds and need no Chrome, network or microphone.
+
+For every step it reports WebDriver round trips, virtual wall-clock time
+(waits, sleeps and round trips at --rtt each), time spent in time.sleep and
+the real CPU time of the flow code, and compares them with bench_baseline.json.
+
+Usage:
+    python bench_uber_flow.py                    # 1000 runs, fail on regression
+    python bench_uber_flow.py -n 5000 --rtt 0.03
+    python bench_uber_flow.py --update-baseline  # accept the current numbers
+    python bench_uber_flow.py --trace flow.trace # also write one traced run
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import ExitStack, redirect_stdout, nullcontext
+from unittest import mock
+from fake_webdriver import FakeDriver, VirtualClock, load_recording, DEFAULT_RTT
+from waits import wait_report, reset_wait_stats
+from login import click_login_button
+from location import enter_location_details
+from places import PlaceStore
+from selector_stats import SelectorStats
+import selector_stats
+from driver_trace import TracingDriver, TraceWriter
+from metrics import span
+import options
+import confirm_and_request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RECORDING = os.path.join(HERE, "recordings", "uber_mobile_flow.json")
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+# Metrics compared against the baseline; cpu_seconds depends on the machine
+# and is only reported.
+GATED_METRICS = ("round_trips", "virtual_seconds", "sleep_seconds")
+TOLERANCE = 0.05
+
+
+class ScriptedSpeech:
+    """Plays the user's side of the conversation from a fixed list of answers."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.spoken = []
+        self.heard = 0
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+    def listen(self):
+        if self.heard >= len(self.answers):
+            return ""
+        answer = self.answers[self.heard]
+        self.heard += 1
+        return answer
+
+
+STEPS = (
+    ("login", lambda driver, speech: click_login_button(driver, speech.speak)),
+    # A new user: nothing remembered and nothing written to disk
+    ("location", lambda driver, speech: enter_location_details(driver, speech.speak, speech.listen, places=PlaceStore(None))),
+    ("ride_options", lambda driver, speech: options.read_ride_options(driver)),
+    ("confirm", lambda driver, speech: confirm_and_request.confirm_and_request_ride(driver)),
+)
+
+
+def run_once(recording, rtt=DEFAULT_RTT, trace=None):
+    """One pass through the flow; returns per-step numbers and the final page state.
+
+    With a trace writer, every WebDriver command is also recorded to it,
+    timed on the virtual clock.
+    """
+    clock = VirtualClock()
+    fake = FakeDriver(recording, clock, rtt)
+    driver = TracingDriver(fake, trace, session="bench", clock=clock.monotonic) if trace else fake
+    speech = ScriptedSpeech(recording.get("answers", []))
+    steps = {}
+    with ExitStack() as stack:
+        stack.enter_context(clock.installed())
+        # Selector order as written, and no learned order left on disk
+        stack.enter_context(mock.patch.object(selector_stats, "_stats", SelectorStats(None)))
+        # Every module that speaks or listens on its own
+        stack.enter_context(mock.patch.object(options, "nova_speak", speech.speak))
+        stack.enter_context(mock.patch.object(options, "listen_to_user", speech.listen))
+        stack.enter_context(mock.patch.object(confirm_and_request, "speak", speech.speak))
+        stack.enter_context(mock.patch.object(confirm_and_request, "listen", speech.listen))
+        for name, run in STEPS:
+            round_trips, now, slept = fake.round_trips, clock.now, clock.slept
+            started = time.perf_counter()
+            with span(name) if trace else nullcontext():
+                run(driver, speech)
+            steps[name] = {
+                "round_trips": fake.round_trips - round_trips,
+                "virtual_seconds": clock.now - now,
+                "sleep_seconds": clock.slept - slept,
+                "cpu_seconds": time.perf_counter() - started,
+            }
+    steps["total"] = {key: sum(step[key] for step in steps.values()) for key in steps["login"]}
+    return {
+        "steps": steps,
+        "final_state": fake.state,
+        "unhandled_scripts": fake.unhandled_scripts,
+        "commands": dict(fake.commands),
+    }
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_benchmark(iterations=1000, rtt=DEFAULT_RTT, recording_path=RECORDING):
+    recording = load_recording(recording_path)
+    reset_wait_stats()
+    runs = []
+    # The flow prints every action; keep the report readable
+    with redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            runs.append(run_once(recording, rtt))
+
+    summary = {}
+    for name in runs[0]["steps"]:
+        samples = [run["steps"][name] for run in runs]
+        summary[name] = {
+            metric: round(sum(sample[metric] for sample in samples) / len(samples), 4)
+            for metric in GATED_METRICS
+        }
+        cpu = [sample["cpu_seconds"] for sample in samples]
+        summary[name]["cpu_ms_mean"] = round(1000 * sum(cpu) / len(cpu), 3)
+        summary[name]["cpu_ms_p95"] = round(1000 * _percentile(cpu, 0.95), 3)
+
+    return {
+        "iterations": iterations,
+        "rtt": rtt,
+        "recording": os.path.relpath(recording_path, HERE),
+        "steps": summary,
+        "completed": sum(run["final_state"] == recording.get("final_state") for run in runs),
+        "unhandled_scripts": sum(run["unhandled_scripts"] for run in runs),
+        "commands": runs[-1]["commands"],
+        "timeouts": {
+            label: entry["timeouts"] / iterations
+            for label, entry in wait_report().items() if entry["timeouts"]
+        },
+    }
+
+
+def compare(result, baseline, tolerance=TOLERANCE):
+    """Returns a list of regressions of the gated metrics against the baseline."""
+    regressions = []
+    if result["completed"] != result["iterations"]:
+        regressions.append(f"only {result['completed']}/{result['iterations']} runs reached the final page state")
+    if result["unhandled_scripts"]:
+        regressions.append(f"{result['unhandled_scripts']} scripts were not understood by the fake driver")
+    for name, expected in baseline.get("steps", {}).items():
+        current = result["steps"].get(name)
+        if current is None:
+            regressions.append(f"{name}: step missing")
+            continue
+        for metric in GATED_METRICS:
+            limit = expected[metric] * (1 + tolerance) + 1e-6
+            if current[metric] > limit:
+                regressions.append(f"{name}.{metric}: {current[metric]} > baseline {expected[metric]}")
+    return regressions
+
+
+def load_baseline(path=BASELINE):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(result, path=BASELINE):
+    baseline = {
+        "rtt": result["rtt"],
+        "recording": result["recording"],
+        "steps": {
+            name: {metric: step[metric] for metric in GATED_METRICS}
+            for name, step in result["steps"].items()
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def print_report(result):
+    print(f"📊 {result['iterations']} runs of {result['recording']} at {result['rtt'] * 1000:.0f}ms per round trip")
+    print(f"   {'step':<14}{'round trips':>12}{'virtual s':>11}{'sleep s':>9}{'cpu ms':>9}{'p95 ms':>9}")
+    for name, step in result["steps"].items():
+        print(
+            f"   {name:<14}{step['round_trips']:>12g}{step['virtual_seconds']:>11.2f}"
+            f"{step['sleep_seconds']:>9.2f}{step['cpu_ms_mean']:>9.2f}{step['cpu_ms_p95']:>9.2f}"
+        )
+    if result["timeouts"]:
+        print("   Waits that timed out per run: " + ", ".join(
+            f"{label} {count:g}x" for label, count in sorted(result["timeouts"].items())
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the Uber booking flow")
+    parser.add_argument("-n", "--iterations", type=int, default=1000)
+    parser.add_argument("--rtt", type=float, default=None, help="virtual seconds per WebDriver round trip")
+    parser.add_argument("--recording", default=RECORDING)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--trace", help="append a WebDriver trace of one more run to this file")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    # Compare like with like: default to the round-trip cost the baseline used
+    rtt = args.rtt if args.rtt is not None else (baseline or {}).get("rtt", DEFAULT_RTT)
+    result = run_benchmark(args.iterations, rtt, args.recording)
+    print_report(result)
+    if args.trace:
+        # A separate run, so tracing round trips stay out of the gated numbers
+        writer = TraceWriter(args.trace)
+        with redirect_stdout(io.StringIO()):
+            run_once(load_recording(args.recording), rtt, writer)
+        writer.close()
+        print(f"✅ Trace of one run appended to {args.trace}")
+
+    if args.update_baseline:
+        save_baseline(result, args.baseline)
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("⚠️ No baseline yet, run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions:
+        print("❌ Regressions against the baseline:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
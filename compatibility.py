@@ -6,9 +6,8 @@ This script checks for compatibility issues between installed packages.
 It's useful for diagnosing deployment problems related to package versions.
 """
 
-import pkg_resources
 import sys
-import importlib
+from importlib import metadata
 import logging
 
 # Configure logging
@@ -21,8 +20,8 @@ logger = logging.getLogger(__name__)
 def check_flask_werkzeug_compatibility():
     """Check if Flask and Werkzeug versions are compatible"""
     try:
-        flask_version = pkg_resources.get_distribution("flask").version
-        werkzeug_version = pkg_resources.get_distribution("werkzeug").version
+        flask_version = metadata.version("flask")
+        werkzeug_version = metadata.version("werkzeug")
         
         logger.info(f"Flask version: {flask_version}")
         logger.info(f"Werkzeug version: {werkzeug_version}")
@@ -43,7 +42,7 @@ def check_flask_werkzeug_compatibility():
             logger.error("This is likely causing the deployment error on Render")
             return False
             
-    except pkg_resources.DistributionNotFound as e:
+    except metadata.PackageNotFoundError as e:
         logger.error(f"Package not found: {e}")
         return False
 
@@ -56,8 +55,9 @@ def check_all_dependencies():
     
     # List all installed packages
     logger.info("\nInstalled packages:")
-    for pkg in pkg_resources.working_set:
-        logger.info(f"{pkg.key}=={pkg.version}")
+    packages = {dist.metadata["Name"]: dist.version for dist in metadata.distributions()}
+    for name in sorted(packages, key=str.lower):
+        logger.info(f"{name}=={packages[name]}")
     
     # Check Flask and Werkzeug compatibility
     logger.info("\nChecking Flask and Werkzeug compatibility:")
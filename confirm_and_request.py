@@ -1,16 +1,21 @@
-import time
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from speak import speak
 from listen import listen
+from waits import wait_for_element, wait_until, POPUP_WINDOW
+import progress
 
 def try_to_click(driver, by, identifier, name):
     try:
-        button = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((by, identifier))
+        button = wait_until(
+            driver,
+            EC.element_to_be_clickable((by, identifier)),
+            timeout=5,
+            label="confirm.clickable",
         )
+        if not button:
+            return False
         speak(f"Should I {name}?")
         for _ in range(2):
             response = listen()
@@ -39,9 +44,8 @@ def confirm_and_request_ride(driver):
         "request the ride"
     )
 
-    time.sleep(2)
-
     # 2. If fare confirmation popup appears, handle it
+    wait_for_element(driver, ['button.css-lmEOwb'], timeout=POPUP_WINDOW, label="confirm.fare_popup")
     try:
         confirm_button = driver.find_element(By.CSS_SELECTOR, 'button.css-lmEOwb')
         cancel_button = driver.find_element(By.CSS_SELECTOR, 'button.css-kcHUdO')
@@ -67,7 +71,7 @@ def confirm_and_request_ride(driver):
         pass  # No fare popup appeared
 
     # 3. Try the expired fare page's request button (if it appears later)
-    time.sleep(2)
+    # try_to_click already waits for it to become clickable
     success |= try_to_click(
         driver,
         By.XPATH,
@@ -76,6 +80,7 @@ def confirm_and_request_ride(driver):
     )
 
     if success:
+        progress.step("request_sent")
         speak("Your ride has been requested.")
     else:
         speak("I did not request the ride, as the buttons were missing or not confirmed.")
@@ -0,0 +1,377 @@
+# driver_pool.py
+
+import os
+import time
+import atexit
+import getpass
+import threading
+from contextlib import contextmanager
+import undetected_chromedriver as uc
+from metrics import span
+from session_store import restore_session
+from resource_policy import apply_resource_policy, PAGE_LOAD_STRATEGY
+from driver_trace import trace_driver
+
+HOME_URL = "https://m.uber.com/go/home"
+MOBILE_USER_AGENT = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
+    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 "
+    "Mobile/15E148 Safari/604.1"
+)
+
+# Check if we're in a production environment
+is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
+
+
+# === Chrome Options ===
+def build_chrome_options():
+    options = uc.ChromeOptions()
+    options.add_argument(f"user-agent={MOBILE_USER_AGENT}")
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+
+    # Add headless mode for production environment
+    if is_production:
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--window-size=420,900')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-setuid-sandbox')
+        options.add_argument('--disable-web-security')
+        options.add_argument('--disable-features=VizDisplayCompositor')
+        options.add_argument('--ignore-certificate-errors')
+    else:
+        # For local development, use persistent profile
+        username = getpass.getuser()
+        custom_profile = f"C:\\Users\\{username}\\clova-mobile-profile"
+        options.add_argument(f"--user-data-dir={custom_profile}")
+        options.add_argument("--profile-directory=Profile1")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+    return options
+
+
+# === Launch a Driver on the Home Page ===
+def launch_driver():
+    print("Initializing Chrome driver...")
+    options = build_chrome_options()
+    with span("chrome_launch"):
+        try:
+            # Try with specific version first
+            driver = uc.Chrome(version_main=138, options=options)
+        except Exception as version_error:
+            print(f"Error with specific Chrome version: {version_error}")
+            # Fall back to automatic version detection (options can't be reused)
+            driver = uc.Chrome(options=build_chrome_options())
+    # Records every command to the WebDriver trace when NOVA_TRACE is on
+    driver = trace_driver(driver)
+
+    # Set window size if not already set in options
+    if not is_production:
+        driver.set_window_size(420, 900)
+
+    # Both have to be in place before the first page load
+    apply_resource_policy(driver)
+    restore_session(driver)
+
+    # Open Uber mobile site with retry logic
+    print("Opening Uber mobile site...")
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            with span("page_load"):
+                driver.get(HOME_URL)
+            break
+        except Exception as page_error:
+            if attempt < max_retries - 1:
+                print(f"Error loading page (attempt {attempt+1}): {page_error}. Retrying...")
+            else:
+                quit_driver(driver)
+                raise
+    return driver
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Note: Error while quitting Chrome driver: {e}")
+
+
+def is_healthy(driver):
+    # A dead session or crashed tab fails this round trip
+    try:
+        return driver.execute_script("return document.readyState") in ("interactive", "complete")
+    except Exception:
+        return False
+
+
+def reset_to_home(driver):
+    try:
+        if driver.current_url.split("?")[0].rstrip("/") != HOME_URL:
+            with span("page_load"):
+                driver.get(HOME_URL)
+        return True
+    except Exception as e:
+        print(f"Note: Could not reset driver to home page: {e}")
+        return False
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "uses", "created")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created = time.monotonic()
+
+
+# === Warm Driver Pool ===
+class DriverPool:
+    """Keeps up to `size` launched drivers parked on the Uber home page.
+
+    A background maintainer launches drivers until the pool is full, resets
+    returned drivers to the home page, recycles them after `max_uses`
+    bookings and replaces idle drivers that fail a health check.
+    """
+
+    def __init__(self, size=None, max_uses=None, health_interval=None, factory=launch_driver):
+        # Each session runs in its own process, so a second warm driver would
+        # never be used; locally the persistent profile also allows only one
+        self.size = max(1, int(size or os.environ.get('NOVA_DRIVER_POOL_SIZE', 1)))
+        self.max_uses = max(1, int(max_uses or os.environ.get('NOVA_DRIVER_MAX_USES', 20)))
+        self.health_interval = float(health_interval or os.environ.get('NOVA_DRIVER_HEALTH_INTERVAL', 30))
+        self._factory = factory
+
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._idle = []
+        self._busy = {}
+        self._returned = []
+        self._live = 0
+        self._launching = 0
+        self._checking = 0
+        self._closed = False
+        self._thread = None
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "launches": 0,
+            "launch_failures": 0,
+            "recycled": 0,
+            "health_failures": 0,
+            "checkouts": 0,
+            "checkout_seconds_total": 0.0,
+            "checkout_seconds_max": 0.0,
+        }
+
+    # --- lifecycle ---
+    def start(self):
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._maintain, name="driver-pool", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            entries = self._idle + self._returned + list(self._busy.values())
+            self._idle, self._returned, self._busy = [], [], {}
+            self._live = 0
+            self._cond.notify_all()
+        self._wake.set()
+        for entry in entries:
+            quit_driver(entry.driver)
+
+    # --- checkout / release ---
+    def checkout(self, timeout=60):
+        self.start()
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            # A warm driver that is already launching, being reset or being
+            # health-checked is always cheaper than a cold launch, so wait for it instead.
+            while not self._idle and (self._launching or self._returned or self._checking) and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._closed:
+                raise RuntimeError("Driver pool is closed")
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._live += 1
+
+        if entry is not None and not reset_to_home(entry.driver):
+            self._discard(entry, "health_failures")
+            with self._cond:
+                self._live += 1
+            entry = None
+
+        if entry is not None:
+            self._count("hits")
+        else:
+            self._count("misses")
+            try:
+                entry = _PooledDriver(self._factory())
+                self._count("launches")
+            except Exception:
+                with self._cond:
+                    self._live -= 1
+                self._count("launch_failures")
+                raise
+
+        entry.uses += 1
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._busy[id(entry.driver)] = entry
+            self._stats["checkouts"] += 1
+            self._stats["checkout_seconds_total"] += elapsed
+            self._stats["checkout_seconds_max"] = max(self._stats["checkout_seconds_max"], elapsed)
+        self._wake.set()
+        return entry.driver
+
+    def release(self, driver):
+        with self._cond:
+            entry = self._busy.pop(id(driver), None)
+            if entry is None:
+                return
+            if self._closed:
+                self._live -= 1
+            else:
+                self._returned.append(entry)
+                entry = None
+        if entry is not None:
+            quit_driver(driver)
+        self._wake.set()
+
+    @contextmanager
+    def driver(self):
+        driver = self.checkout()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # --- stats ---
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["busy"] = len(self._busy)
+            stats["live"] = self._live
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["checkout_seconds_avg"] = (
+            stats["checkout_seconds_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        )
+        return stats
+
+    # --- background maintenance ---
+    def _count(self, key, amount=1):
+        with self._cond:
+            self._stats[key] += amount
+
+    def _discard(self, entry, reason=None):
+        if reason:
+            self._count(reason)
+        quit_driver(entry.driver)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify_all()
+
+    def _maintain(self):
+        while True:
+            self._wake.wait(self.health_interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self._process_returned()
+                self._check_idle()
+                self._replenish()
+            except Exception as e:
+                print(f"⚠️ Driver pool maintenance error: {e}")
+
+    def _process_returned(self):
+        while True:
+            with self._cond:
+                if not self._returned:
+                    return
+                entry = self._returned.pop()
+                full = len(self._idle) >= self.size
+            if entry.uses >= self.max_uses:
+                self._discard(entry, "recycled")
+            elif full or not reset_to_home(entry.driver):
+                self._discard(entry)
+            else:
+                self._park(entry)
+
+    def _check_idle(self):
+        # One entry at a time, so checkout can still take the others; the
+        # one being checked stays counted and checkout waits for it
+        with self._cond:
+            pending = list(self._idle)
+        for entry in pending:
+            with self._cond:
+                if entry not in self._idle:
+                    continue
+                self._idle.remove(entry)
+                self._checking += 1
+            try:
+                healthy = is_healthy(entry.driver)
+            finally:
+                with self._cond:
+                    self._checking -= 1
+            if healthy:
+                self._park(entry)
+            else:
+                self._discard(entry, "health_failures")
+
+    def _replenish(self):
+        while True:
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+                self._launching += 1
+            try:
+                entry = _PooledDriver(self._factory())
+                self._count("launches")
+            except Exception as e:
+                print(f"⚠️ Could not pre-launch Chrome driver: {e}")
+                self._count("launch_failures")
+                with self._cond:
+                    self._live -= 1
+                    self._launching -= 1
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._launching -= 1
+            self._park(entry)
+
+    def _park(self, entry):
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                self._idle.append(entry)
+            self._cond.notify_all()
+        if closed:
+            quit_driver(entry.driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,325 @@
+# driver_trace.py
+
+import os
+import json
+import time
+import zlib
+import threading
+from contextlib import contextmanager
+from metrics import current_stage
+
+# Check if we're in a production environment
+is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
+
+# Production bookings have no screen to watch; their traces are the record
+TRACE = os.environ.get('NOVA_TRACE', '1' if is_production else '0') != '0'
+TRACE_PATH = os.environ.get(
+    'NOVA_TRACE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'traces', 'webdriver.trace')
+)
+TRACE_MAX_BYTES = int(float(os.environ.get('NOVA_TRACE_MAX_MB', 20)) * 2 ** 20)
+TRACE_BACKUPS = int(os.environ.get('NOVA_TRACE_BACKUPS', 5))
+# "changes" hashes the DOM after commands that can change the page, "all" after
+# every command, "off" never. Each hash is an extra round trip over the whole
+# page, so it is for debugging a flow, not for production timings.
+TRACE_DOM = os.environ.get('NOVA_TRACE_DOM', 'off')
+
+# Hash of the serialized DOM, computed in the page so only 17 bytes come back
+DOM_HASH_JS = """
+var html = document.documentElement ? document.documentElement.outerHTML : '';
+var h = 2166136261;
+for (var i = 0; i < html.length; i++) { h ^= html.charCodeAt(i); h = Math.imul(h, 16777619) >>> 0; }
+return ('0000000' + h.toString(16)).slice(-8) + ':' + html.length;
+"""
+
+MUTATING_COMMANDS = {"get", "refresh", "back", "forward", "element.click", "element.send_keys", "element.clear", "element.submit"}
+# Element reads that are WebDriver round trips even though they look like attributes
+ELEMENT_PROPERTIES = {"text", "tag_name", "location", "size", "rect"}
+
+_script_names = None
+
+
+def script_name(script):
+    """The constant a script is defined as (e.g. "locate" for LOCATE_JS), or a short hash."""
+    global _script_names
+    if _script_names is None:
+        # Imported here; these modules drive the browser and some wrap it in turn
+        import locator, waits, options, location, session_store, resource_policy
+        names = {}
+        for module in (locator, waits, options, location, session_store, resource_policy):
+            for attribute, value in vars(module).items():
+                if attribute.endswith("_JS") and isinstance(value, str):
+                    names.setdefault(value, attribute[:-3].lower())
+        names[DOM_HASH_JS] = "dom_hash"
+        _script_names = names
+    name = _script_names.get(script)
+    if name:
+        return name
+    if len(script) <= 40 and "\n" not in script:
+        return script
+    return f"{zlib.crc32(script.encode('utf-8')):08x}"
+
+
+# === Trace File ===
+@contextmanager
+def _file_lock(path):
+    try:
+        import fcntl
+    except ImportError:
+        # No cross-process lock; a rotation may race with another process's write
+        yield
+        return
+    with open(path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class TraceWriter:
+    """Append-only JSON-lines trace shared by every process on the host.
+
+    Each record is one write() to a file opened for appending. Past
+    `max_bytes` the file is rotated to .1, .2 ... keeping `backups` old files.
+    """
+
+    def __init__(self, path=TRACE_PATH, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _rotate(self, pending):
+        with _file_lock(self.path + ".lock"):
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            # Rotate only if no other process has done it in the meantime
+            if current is not None and os.path.samestat(current, os.fstat(self._fd)) \
+                    and current.st_size + pending > self.max_bytes:
+                for index in range(self.backups - 1, 0, -1):
+                    if os.path.exists(f"{self.path}.{index}"):
+                        os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+                if self.backups > 0:
+                    os.replace(self.path, f"{self.path}.1")
+                else:
+                    os.remove(self.path)
+            os.close(self._fd)
+            self._open()
+
+    def write(self, record):
+        line = (json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                self._open()
+            if os.fstat(self._fd).st_size + len(line) > self.max_bytes:
+                self._rotate(len(line))
+            os.write(self._fd, line)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def trace_files(path):
+    """The trace and its rotated files, oldest first."""
+    rotated = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        rotated.append(f"{path}.{index}")
+        index += 1
+    return list(reversed(rotated)) + ([path] if os.path.exists(path) else [])
+
+
+def read_trace(path, session=None, rotated=True):
+    """Records of a trace file (and its rotated files), optionally of one session."""
+    records = []
+    for file_path in trace_files(path) if rotated else [path]:
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if session is None or record.get("s") == session:
+                    records.append(record)
+    return records
+
+
+# === Tracing Wrapper ===
+def _unwrap(value):
+    if isinstance(value, TracedElement):
+        return value._element
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+def _is_element(value):
+    return hasattr(value, "click") and hasattr(value, "send_keys") and not isinstance(value, TracingDriver)
+
+
+def _may_change_page(name, args):
+    if name in MUTATING_COMMANDS:
+        return True
+    return name.startswith("script:") and isinstance(args[0], str) and "click()" in args[0]
+
+
+def result_size(result):
+    """Approximate bytes of a command's response."""
+    if result is None:
+        return 0
+    try:
+        return len(json.dumps(result, default=lambda value: "<element>" if _is_element(value) else str(value)))
+    except (TypeError, ValueError):
+        return len(str(result))
+
+
+class TracingDriver:
+    """Wraps a WebDriver and records every command it sends.
+
+    A record holds the time, session, flow stage, command, selector or URL,
+    duration, response size, any error, and for commands that may change
+    the page a hash of the DOM afterwards (see TRACE_DOM, off by default). Elements it
+    returns are wrapped too, so their clicks and reads are recorded.
+    """
+
+    def __init__(self, driver, writer, session=None, dom=None, clock=time.perf_counter):
+        self._driver = driver
+        self._writer = writer
+        self._session = session or os.environ.get('NOVA_JOB_ID') or f"pid-{os.getpid()}"
+        self._dom = TRACE_DOM if dom is None else dom
+        self._clock = clock
+
+    @property
+    def wrapped_driver(self):
+        return self._driver
+
+    def __getattr__(self, name):
+        attribute = getattr(self._driver, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        def traced(*args, **kwargs):
+            return self._call(name, attribute, args, kwargs)
+        return traced
+
+    def _describe(self, command, args):
+        """(command name, selector or URL) of a call."""
+        if command in ("execute_script", "execute_async_script") and args:
+            name = script_name(args[0])
+            selector = args[1] if name in ("locate", "observe") and len(args) > 1 else None
+            return f"script:{name}", selector
+        if command == "execute_cdp_cmd" and args:
+            return f"cdp:{args[0]}", None
+        if command in ("find_element", "find_elements") and len(args) > 1:
+            return command, args[1]
+        if command == "get" and args:
+            return command, args[0]
+        return command, None
+
+    def _call(self, command, func, args, kwargs, element=None):
+        name, selector = self._describe(command, args)
+        if element is not None:
+            name = f"element.{command}"
+        started = self._clock()
+        error = None
+        try:
+            result = func(*_unwrap(args), **_unwrap(kwargs))
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = self._clock() - started
+            record = {"t": round(time.time(), 3), "s": self._session, "c": name,
+                      "ms": round(duration * 1000, 3), "n": 0 if error else result_size(result)}
+            stage = current_stage()
+            if stage:
+                record["st"] = stage
+            if selector is not None:
+                record["sel"] = selector
+            if error:
+                record["err"] = error
+            if self._dom == "all" or (self._dom == "changes" and _may_change_page(name, args)):
+                record["dom"] = self._dom_hash()
+            self._write(record)
+        return self._wrap(result)
+
+    def _dom_hash(self):
+        try:
+            return self._driver.execute_script(DOM_HASH_JS)
+        except Exception:
+            return None
+
+    def _write(self, record):
+        try:
+            self._writer.write(record)
+        except Exception as e:
+            # Tracing must never break a booking
+            print(f"Note: Could not write WebDriver trace: {e}")
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._wrap(item) for key, item in value.items()}
+        if _is_element(value):
+            return TracedElement(self, value)
+        return value
+
+
+class TracedElement:
+    """An element of a traced driver; its commands are recorded as element.<name>."""
+
+    def __init__(self, tracer, element):
+        self._tracer = tracer
+        self._element = element
+
+    def __getattr__(self, name):
+        if name in ELEMENT_PROPERTIES:
+            return self._tracer._call(name, lambda: getattr(self._element, name), (), {}, element=self._element)
+        attribute = getattr(self._element, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        def traced(*args, **kwargs):
+            return self._tracer._call(name, attribute, args, kwargs, element=self._element)
+        return traced
+
+    def __eq__(self, other):
+        return self._element == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._element)
+
+    def __repr__(self):
+        return f"TracedElement({self._element!r})"
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_trace_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TraceWriter()
+        return _writer
+
+
+def trace_driver(driver):
+    """`driver` wrapped for tracing when NOVA_TRACE is on, else `driver` itself."""
+    if not TRACE:
+        return driver
+    return TracingDriver(driver, get_trace_writer())
@@ -0,0 +1,321 @@
+# fake_webdriver.py
+
+import re
+import json
+import time
+import zlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from locator import LOCATE_JS
+from waits import OBSERVE_JS, DOM_QUIET_JS
+from options import EXTRACT_RIDE_OPTIONS_JS
+from driver_trace import DOM_HASH_JS
+
+DEFAULT_RTT = 0.015
+
+_PRICE_RE = re.compile(r"[₹$€£]\s*\d")
+_ETA_RE = re.compile(r"\d+\s*min|\d{1,2}:\d{2}", re.IGNORECASE)
+_CAPACITY_RE = re.compile(r"^\d{1,2}$")
+
+
+def load_recording(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# === Virtual Clock ===
+class VirtualClock:
+    """Stands in for time.monotonic/time.sleep so waits cost no real time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+        self.sleeps = 0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        seconds = max(0.0, seconds)
+        self.now += seconds
+        self.slept += seconds
+        self.sleeps += 1
+
+    def advance(self, seconds):
+        self.now += max(0.0, seconds)
+
+    @contextmanager
+    def installed(self):
+        # Patch the module functions so selenium's WebDriverWait and the wait
+        # engine both see virtual time. perf_counter stays real. Only the
+        # installing thread is affected; background threads of the code under
+        # test (pool maintenance, recalibration) keep real time.
+        real_monotonic, real_sleep = time.monotonic, time.sleep
+        owner = threading.get_ident()
+
+        def monotonic():
+            return self.monotonic() if threading.get_ident() == owner else real_monotonic()
+
+        def sleep(seconds):
+            return self.sleep(seconds) if threading.get_ident() == owner else real_sleep(seconds)
+
+        time.monotonic, time.sleep = monotonic, sleep
+        try:
+            yield self
+        finally:
+            time.monotonic, time.sleep = real_monotonic, real_sleep
+
+
+# === Fake Elements ===
+class FakeElement:
+    """A node of the recorded page. Its spec is looked up in the driver's
+    current state, so a node that is no longer rendered goes stale."""
+
+    def __init__(self, driver, element_id):
+        self._driver = driver
+        self.id = element_id
+
+    @property
+    def spec(self):
+        return self._driver._spec(self.id)
+
+    @property
+    def text(self):
+        self._driver._command("get_text")
+        return self.spec.get("text", "")
+
+    @property
+    def tag_name(self):
+        self._driver._command("get_tag_name")
+        return self.spec.get("tag", "div")
+
+    def get_attribute(self, name):
+        self._driver._command("get_attribute")
+        return self.spec.get("attributes", {}).get(name)
+
+    def is_displayed(self):
+        self._driver._command("is_displayed")
+        return self.spec.get("visible", True)
+
+    def is_enabled(self):
+        self._driver._command("is_enabled")
+        return self.spec.get("enabled", True)
+
+    def click(self):
+        self._driver._command("click")
+        self._driver._trigger(self, "on_click")
+
+    def clear(self):
+        self._driver._command("clear")
+        self._driver._spec(self.id)  # raises if the node went stale
+
+    def send_keys(self, *values):
+        self._driver._command("send_keys")
+        text = "".join(str(value) for value in values)
+        self._driver._trigger(self, "on_enter" if Keys.ENTER in text else "on_type")
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"FakeElement({self.id!r})"
+
+
+# === Fake Driver ===
+class FakeDriver:
+    """Replays recorded DOM states of a site instead of driving Chrome.
+
+    A recording has an `elements` catalogue (selectors each node matched on
+    the real page, text, visibility and which state a click or keystroke
+    leads to) and `states` listing the nodes rendered in each state, with
+    per-state overrides such as `appears_after` (seconds after entering the
+    state). Every WebDriver call counts as one round trip and advances the
+    virtual clock by `rtt`.
+    """
+
+    def __init__(self, recording, clock=None, rtt=DEFAULT_RTT):
+        self.recording = recording
+        self.clock = clock or VirtualClock()
+        self.rtt = rtt
+        self.commands = Counter()
+        self.round_trips = 0
+        self.wait_seconds = 0.0
+        self.unhandled_scripts = 0
+        self.current_url = None
+        self.state = None
+        self._elements = {}
+        self._entered = 0.0
+        self._enter(recording["start"])
+
+    # --- state machine ---
+    def _enter(self, state_name):
+        state = self.recording["states"][state_name]
+        catalogue = self.recording.get("elements", {})
+        self.state = state_name
+        self._entered = self.clock.now
+        self._elements = {}
+        for element_id, overrides in (state.get("elements") or {}).items():
+            spec = dict(catalogue.get(element_id, {}))
+            spec.update(overrides or {})
+            self._elements[element_id] = spec
+        self.current_url = state.get("url", self.current_url)
+
+    def _appears_at(self, spec):
+        return self._entered + spec.get("appears_after", 0.0)
+
+    def _spec(self, element_id):
+        spec = self._elements.get(element_id)
+        if spec is None or self.clock.now < self._appears_at(spec):
+            raise StaleElementReferenceException(f"{element_id} is not attached to the page in state {self.state}")
+        return spec
+
+    def _trigger(self, element, event):
+        target = self._spec(element.id).get(event)
+        if target:
+            self._enter(target)
+
+    def _command(self, name):
+        self.round_trips += 1
+        self.commands[name] += 1
+        self.clock.advance(self.rtt)
+
+    def _wait(self, seconds):
+        self.clock.advance(seconds)
+        self.wait_seconds += max(0.0, seconds)
+
+    # --- queries ---
+    def _matching(self, selector, rendered=True):
+        return [
+            element_id for element_id, spec in self._elements.items()
+            if selector in spec.get("selectors", ())
+            and (not rendered or self.clock.now >= self._appears_at(spec))
+        ]
+
+    def _passes(self, element_id, opts):
+        spec = self._elements[element_id]
+        exclude = {element.id for element in opts.get("exclude") or [] if isinstance(element, FakeElement)}
+        if element_id in exclude:
+            return False
+        if opts.get("visible") and not spec.get("visible", True):
+            return False
+        if opts.get("enabled") and not spec.get("enabled", True):
+            return False
+        text = [t.lower() for t in opts.get("text") or []]
+        if text and not any(t in spec.get("text", "").lower() for t in text):
+            return False
+        return True
+
+    def _find(self, selectors, opts, rendered=True):
+        for index, selector in enumerate(selectors):
+            for element_id in self._matching(selector, rendered):
+                if self._passes(element_id, opts):
+                    return element_id, index
+        return None
+
+    def _observe(self, selectors, timeout_ms, opts):
+        match = self._find(selectors, opts)
+        if match is None:
+            # Jump to the moment the first matching node is rendered
+            timeout = timeout_ms / 1000.0
+            pending = [
+                self._appears_at(self._elements[element_id]) - self.clock.now
+                for selector in selectors
+                for element_id in self._matching(selector, rendered=False)
+                if self._passes(element_id, opts)
+            ]
+            delay = min([d for d in pending if d > 0] or [timeout])
+            self._wait(min(delay, timeout))
+            match = self._find(selectors, opts)
+        return FakeElement(self, match[0]) if match else None
+
+    def _dom_quiet(self, quiet_ms, timeout_ms):
+        quiet, timeout = quiet_ms / 1000.0, timeout_ms / 1000.0
+        # Nodes still due to render count as mutations and restart the quiet timer
+        last_mutation = max([self._appears_at(spec) - self.clock.now for spec in self._elements.values()] + [0.0])
+        self._wait(min(last_mutation + quiet, timeout))
+        return True
+
+    def _extract_ride_options(self, selector):
+        out = []
+        for index, element_id in enumerate(self._matching(selector)):
+            lines = [line.strip() for line in self._elements[element_id].get("text", "").split("\n") if line.strip()]
+            if not lines:
+                continue
+            option = {"name": lines[0], "price": None, "eta": None, "capacity": None,
+                      "index": index, "element": FakeElement(self, element_id)}
+            for line in lines[1:]:
+                if option["price"] is None and _PRICE_RE.search(line):
+                    option["price"] = line
+                elif option["eta"] is None and _ETA_RE.search(line):
+                    option["eta"] = line
+                elif option["capacity"] is None and _CAPACITY_RE.match(line):
+                    option["capacity"] = int(line)
+            out.append(option)
+        return out
+
+    # --- WebDriver API ---
+    def get(self, url):
+        self._command("get")
+        for name, state in self.recording["states"].items():
+            if state.get("url") == url and name == self.recording["start"]:
+                self._enter(name)
+                return
+        self.current_url = url
+
+    def find_elements(self, by, value):
+        self._command("find_elements")
+        return [FakeElement(self, element_id) for element_id in self._matching(value)]
+
+    def find_element(self, by, value):
+        self._command("find_element")
+        matches = self._matching(value)
+        if not matches:
+            raise NoSuchElementException(f"Unable to locate element: {value}")
+        return FakeElement(self, matches[0])
+
+    def set_script_timeout(self, seconds):
+        self._command("set_script_timeout")
+
+    def set_window_size(self, width, height):
+        self._command("set_window_size")
+
+    def execute_script(self, script, *args):
+        self._command("execute_script")
+        if script == LOCATE_JS:
+            match = self._find(args[0], args[1] or {})
+            return [FakeElement(self, match[0]), match[1]] if match else None
+        if script == EXTRACT_RIDE_OPTIONS_JS:
+            return self._extract_ride_options(args[0])
+        if script == "return document.readyState":
+            return "complete"
+        if script == DOM_HASH_JS:
+            rendered = sorted(element_id for element_id, spec in self._elements.items()
+                              if self.clock.now >= self._appears_at(spec))
+            page = json.dumps([self.state, rendered])
+            return f"{zlib.crc32(page.encode('utf-8')):08x}:{len(page)}"
+        if "arguments[0].click()" in script:
+            text = self._spec(args[0].id).get("text", "")
+            self._trigger(args[0], "on_click")
+            return text if "innerText" in script else None
+        if "scrollIntoView" in script or "elementFromPoint" in script:
+            return None
+        self.unhandled_scripts += 1
+        return None
+
+    def execute_async_script(self, script, *args):
+        self._command("execute_async_script")
+        if script == OBSERVE_JS:
+            return self._observe(args[0], args[1], args[2] or {})
+        if script == DOM_QUIET_JS:
+            return self._dom_quiet(args[0], args[1])
+        self.unhandled_scripts += 1
+        return None
+
+    def quit(self):
+        self._command("quit")
@@ -0,0 +1,37 @@
+# fakes.py
+
+import struct
+
+
+# === Microphone ===
+class FakeStream:
+    """Microphone stream that returns one chunk per level, then silence."""
+
+    def __init__(self, levels):
+        self.levels = list(levels)
+
+    def read(self, frames):
+        level = self.levels.pop(0) if self.levels else 0
+        return struct.pack(f"<{frames}h", *([level] * frames))
+
+
+class FakeSource:
+    """Stands in for speech_recognition.Microphone inside an AudioSession."""
+
+    CHUNK = 1600
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, levels):
+        self.stream = FakeStream(levels)
+
+
+# === Clock ===
+class FakeClock:
+    """Wall clock for `clock=` arguments that only moves when a test sets `now`."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,202 @@
+# fuzzy_match.py
+
+import os
+import re
+import math
+from functools import lru_cache
+
+MATCH_THRESHOLD = float(os.environ.get('NOVA_MATCH_THRESHOLD', 0.7))
+# A runner-up closer than this to the best score makes the answer ambiguous
+AMBIGUITY_MARGIN = 0.05
+# Weight of "how much of the transcript the candidate explains" next to
+# "how much of the candidate was said"
+PRECISION_WEIGHT = 0.2
+# Tokens that sound alike but are spelled differently still count this much
+PHONETIC_SIMILARITY = 0.85
+MIN_TOKEN_SIMILARITY = 0.5
+
+STOPWORDS = frozenset(
+    "a an the i id im want wanna would like to please me my let lets us uh um "
+    "take choose select pick give get can could you just that this for".split()
+)
+NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+ORDINAL_WORDS = {
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5",
+    "sixth": "6", "seventh": "7", "eighth": "8", "ninth": "9",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Applied in order; collapses spellings the recognizer confuses for one sound
+_PHONETIC_RULES = (
+    ("ph", "f"), ("ck", "k"), ("gh", "g"), ("kn", "n"), ("wh", "w"), ("th", "t"),
+    ("ce", "se"), ("ci", "si"), ("cy", "sy"), ("x", "ks"), ("q", "k"), ("c", "k"), ("z", "s"), ("v", "f"),
+    ("b", "p"), ("d", "t"), ("g", "k"),
+)
+
+
+def tokenize(text):
+    """Lowercase words with number words as digits; stopwords are kept."""
+    tokens, previous = [], None
+    for word in _TOKEN.findall((text or "").lower().replace("'", "")):
+        # "the second one" is the second, not the first
+        if word != "one" or previous not in ORDINAL_WORDS:
+            tokens.append(ORDINAL_WORDS.get(word) or NUMBER_WORDS.get(word, word))
+        previous = word
+    return tokens
+
+
+@lru_cache(maxsize=4096)
+def phonetic_key(word):
+    """A rough sound-alike key: "excel" and "xl" both become "ksl"."""
+    if word.isdigit():
+        return word
+    # Letters read out as a word: "xl" often comes back as "excel"
+    key = word[1:] if word.startswith("ex") else word
+    for spelling, sound in _PHONETIC_RULES:
+        key = key.replace(spelling, sound)
+    # Past the first sound, vowels and h/w/y carry little of what recognizers get wrong
+    head = "a" if key[0] in "aeiouy" else key[0]
+    key = head + re.sub(r"[aeiouhwy]", "", key[1:])
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+@lru_cache(maxsize=4096)
+def similarity(a, b):
+    """Similarity of two tokens between 0 and 1 from edit distance and sound."""
+    if a == b:
+        return 1.0
+    if a.isdigit() or b.isdigit():
+        return 0.0
+    score = 1.0 - _levenshtein(a, b) / float(max(len(a), len(b)))
+    if len(phonetic_key(a)) > 1 and phonetic_key(a) == phonetic_key(b):
+        score = max(score, PHONETIC_SIMILARITY)
+    return score if score >= MIN_TOKEN_SIMILARITY else 0.0
+
+
+def _levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def _content(tokens):
+    content = [token for token in tokens if token not in STOPWORDS]
+    return content or tokens
+
+
+class Match:
+    __slots__ = ("candidate", "score", "confidence", "runner_up")
+
+    def __init__(self, candidate=None, score=0.0, confidence=0.0, runner_up=None):
+        self.candidate = candidate
+        self.score = score
+        self.confidence = confidence
+        self.runner_up = runner_up
+
+    def __repr__(self):
+        return f"Match({self.candidate!r}, score={self.score:.2f}, confidence={self.confidence:.2f})"
+
+
+class _Phrase:
+    __slots__ = ("candidate", "tokens", "weights", "squashed")
+
+    def __init__(self, candidate, tokens, weights):
+        self.candidate = candidate
+        self.tokens = tokens
+        self.weights = weights
+        self.squashed = "".join(tokens)
+
+
+class FuzzyMatcher:
+    """Picks which of a fixed set of candidates a spoken answer refers to.
+
+    `candidates` maps each candidate to the phrases that name it, or is a
+    list of strings that name themselves. Phrases are tokenized once; each
+    token is weighted by how few candidates share it, so "uber" matters
+    little when every ride is an Uber. A transcript scores by how much of a
+    phrase it covers (edit distance and phonetic similarity per token, with
+    run-together words like "uberx" handled) and how much of the transcript
+    the phrase explains.
+
+    `best()` returns the top candidate with a confidence that drops towards
+    zero when the runner-up scores about the same; `match()` returns the
+    candidate only if that confidence reaches the threshold.
+    """
+
+    def __init__(self, candidates, threshold=MATCH_THRESHOLD, margin=AMBIGUITY_MARGIN):
+        if not isinstance(candidates, dict):
+            candidates = {candidate: [candidate] for candidate in candidates}
+        self.threshold = threshold
+        self.margin = margin
+        tokenized = [(candidate, _content(tokenize(phrase)))
+                     for candidate, phrases in candidates.items() for phrase in phrases]
+        tokenized = [(candidate, tokens) for candidate, tokens in tokenized if tokens]
+
+        # Document frequency per candidate, not per phrase, so aliases of one
+        # candidate don't dilute each other
+        owners = {}
+        for candidate, tokens in tokenized:
+            for token in tokens:
+                owners.setdefault(token, set()).add(candidate)
+        count = len(candidates)
+        self._phrases = [
+            _Phrase(candidate, tokens, [math.log((count + 1.0) / len(owners[token])) for token in tokens])
+            for candidate, tokens in tokenized
+        ]
+
+    def _score(self, phrase, words, items):
+        # How well each word is explained; a run-together item that matched
+        # explains all its words, so "uberx" leaves the "l" of "uber x l" over
+        explained = [max([similarity(word, token) for token in phrase.tokens] + [similarity(word, phrase.squashed)])
+                     for word in words]
+
+        def best(target):
+            score, start, end = max((similarity(target, text), start, end) for text, start, end in items)
+            for index in range(start, end):
+                explained[index] = max(explained[index], score)
+            return score
+
+        coverage = sum(weight * best(token) for token, weight in zip(phrase.tokens, phrase.weights)) / sum(phrase.weights)
+        if len(phrase.tokens) > 1:
+            # "ubergo" said as one word
+            coverage = max(coverage, best(phrase.squashed))
+        return (1.0 - PRECISION_WEIGHT) * coverage + PRECISION_WEIGHT * sum(explained) / len(words)
+
+    def scores(self, transcript):
+        """Best score per candidate, highest first."""
+        words = _content(tokenize(transcript))
+        if not words:
+            return []
+        # Adjacent words run together, so "uber x l" can match "uberxl"
+        items = [("".join(words[start:start + size]), start, start + size)
+                 for size in (1, 2, 3) for start in range(len(words) - size + 1)]
+        best = {}
+        for phrase in self._phrases:
+            score = self._score(phrase, words, items)
+            if score > best.get(phrase.candidate, -1.0):
+                best[phrase.candidate] = score
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
+
+    def best(self, transcript):
+        ranked = self.scores(transcript)
+        if not ranked:
+            return Match()
+        candidate, score = ranked[0]
+        runner_up, confidence = None, score
+        if len(ranked) > 1:
+            runner_up, second = ranked[1]
+            gap = score - second
+            if gap < self.margin:
+                confidence = score * gap / self.margin
+        return Match(candidate, score, confidence, runner_up)
+
+    def match(self, transcript):
+        result = self.best(transcript)
+        return result.candidate if result.confidence >= self.threshold else None
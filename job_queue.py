@@ -0,0 +1,371 @@
+# job_queue.py
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from jobs import (
+    Job, MAX_SESSIONS, IDEMPOTENCY_TTL, MAX_FINISHED_JOBS, OUTPUT_LINES,
+    QUEUED, RUNNING, SUCCEEDED, FAILED,
+)
+
+# With the queue on, every gunicorn worker enqueues into one SQLite file and
+# separate runner processes (job_runner.py) start the sessions
+JOB_QUEUE = os.environ.get('NOVA_JOB_QUEUE', '0') != '0'
+QUEUE_PATH = os.environ.get(
+    'NOVA_QUEUE_PATH', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'jobs.db')
+)
+# Sessions waited on, started and finished in this many seconds are used for the queue statistics
+STATS_WINDOW = float(os.environ.get('NOVA_QUEUE_STATS_WINDOW', 900))
+# How often idle runners and event streams look at the database
+POLL_INTERVAL = 0.25
+BUSY_TIMEOUT = 10
+# Runners mark themselves alive this often; a running job whose runner has
+# not been seen for RUNNER_TIMEOUT seconds is failed
+HEARTBEAT_INTERVAL = 5
+RUNNER_TIMEOUT = float(os.environ.get('NOVA_RUNNER_TIMEOUT', 30))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT,
+    state TEXT NOT NULL,
+    step TEXT,
+    steps TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    returncode INTEGER,
+    output TEXT NOT NULL DEFAULT '[]',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    runner TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (idempotency_key, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+CREATE TABLE IF NOT EXISTS runners (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+def new_runner_id():
+    """A token for one runner process. A restarted container often gives the
+    new runner its predecessor's PID, so the PID alone cannot tell them apart."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _quantile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class QueuedJob(Job):
+    """A job whose state lives in the queue database, so any process can read it."""
+
+    def __init__(self, queue, row):
+        super().__init__(row["idempotency_key"])
+        self._queue = queue
+        self._load(row)
+
+    def _load(self, row):
+        self.id = row["id"]
+        self.idempotency_key = row["idempotency_key"]
+        self.state = row["state"]
+        self.step = row["step"]
+        self.steps = json.loads(row["steps"])
+        self.error = row["error"]
+        self.returncode = row["returncode"]
+        self.output = deque(json.loads(row["output"]), maxlen=OUTPUT_LINES)
+        self.created_at = row["created_at"]
+        self.started_at = row["started_at"]
+        self.finished_at = row["finished_at"]
+
+    def refresh(self):
+        row = self._queue._row(self.id)
+        if row is not None:
+            self._load(row)
+        return self
+
+    def subscribe(self):
+        subscription = EventCursor(self._queue, self.id, self._queue.last_event(self.id))
+        # Readers take their snapshot after subscribing; make it no older than the cursor
+        self.refresh()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        pass
+
+    def publish(self, event_type, **data):
+        event = {"type": event_type, "job_id": self.id, "state": self.state}
+        event.update(data)
+        self._queue.save(self, event)
+
+
+class EventCursor:
+    """Reads one job's events from the queue database, in the order they were published."""
+
+    def __init__(self, queue, job_id, after=0, poll_interval=POLL_INTERVAL):
+        self._queue = queue
+        self.job_id = job_id
+        self.after = after
+        self.poll_interval = poll_interval
+        self._pending = deque()
+        self.dropped = 0
+
+    def get(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if not self._pending:
+                self._pending.extend(self._queue.events(self.job_id, self.after))
+            if self._pending:
+                self.after, event = self._pending.popleft()
+                return event
+            if deadline is None:
+                time.sleep(self.poll_interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+
+
+class JobQueue:
+    """Durable job queue shared by every process on the host.
+
+    Same interface as jobs.JobManager for the web app, but jobs are rows in
+    a SQLite database in WAL mode, so any gunicorn worker can enqueue, report
+    and stream any job. Runners claim jobs with claim(); at most
+    `max_running` jobs run at once across all of them. Each queue object
+    claims as its own runner, `runner`, which must send heartbeat()s while
+    its jobs run.
+    """
+
+    def __init__(self, path=QUEUE_PATH, max_running=MAX_SESSIONS, clock=time.time):
+        self.path = path
+        self.max_running = max_running
+        self.runner = new_runner_id()
+        self._clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if "runner" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            # Queue files from before runner heartbeats recorded the runner's PID
+            conn.execute("ALTER TABLE jobs ADD COLUMN runner TEXT")
+
+    def _connect(self):
+        # One connection per thread; gthread workers serve requests on many
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        # Take the write lock up front so two processes never both see a free slot
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _row(self, job_id):
+        return self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    # --- web app ---
+    def submit(self, idempotency_key=None):
+        """Returns (job, created)."""
+        now = self._clock()
+        with self._transaction() as conn:
+            if idempotency_key:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE idempotency_key = ? ORDER BY created_at DESC LIMIT 1",
+                    (idempotency_key,),
+                ).fetchone()
+                if row and (row["finished_at"] is None or now - row["finished_at"] < IDEMPOTENCY_TTL):
+                    return QueuedJob(self, row), False
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, idempotency_key, state, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, idempotency_key, QUEUED, now),
+            )
+            self._prune(conn)
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return QueuedJob(self, row), True
+
+    def get(self, job_id):
+        row = self._row(job_id)
+        return QueuedJob(self, row) if row is not None else None
+
+    def counts(self):
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for state, count in self._connect().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def events(self, job_id, after=0):
+        rows = self._connect().execute(
+            "SELECT seq, data FROM events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+        )
+        return [(seq, json.loads(data)) for seq, data in rows]
+
+    def last_event(self, job_id):
+        row = self._connect().execute("SELECT MAX(seq) FROM events WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] or 0
+
+    def _prune(self, conn):
+        stale = [row[0] for row in conn.execute(
+            "SELECT id FROM jobs WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+            (MAX_FINISHED_JOBS,),
+        )]
+        for job_id in stale:
+            conn.execute("DELETE FROM events WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    # --- runners ---
+    def heartbeat(self, runner=None):
+        """Mark `runner` (this queue's own by default) alive."""
+        with self._transaction() as conn:
+            self._beat(conn, runner or self.runner, self._clock())
+
+    def _beat(self, conn, runner, now):
+        conn.execute(
+            "INSERT INTO runners (id, started_at, seen_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET seen_at = excluded.seen_at",
+            (runner, now, now),
+        )
+
+    def runners(self):
+        """Runners seen within RUNNER_TIMEOUT, oldest first."""
+        rows = self._connect().execute(
+            "SELECT id, started_at, seen_at FROM runners WHERE seen_at >= ? ORDER BY started_at",
+            (self._clock() - RUNNER_TIMEOUT,),
+        )
+        return [dict(row) for row in rows]
+
+    def claim(self, runner=None):
+        """The oldest queued job, marked running, or None if there is none or no free slot."""
+        now = self._clock()
+        runner = runner or self.runner
+        with self._transaction() as conn:
+            self._beat(conn, runner, now)
+            self._recover(conn, now)
+            running = conn.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (RUNNING,)).fetchone()[0]
+            if running >= self.max_running:
+                return None
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE state = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, started_at = ?, runner = ? WHERE id = ?",
+                (RUNNING, now, runner, row["id"]),
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return QueuedJob(self, row)
+
+    def _recover(self, conn, now):
+        # A booking may have got as far as requesting the ride, so a job whose
+        # runner stopped sending heartbeats is failed rather than run a second time
+        conn.execute("DELETE FROM runners WHERE seen_at < ?", (now - RUNNER_TIMEOUT,))
+        live = {row["id"] for row in conn.execute("SELECT id FROM runners")}
+        for row in conn.execute("SELECT id, runner FROM jobs WHERE state = ?", (RUNNING,)).fetchall():
+            if row["runner"] not in live:
+                error = "Runner exited while the session was running"
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (FAILED, error, now, row["id"]),
+                )
+                event = {"type": "end", "job_id": row["id"], "state": FAILED, "error": error}
+                conn.execute("INSERT INTO events (job_id, data) VALUES (?, ?)", (row["id"], json.dumps(event)))
+
+    def save(self, job, event=None):
+        """Write a job's progress back, with the event it publishes."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, step = ?, steps = ?, error = ?, returncode = ?, output = ?, "
+                "started_at = ?, finished_at = ? WHERE id = ?",
+                (job.state, job.step, json.dumps(job.steps, default=str), job.error, job.returncode,
+                 json.dumps(list(job.output)), job.started_at, job.finished_at, job.id),
+            )
+            if event is not None:
+                conn.execute("INSERT INTO events (job_id, data) VALUES (?, ?)", (job.id, json.dumps(event, default=str)))
+
+    # --- statistics ---
+    def stats(self, window=STATS_WINDOW):
+        """Queue depth, wait times and throughput, for sizing the host."""
+        now = self._clock()
+        since = now - window
+        conn = self._connect()
+        counts = self.counts()
+        oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE state = ?", (QUEUED,)).fetchone()[0]
+        waits = sorted(row[0] for row in conn.execute(
+            "SELECT started_at - created_at FROM jobs WHERE started_at >= ?", (since,)
+        ))
+        finished = dict(conn.execute(
+            "SELECT state, COUNT(*) FROM jobs WHERE finished_at >= ? GROUP BY state", (since,)
+        ).fetchall())
+        return {
+            "depth": counts[QUEUED],
+            "running": counts[RUNNING],
+            "capacity": self.max_running,
+            "oldest_wait_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "wait_p50_seconds": round(_quantile(waits, 0.5), 3),
+            "wait_p95_seconds": round(_quantile(waits, 0.95), 3),
+            "started": len(waits),
+            "finished": {state: finished.get(state, 0) for state in (SUCCEEDED, FAILED)},
+            "throughput_per_minute": round(sum(finished.values()) / (window / 60.0), 3),
+            "window_seconds": window,
+        }
+
+
+def register_queue_gauges(registry, queue):
+    """Expose the queue's depth, wait times and throughput on /metrics."""
+
+    def collect():
+        # One stats() per scrape; the runners are writing to the same file
+        stats = queue.stats()
+        return {
+            "nova_queue_depth": stats["depth"],
+            "nova_queue_running": stats["running"],
+            "nova_queue_capacity": stats["capacity"],
+            "nova_queue_oldest_wait_seconds": stats["oldest_wait_seconds"],
+            "nova_queue_wait_seconds": [
+                ({"quantile": "0.5"}, stats["wait_p50_seconds"]),
+                ({"quantile": "0.95"}, stats["wait_p95_seconds"]),
+            ],
+            "nova_queue_throughput_per_minute": stats["throughput_per_minute"],
+        }
+
+    registry.register_collector(collect, {
+        "nova_queue_depth": "Nova sessions waiting for a free runner slot",
+        "nova_queue_running": "Nova sessions running across all runners",
+        "nova_queue_capacity": "Nova sessions allowed to run at the same time on this host",
+        "nova_queue_oldest_wait_seconds": "How long the oldest queued Nova session has been waiting",
+        "nova_queue_wait_seconds": "Time from enqueue to start of Nova sessions started in the stats window",
+        "nova_queue_throughput_per_minute": "Nova sessions finished per minute over the stats window",
+    })
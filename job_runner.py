@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Runner for queued Nova sessions
+
+Claims sessions that the web app's workers put on the job queue
+(NOVA_JOB_QUEUE=1) and runs them. Any number of runners can share one
+queue file; together they never run more than NOVA_MAX_SESSIONS sessions
+at once, and each job is run by exactly one of them.
+
+--stats prints the queue's depth, wait times and throughput and exits.
+--metrics-port serves this runner's session metrics (stage latencies,
+session durations) in Prometheus text format, since sessions report them
+to the runner and not to the web app.
+
+Usage:
+    python job_runner.py
+    python job_runner.py --slots 4 --metrics-port 9101
+    python job_runner.py --stats
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from jobs import MAIN_SCRIPT, JOB_TIMEOUT, MAX_SESSIONS, run_session
+from job_queue import JobQueue, QUEUE_PATH, POLL_INTERVAL, HEARTBEAT_INTERVAL
+from nova_runtime import get_runtime
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunner:
+    """Runs queued jobs on up to `slots` threads of this process."""
+
+    def __init__(self, queue, slots=None, command=None, timeout=JOB_TIMEOUT, poll_interval=POLL_INTERVAL, runtime=None,
+                 heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.queue = queue
+        self.slots = slots or queue.max_running
+        self.command = command or [sys.executable, "-u", MAIN_SCRIPT]
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.runtime = runtime
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        # Slots busy with long sessions stop claiming, so liveness has its own thread
+        heartbeat = threading.Thread(target=self._heartbeat, name="nova-runner-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        for index in range(self.slots):
+            thread = threading.Thread(target=self._slot, name=f"nova-runner-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        """Stop claiming jobs; running sessions are finished first."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _heartbeat(self):
+        while True:
+            try:
+                self.queue.heartbeat()
+            except Exception as e:
+                logger.warning(f"Could not send a runner heartbeat: {e}")
+            if self._stop.wait(self.heartbeat_interval):
+                return
+
+    def _slot(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                # Usually a lock held past the busy timeout; try again on the next poll
+                logger.warning(f"Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            logger.info(f"Claimed Nova job {job.id} after {job.started_at - job.created_at:.1f}s in the queue")
+            run_session(job, self.command, self.timeout, self.runtime)
+
+
+def serve_metrics(port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="runner-metrics", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", default=QUEUE_PATH, help="job queue database")
+    parser.add_argument("--slots", type=int, default=None, help="sessions this runner runs at once (default: NOVA_MAX_SESSIONS)")
+    parser.add_argument("--metrics-port", type=int, default=int(os.environ.get("NOVA_RUNNER_METRICS_PORT", 0)),
+                        help="serve this runner's metrics on this port")
+    parser.add_argument("--stats", action="store_true", help="print queue statistics as JSON and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    queue = JobQueue(args.queue, max_running=MAX_SESSIONS)
+    if args.stats:
+        print(json.dumps(queue.stats(), indent=2))
+        return 0
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        logger.info(f"Serving runner metrics on port {args.metrics_port}")
+    runtime = get_runtime()
+    if runtime is not None:
+        runtime.start()
+    runner = JobRunner(queue, args.slots, runtime=runtime).start()
+    logger.info(f"Nova runner {queue.runner} running up to {runner.slots} sessions from {args.queue}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        logger.info("Stopping Nova runner")
+        runner.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# jobs.py
+
+import os
+import sys
+import time
+import uuid
+import logging
+import threading
+import subprocess
+from queue import Queue
+from collections import deque, OrderedDict
+from progress import split_event
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS = int(os.environ.get('NOVA_MAX_SESSIONS', 2))
+JOB_TIMEOUT = float(os.environ.get('NOVA_JOB_TIMEOUT', 900))
+IDEMPOTENCY_TTL = float(os.environ.get('NOVA_IDEMPOTENCY_TTL', 600))
+MAX_FINISHED_JOBS = 100
+OUTPUT_LINES = 200
+SUBSCRIBER_BUFFER = 32
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Subscription:
+    """Fixed-size event buffer for one stream reader; the oldest events are
+    dropped if the reader falls behind."""
+
+    def __init__(self, maxsize=SUBSCRIBER_BUFFER):
+        self._events = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, event):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class Job:
+    def __init__(self, idempotency_key=None):
+        self.id = uuid.uuid4().hex
+        self.idempotency_key = idempotency_key
+        self.state = QUEUED
+        self.step = None
+        self.steps = []
+        self.error = None
+        self.returncode = None
+        self.output = deque(maxlen=OUTPUT_LINES)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription()
+        with self._subscribers_lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._subscribers_lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, event_type, **data):
+        event = {"type": event_type, "job_id": self.id, "state": self.state}
+        event.update(data)
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    @property
+    def finished(self):
+        # Set last, once state, returncode and error are final
+        return self.finished_at is not None
+
+    def to_dict(self, output_lines=20):
+        now = time.time()
+        started = self.started_at or now
+        return {
+            "id": self.id,
+            "state": self.state,
+            "step": self.step,
+            "steps": list(self.steps),
+            "error": self.error,
+            "returncode": self.returncode,
+            "timings": {
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "queued_seconds": round(started - self.created_at, 3),
+                "run_seconds": round((self.finished_at or now) - started, 3) if self.started_at else 0.0,
+            },
+            "output": list(self.output)[-output_lines:],
+        }
+
+
+class JobManager:
+    """Registry of Nova sessions run on a bounded worker pool.
+
+    Submissions carrying an idempotency key that was seen recently return
+    the existing job instead of launching another Chrome session.
+    """
+
+    def __init__(self, max_workers=MAX_SESSIONS, command=None, timeout=JOB_TIMEOUT, runtime=None):
+        self.command = command or [sys.executable, "-u", MAIN_SCRIPT]
+        self.timeout = timeout
+        # Forks sessions from a preloaded process instead of starting main.py
+        self.runtime = runtime
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._keys = {}
+        # Daemon workers, so a running session never blocks app shutdown
+        for index in range(max_workers):
+            worker = threading.Thread(target=self._worker, name=f"nova-job-{index}", daemon=True)
+            worker.start()
+
+    def submit(self, idempotency_key=None):
+        """Returns (job, created)."""
+        with self._lock:
+            if idempotency_key:
+                job = self._jobs.get(self._keys.get(idempotency_key))
+                if job and (not job.finished or time.time() - job.finished_at < IDEMPOTENCY_TTL):
+                    return job, False
+            job = Job(idempotency_key)
+            self._jobs[job.id] = job
+            if idempotency_key:
+                self._keys[idempotency_key] = job.id
+            self._prune()
+        self._queue.put(job)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def counts(self):
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.state] += 1
+        return counts
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+            if self._keys.get(job.idempotency_key) == job.id:
+                del self._keys[job.idempotency_key]
+
+    # --- job execution ---
+    def _worker(self):
+        while True:
+            run_session(self._queue.get(), self.command, self.timeout, self.runtime)
+
+
+def _handle_line(job, line):
+    text, event = split_event(line)
+    if text or event is None:
+        job.output.append(text)
+        logger.info(f"[job {job.id[:8]}] {text}")
+    if event is None:
+        return
+    if event.get("event") == "metric":
+        metrics.registry.observe(event["name"], event["value"], **event.get("labels", {}))
+    elif event.get("event") == "step":
+        data = {k: v for k, v in event.items() if k not in ("event", "step", "ts")}
+        job.step = event.get("step")
+        entry = {"step": job.step, "at": round(time.time() - job.started_at, 3)}
+        if data:
+            entry["data"] = data
+        job.steps.append(entry)
+        job.publish("step", **entry)
+        logger.info(f"[job {job.id[:8]}] step: {job.step}")
+
+
+def _launch(command, env, runtime):
+    if runtime is not None:
+        try:
+            return runtime.spawn(env)
+        except Exception as e:
+            logger.warning(f"Nova runtime unavailable, starting a new interpreter: {e}")
+    return subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+        env=env,
+    )
+
+
+def run_session(job, command, timeout=JOB_TIMEOUT, runtime=None):
+    """Run one Nova session for `job` and record its progress on it."""
+    job.state = RUNNING
+    job.started_at = time.time()
+    job.publish("state")
+    logger.info(f"Starting Nova job {job.id}")
+    env = dict(os.environ, NOVA_EVENTS="1", NOVA_JOB_ID=job.id, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+    try:
+        process = _launch(command, env, runtime)
+        timer = threading.Timer(timeout, _kill, args=(job, process, timeout))
+        timer.daemon = True
+        timer.start()
+        try:
+            # Stream output as it is produced instead of buffering until exit
+            for line in process.stdout:
+                _handle_line(job, line.rstrip("\n"))
+            job.returncode = process.wait()
+        finally:
+            timer.cancel()
+        if job.returncode == 0:
+            job.state = SUCCEEDED
+        else:
+            job.state = FAILED
+            job.error = job.error or f"Nova process exited with code {job.returncode}"
+    except Exception as e:
+        logger.exception(f"Error running Nova job {job.id}: {e}")
+        job.state = FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = time.time()
+        metrics.registry.observe("nova_job_duration_seconds", job.finished_at - job.started_at)
+        metrics.registry.inc("nova_jobs_total", state=job.state)
+        job.publish("end", error=job.error)
+        logger.info(f"Nova job {job.id} finished: {job.state}")
+
+
+def _kill(job, process, timeout):
+    job.error = f"Timed out after {timeout:.0f}s"
+    logger.warning(f"Nova job {job.id} timed out, terminating")
+    process.kill()
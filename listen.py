@@ -1,13 +1,13 @@
 import speech_recognition as sr
+from audio_session import get_audio_session
+from metrics import timed
 
+@timed("stt")
 def listen():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("🎙️ Listening...")
-        audio = recognizer.listen(source, timeout=5, phrase_time_limit=7)
-
+    session = get_audio_session()
+    print("🎙️ Listening...")
     try:
-        text = recognizer.recognize_google(audio)
+        text = session.transcribe(timeout=5, phrase_time_limit=7)
         print(f"🗣️ You said: {text}")
         return text
     except sr.UnknownValueError:
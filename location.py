@@ -1,9 +1,34 @@
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from waits import wait_for_element, wait_for_dom_quiet
+from locator import find_first
+from options import RIDE_OPTION_SELECTOR
+from places import get_place_store, typed_text
+from selector_stats import LastResort
+import progress
+
+# Clicks a suggestion and returns its text in the same round trip
+SELECT_SUGGESTION_JS = """
+arguments[0].scrollIntoView({block: 'center'});
+arguments[0].click();
+return arguments[0].innerText;
+"""
+
+def choose_suggestion(driver, selectors, remembered=None):
+    """The suggestion picked for this place before if it is listed, else the first one"""
+    if remembered:
+        option = find_first(driver, selectors, text=[remembered], step="location.suggestion")
+        if option:
+            return option
+    return find_first(driver, selectors, step="location.suggestion")
+
+def recall_place(places, spoken):
+    """Returns (suggestion remembered for the place or None, text to type)"""
+    remembered = places.lookup(spoken)
+    if remembered:
+        print(f"📍 Using saved place for '{spoken}': {typed_text(remembered)}")
+        return remembered, typed_text(remembered)
+    return None, spoken
 
 def get_valid_location(prompt, nova_speak, nova_listen, retries=3):
     """Repeat prompt until user gives valid input or retries run out"""
@@ -17,12 +42,26 @@ def get_valid_location(prompt, nova_speak, nova_listen, retries=3):
     nova_speak("I'm sorry, I couldn't understand the location.")
     return None
 
-def enter_location_details(driver, nova_speak, nova_listen):
-    wait = WebDriverWait(driver, 30)  # Increased timeout
+def enter_location_details(driver, nova_speak, nova_listen, pickup_location=None, destination=None, places=None):
+    """Fill in pickup and destination and wait for the ride options.
+
+    Locations already collected by the caller are used as-is; missing ones
+    are asked for once the booking UI is open. Places booked before are
+    typed as the suggestion picked last time, which is then selected
+    directly; the suggestions picked are remembered once ride options load.
+    """
+    if places is None:
+        places = get_place_store()
 
     try:
-        # Wait for page to fully load
-        time.sleep(5)
+        # Wait for the home page or the booking flow to render
+        wait_for_element(
+            driver,
+            ["//button[contains(., 'Where to')]", '[data-testid="pudo-button-pickup"]', 'input'],
+            timeout=15,
+            label="location.page_ready",
+            replaced=5,
+        )
         
         # Check if we're on the home page or already in the ride booking flow
         try:
@@ -31,16 +70,24 @@ def enter_location_details(driver, nova_speak, nova_listen):
             if where_to_buttons:
                 print("✅ Found 'Where to?' button on home page")
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", where_to_buttons[0])
-                time.sleep(1)
                 driver.execute_script("arguments[0].click();", where_to_buttons[0])
-                time.sleep(3)  # Wait for the ride booking interface to load
+                # Wait for the ride booking interface to load
+                wait_for_element(
+                    driver,
+                    ['[data-testid="pudo-button-pickup"]', '[data-testid="pickup-button"]', 'input'],
+                    timeout=10,
+                    label="location.booking_ui",
+                    replaced=3,
+                )
         except Exception as e:
             print(f"Note: No 'Where to?' button found, might already be in booking flow: {e}")
         
         # 🚕 Step 1: Ask for Pickup Location with retries
-        pickup_location = get_valid_location("Where should I pick you up from?", nova_speak, nova_listen)
+        if not pickup_location:
+            pickup_location = get_valid_location("Where should I pick you up from?", nova_speak, nova_listen)
         if not pickup_location:
             return
+        pickup_remembered, pickup_text = recall_place(places, pickup_location)
 
         # Step 2: Find and click the pickup button with multiple selectors
         pickup_selectors = [
@@ -52,19 +99,7 @@ def enter_location_details(driver, nova_speak, nova_listen):
             '//div[contains(@class, "pickup")]'
         ]
         
-        pickup_button = None
-        for selector in pickup_selectors:
-            try:
-                if selector.startswith('//'):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if elements:
-                    pickup_button = elements[0]
-                    break
-            except:
-                continue
+        pickup_button = find_first(driver, pickup_selectors, step="location.pickup_button")
         
         # If no pickup button found, look for the input field directly
         input_selectors = [
@@ -73,60 +108,58 @@ def enter_location_details(driver, nova_speak, nova_listen):
             'input[placeholder="Enter pickup location"]',
             'input[aria-label*="Pickup"]',
             '[data-testid="pickup-input"]',
-            'input[placeholder*="Where"]',  # Sometimes the first input is just "Where"
-            'input',  # Last resort: try any input field
+            LastResort('input[placeholder*="Where"]'),  # Sometimes the first input is just "Where"
+            LastResort('input'),  # Last resort: try any input field
         ]
         
-        input_box = None
+        suggestion_selectors = [
+            '[role="option"]',
+            '[data-testid*="suggestion"]',
+            '.autocomplete-result',
+            '//div[contains(@class, "suggestion")]',
+            '//li[contains(@class, "suggestion")]',
+            LastResort('//div[contains(@class, "autocomplete")]'),
+            LastResort('//div[contains(@class, "result")]')
+        ]
         
         # If pickup button found, click it first
         if pickup_button:
             # Scroll to button and click
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", pickup_button)
-            time.sleep(1)
             driver.execute_script("arguments[0].click();", pickup_button)
             print("✅ Pickup button clicked!")
-            time.sleep(2)  # Wait for input field to appear
+            # Wait for input field to appear
+            wait_for_element(driver, input_selectors, timeout=5, label="location.pickup_input", replaced=2,
+                             step="location.pickup_input")
             
             # Now look for the input field
-            for selector in input_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        input_box = elements[0]
-                        break
-                except:
-                    continue
+            input_box = find_first(driver, input_selectors, step="location.pickup_input")
         else:
             # If no pickup button, try to find input field directly
             print("⚠️ Could not find pickup button, looking for input field directly")
             
             # Try to find any input field
-            for selector in input_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        input_box = elements[0]
-                        break
-                except:
-                    continue
+            input_box = find_first(driver, input_selectors, step="location.pickup_input")
         
         # If input box found, enter location
         if input_box:
             # Clear any existing text and enter new location
             input_box.clear()
-            input_box.send_keys(pickup_location)
-            print(f"✅ Pickup location entered: {pickup_location}")
-            time.sleep(3)  # Increased wait time for suggestions to load
+            input_box.send_keys(pickup_text)
+            print(f"✅ Pickup location entered: {pickup_text}")
+            # Wait for suggestions to load
+            wait_for_element(driver, suggestion_selectors, timeout=8, label="location.pickup_suggestions", replaced=3,
+                             step="location.suggestion")
         else:
             # Last resort: try to find any input field
             try:
                 inputs = driver.find_elements(By.TAG_NAME, "input")
                 if inputs:
                     inputs[0].clear()
-                    inputs[0].send_keys(pickup_location)
-                    print(f"✅ Pickup location entered in first available input: {pickup_location}")
-                    time.sleep(3)
+                    inputs[0].send_keys(pickup_text)
+                    print(f"✅ Pickup location entered in first available input: {pickup_text}")
+                    wait_for_element(driver, suggestion_selectors, timeout=8, label="location.pickup_suggestions", replaced=3,
+                                     step="location.suggestion")
                 else:
                     print("⚠️ Could not find any input field")
                     nova_speak("I couldn't find where to enter the pickup location. Please try manually.")
@@ -136,36 +169,13 @@ def enter_location_details(driver, nova_speak, nova_listen):
                 nova_speak("I couldn't find where to enter the pickup location. Please try manually.")
                 return
 
-        # Step 4: Select the first suggestion with multiple selectors
-        suggestion_selectors = [
-            '[role="option"]',
-            '[data-testid*="suggestion"]',
-            '.autocomplete-result',
-            '//div[contains(@class, "suggestion")]',
-            '//li[contains(@class, "suggestion")]',
-            '//div[contains(@class, "autocomplete")]',
-            '//div[contains(@class, "result")]'
-        ]
-        
-        first_option = None
-        for selector in suggestion_selectors:
-            try:
-                if selector.startswith('//'):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if elements:
-                    first_option = elements[0]
-                    break
-            except:
-                continue
+        # Step 4: Select the remembered or the first suggestion
+        first_option = choose_suggestion(driver, suggestion_selectors, pickup_remembered)
+        picked_pickup = None
         
         if first_option:
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", first_option)
-            time.sleep(1)
-            driver.execute_script("arguments[0].click();", first_option)
-            print("✅ First pickup suggestion selected")
+            picked_pickup = driver.execute_script(SELECT_SUGGESTION_JS, first_option)
+            print("✅ Pickup suggestion selected")
         else:
             print("⚠️ No pickup suggestions found, trying to continue")
             # Try pressing Enter key as fallback
@@ -177,25 +187,13 @@ def enter_location_details(driver, nova_speak, nova_listen):
             
             # Additional fallback: try clicking any visible button that might confirm the location
             try:
-                buttons = driver.find_elements(By.TAG_NAME, "button")
-                for button in buttons:
-                    if button.is_displayed():
-                        button_text = button.text.lower()
-                        if "confirm" in button_text or "next" in button_text or "continue" in button_text:
-                            driver.execute_script("arguments[0].click();", button)
-                            print(f"✅ Clicked fallback button: {button_text}")
-                            break
+                button = find_first(driver, ["button"], visible=True, text=["confirm", "next", "continue"])
+                if button:
+                    driver.execute_script("arguments[0].click();", button)
+                    print(f"✅ Clicked fallback button: {button.text.lower()}")
             except Exception as e:
                 print(f"Note: Could not find fallback button: {e}")
 
-        # Wait for destination input to appear
-        time.sleep(5)  # Increased wait time
-        
-        # 🛬 Step 5: Ask for Destination with retries
-        destination = get_valid_location("Where are you going?", nova_speak, nova_listen)
-        if not destination:
-            return
-
         # Step 6: Enter destination with multiple selectors
         dest_selectors = [
             'input[placeholder="Dropoff location"]',
@@ -204,7 +202,7 @@ def enter_location_details(driver, nova_speak, nova_listen):
             'input[placeholder*="destination"]',
             'input[aria-label*="Destination"]',
             '[data-testid="destination-input"]',
-            'input:not([value])'  # Try any empty input field
+            LastResort('input:not([value])')  # Try any empty input field
         ]
         
         # First check if we need to click a destination button
@@ -217,60 +215,45 @@ def enter_location_details(driver, nova_speak, nova_listen):
             '//button[contains(@class, "destination")]'
         ]
         
-        dest_button = None
-        for selector in dest_button_selectors:
-            try:
-                if selector.startswith('//'):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if elements:
-                    dest_button = elements[0]
-                    break
-            except:
-                continue
+        progress.step("pickup_entered", pickup=pickup_location)
+
+        # Wait for destination input to appear
+        wait_for_element(
+            driver,
+            dest_button_selectors + dest_selectors,
+            timeout=10,
+            label="location.destination_ready",
+            replaced=5,
+        )
+        
+        # 🛬 Step 5: Ask for Destination with retries
+        if not destination:
+            destination = get_valid_location("Where are you going?", nova_speak, nova_listen)
+        if not destination:
+            return
+        destination_remembered, destination_text = recall_place(places, destination)
+
+        dest_button = find_first(driver, dest_button_selectors, step="location.destination_button")
         
         if dest_button:
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dest_button)
-            time.sleep(1)
             driver.execute_script("arguments[0].click();", dest_button)
             print("✅ Destination button clicked!")
-            time.sleep(2)  # Wait for input field to appear
+            # Wait for input field to appear
+            wait_for_element(driver, dest_selectors, timeout=5, label="location.destination_input", replaced=2,
+                             step="location.destination_input")
         
-        # Now look for the destination input field
-        destination_box = None
-        for selector in dest_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    # Find the first visible and enabled input
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            destination_box = element
-                            break
-                    if destination_box:
-                        break
-            except:
-                continue
+        # Now look for the first visible and enabled destination input field
+        destination_box = find_first(driver, dest_selectors, visible=True, enabled=True, step="location.destination_input")
         
         # If still not found, try to find any input field that's not the pickup field
         if not destination_box:
             try:
-                inputs = driver.find_elements(By.TAG_NAME, "input")
-                for inp in inputs:
-                    try:
-                        if inp.is_displayed() and inp.is_enabled():
-                            # Check if this is not the same as the pickup input
-                            if input_box and inp != input_box:
-                                destination_box = inp
-                                break
-                            # If we don't have a reference to the pickup input, use the second input
-                            elif inputs.index(inp) > 0:
-                                destination_box = inp
-                                break
-                    except:
-                        continue
+                if input_box:
+                    destination_box = find_first(driver, ["input"], visible=True, enabled=True, exclude=[input_box])
+                else:
+                    # If we don't have a reference to the pickup input, use the second input
+                    destination_box = find_first(driver, ["(//input)[position() > 1]"], visible=True, enabled=True)
             except Exception as e:
                 print(f"Note: Error finding alternative destination input: {e}")
         
@@ -283,7 +266,7 @@ def enter_location_details(driver, nova_speak, nova_listen):
                     # Click on the element to potentially reveal the input field
                     driver.execute_script("arguments[0].click();", potential_elements[0])
                     print(f"✅ Clicked on potential destination element: {potential_elements[0].text}")
-                    time.sleep(2)
+                    wait_for_element(driver, ['input'], timeout=5, label="location.destination_input", replaced=2)
                     
                     # Try to find input fields again
                     inputs = driver.find_elements(By.TAG_NAME, "input")
@@ -299,15 +282,10 @@ def enter_location_details(driver, nova_speak, nova_listen):
             try:
                 # Try clicking in the center of the page to activate any hidden input
                 driver.execute_script("document.elementFromPoint(window.innerWidth/2, window.innerHeight/2).click();")
-                time.sleep(1)
+                wait_for_dom_quiet(driver, timeout=2, label="location.center_click", replaced=1)
                 
                 # Check for any newly appeared inputs
-                inputs = driver.find_elements(By.TAG_NAME, "input")
-                if inputs:
-                    for inp in inputs:
-                        if inp.is_displayed() and inp.is_enabled():
-                            destination_box = inp
-                            break
+                destination_box = find_first(driver, ["input"], visible=True, enabled=True)
             except Exception as e:
                 print(f"Note: Error with last resort destination detection: {e}")
         
@@ -318,9 +296,11 @@ def enter_location_details(driver, nova_speak, nova_listen):
             except:
                 pass  # Some inputs can't be cleared
             
-            destination_box.send_keys(destination)
-            print(f"✅ Destination entered: {destination}")
-            time.sleep(3)  # Increased wait time for suggestions to load
+            destination_box.send_keys(destination_text)
+            print(f"✅ Destination entered: {destination_text}")
+            # Wait for suggestions to load
+            wait_for_element(driver, suggestion_selectors, timeout=8, label="location.destination_suggestions", replaced=3,
+                             step="location.suggestion")
         else:
             # Try to find any clickable element that might lead to destination input
             try:
@@ -329,15 +309,16 @@ def enter_location_details(driver, nova_speak, nova_listen):
                 if elements:
                     driver.execute_script("arguments[0].click();", elements[0])
                     print(f"✅ Clicked on potential destination button: {elements[0].text}")
-                    time.sleep(2)
+                    wait_for_element(driver, ['input'], timeout=5, label="location.destination_input", replaced=2)
                     
                     # Try one more time to find the input
                     inputs = driver.find_elements(By.TAG_NAME, "input")
                     if inputs:
                         destination_box = inputs[0]
-                        destination_box.send_keys(destination)
-                        print(f"✅ Destination entered after button click: {destination}")
-                        time.sleep(3)
+                        destination_box.send_keys(destination_text)
+                        print(f"✅ Destination entered after button click: {destination_text}")
+                        wait_for_element(driver, suggestion_selectors, timeout=8, label="location.destination_suggestions", replaced=3,
+                                         step="location.suggestion")
                     else:
                         print("⚠️ Still could not find destination input field")
                         nova_speak("I couldn't find where to enter the destination. Please try manually.")
@@ -351,25 +332,12 @@ def enter_location_details(driver, nova_speak, nova_listen):
                 nova_speak("I couldn't find where to enter the destination. Please try manually.")
                 return
 
-        # Step 7: Select the first destination suggestion with multiple selectors
-        dest_suggestion = None
-        for selector in suggestion_selectors:  # Reuse the same selectors as for pickup
-            try:
-                if selector.startswith('//'):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if elements:
-                    dest_suggestion = elements[0]
-                    break
-            except:
-                continue
+        # Step 7: Select the remembered or the first destination suggestion
+        dest_suggestion = choose_suggestion(driver, suggestion_selectors, destination_remembered)
+        picked_destination = None
         
         if dest_suggestion:
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dest_suggestion)
-            time.sleep(1)
-            driver.execute_script("arguments[0].click();", dest_suggestion)
+            picked_destination = driver.execute_script(SELECT_SUGGESTION_JS, dest_suggestion)
             print("✅ Destination suggestion selected")
         else:
             print("⚠️ No destination suggestions found, trying to continue")
@@ -382,19 +350,20 @@ def enter_location_details(driver, nova_speak, nova_listen):
             
             # Additional fallback: try clicking any visible button that might confirm the location
             try:
-                buttons = driver.find_elements(By.TAG_NAME, "button")
-                for button in buttons:
-                    if button.is_displayed():
-                        button_text = button.text.lower()
-                        if "confirm" in button_text or "next" in button_text or "continue" in button_text or "search" in button_text:
-                            driver.execute_script("arguments[0].click();", button)
-                            print(f"✅ Clicked fallback button: {button_text}")
-                            break
+                button = find_first(driver, ["button"], visible=True, text=["confirm", "next", "continue", "search"])
+                if button:
+                    driver.execute_script("arguments[0].click();", button)
+                    print(f"✅ Clicked fallback button: {button.text.lower()}")
             except Exception as e:
                 print(f"Note: Could not find fallback button: {e}")
 
+        progress.step("destination_entered", destination=destination)
+
         # Wait for ride options to load
-        time.sleep(5)
+        if wait_for_element(driver, [RIDE_OPTION_SELECTOR], timeout=15, label="location.ride_options", replaced=5):
+            # Uber accepted the route, so these are the places the user meant
+            places.remember(pickup_location, picked_pickup)
+            places.remember(destination, picked_destination)
         nova_speak("Locations entered successfully.")
 
     except Exception as e:
@@ -0,0 +1,83 @@
+# locator.py
+
+import time
+from selector_stats import get_selector_stats
+
+# Defines novaFind(selectors, opts), which walks an ordered list of CSS/XPath
+# selectors inside the page and returns [element, selectorIndex] for the
+# first element passing the filters, or null.
+FIND_FN_JS = """
+function novaVisible(el) {
+    if (!el.getClientRects().length) return false;
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+function novaQuery(sel) {
+    if (sel.charAt(0) === '/' || sel.charAt(0) === '(') {
+        var snap = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var out = [];
+        for (var i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+        return out;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(sel));
+}
+function novaFind(selectors, opts) {
+    opts = opts || {};
+    var text = (opts.text || []).map(function (t) { return t.toLowerCase(); });
+    var exclude = opts.exclude || [];
+    for (var i = 0; i < selectors.length; i++) {
+        var els;
+        try { els = novaQuery(selectors[i]); } catch (e) { continue; }
+        for (var j = 0; j < els.length; j++) {
+            var el = els[j];
+            if (exclude.indexOf(el) !== -1) continue;
+            if (opts.visible && !novaVisible(el)) continue;
+            if (opts.enabled && el.disabled) continue;
+            if (text.length) {
+                var content = (el.innerText || el.value || '').toLowerCase();
+                if (!text.some(function (t) { return content.indexOf(t) !== -1; })) continue;
+            }
+            return [el, i];
+        }
+    }
+    return null;
+}
+"""
+
+LOCATE_JS = FIND_FN_JS + "return novaFind(arguments[0], arguments[1]);"
+
+
+def locator_options(visible=False, enabled=False, text=None, exclude=None):
+    options = {"visible": visible, "enabled": enabled}
+    if text:
+        options["text"] = list(text)
+    if exclude:
+        options["exclude"] = [element for element in exclude if element is not None]
+    return options
+
+
+def locate(driver, selectors, visible=False, enabled=False, text=None, exclude=None, step=None):
+    """Resolve an ordered selector list in one round trip.
+
+    Returns (element, selector) for the first match, or (None, None). Invalid
+    selectors are skipped in the page; WebDriver errors propagate. With a
+    `step` name the selectors are tried in the order learned for that step
+    (see selector_stats) and which one matched is recorded.
+    """
+    selectors = list(selectors)
+    if step:
+        stats = get_selector_stats()
+        selectors = stats.order(step, selectors)
+        started = time.monotonic()
+    match = driver.execute_script(LOCATE_JS, selectors, locator_options(visible, enabled, text, exclude))
+    index = int(match[1]) if match else None
+    if step:
+        stats.record(step, selectors, index, time.monotonic() - started)
+    if index is None:
+        return None, None
+    return match[0], selectors[index]
+
+
+def find_first(driver, selectors, visible=False, enabled=False, text=None, exclude=None, step=None):
+    element, _ = locate(driver, selectors, visible, enabled, text, exclude, step)
+    return element
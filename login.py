@@ -1,20 +1,20 @@
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-import time
+from waits import wait_for_element, wait_for_page_ready, wait_until
+from locator import find_first, locate
+from session_store import take_restored, save_session
+from pipeline import Urgent
+import progress
+
+LOGIN_BUTTON_XPATH = "//button[contains(text(), 'Log in') or contains(text(), 'Login')]"
+PROFILE_SELECTOR = "[data-testid='header-account-button']"
 
 # === Check if user is already logged in ===
 def is_logged_in(driver):
     try:
-        # Try to find login button - if present, user is NOT logged in
-        # Updated selector to be more robust
-        login_elements = driver.find_elements(By.XPATH, "//button[contains(text(), 'Log in') or contains(text(), 'Login')]")
-        if login_elements:
+        # Look for the login button (NOT logged in) and the profile icon
+        # (logged in) in a single round trip; the login button wins
+        _, selector = locate(driver, [LOGIN_BUTTON_XPATH, PROFILE_SELECTOR])
+        if selector == LOGIN_BUTTON_XPATH:
             return False
-        
-        # Alternative check: look for profile icon which indicates logged in state
-        profile_elements = driver.find_elements(By.CSS_SELECTOR, "[data-testid='header-account-button']") 
-        if profile_elements:
-            return True
             
         return True  # Default to assuming logged in if no login button found
     except Exception as e:
@@ -23,14 +23,32 @@ def is_logged_in(driver):
 
 # === Click login button if needed ===
 def click_login_button(driver, speak_func):
-    # Wait for page to fully load
-    time.sleep(5)
+    # A fresh session snapshot was injected before the page first loaded
+    if take_restored(driver):
+        speak_func("You're already logged in. Skipping login.")
+        progress.step("logged_in", restored=True)
+        return
+
+    # Wait until the page has rendered either the login button or a logged-in header
+    # With the eager load strategy, images may still be loading; the header wait below is what matters
+    wait_for_page_ready(driver, label="login.page_ready", states=("interactive", "complete"))
+    wait_for_element(
+        driver,
+        [LOGIN_BUTTON_XPATH, PROFILE_SELECTOR, "//button[contains(., 'Where to')]"],
+        timeout=10,
+        label="login.header_rendered",
+        replaced=5,
+    )
     
     if is_logged_in(driver):
         speak_func("You're already logged in. Skipping login.")
+        progress.step("logged_in")
+        # Keep the snapshot ahead of cookies the site rotates
+        save_session(driver)
         return
 
-    speak_func("It looks like you're not logged in yet. Attempting to log in.")
+    # The user has to act while Chrome waits, so these can't wait for the dialogue
+    speak_func(Urgent("It looks like you're not logged in yet. Attempting to log in."))
 
     try:
         # Try multiple selectors to find login button
@@ -41,39 +59,26 @@ def click_login_button(driver, speak_func):
             "[data-testid='header-login-button']"
         ]
         
-        login_btn = None
-        for selector in login_selectors:
-            try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if elements:
-                    login_btn = elements[0]
-                    break
-            except:
-                continue
+        login_btn = find_first(driver, login_selectors, step="login.button")
         
         if login_btn:
             # Scroll to button and click
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", login_btn)
-            time.sleep(1)
             driver.execute_script("arguments[0].click();", login_btn)
             print("✅ Login button clicked!")
-            speak_func("Please complete the login process manually.")
+            speak_func(Urgent("Please complete the login process manually."))
         else:
             print("⚠️ Could not find login button")
-            speak_func("I couldn't find the login button. Please try to log in manually.")
+            speak_func(Urgent("I couldn't find the login button. Please try to log in manually."))
     except Exception as e:
         print(f"⚠️ Failed to click login button: {e}")
-        speak_func("Couldn't click the login button. Please try manually.")
+        speak_func(Urgent("Couldn't click the login button. Please try manually."))
 
     # Wait for manual login
-    for i in range(60):
-        if is_logged_in(driver):
-            speak_func("Login detected. You're now logged in.")
-            return
-        time.sleep(2)
+    if wait_until(driver, is_logged_in, timeout=120, label="login.manual", poll=1):
+        speak_func("Login detected. You're now logged in.")
+        progress.step("logged_in")
+        save_session(driver, force=True)
+        return
 
-    speak_func("Login not detected within time. Please try again.")
+    speak_func(Urgent("Login not detected within time. Please try again."))
@@ -1,48 +1,35 @@
 # main.py
 
-from gtts import gTTS
 import speech_recognition as sr
 import datetime
 import random
 import os
-import getpass
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-# playsound is imported conditionally in nova_speak function
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import sys
+from driver_pool import get_pool, is_production
+from waits import print_wait_report
+from selector_stats import print_selector_report
+from tts_cache import start_prerender
+from speech_output import get_speech_output
+from audio_session import get_audio_session
+import progress
+from metrics import span, timed
 from login import click_login_button
-from location import enter_location_details
+from location import enter_location_details, get_valid_location
 from options import read_ride_options
 from confirm_and_request import confirm_and_request_ride
+from pipeline import Lane, DeferredSpeech
+from wake_word import get_wake_spotter, is_wake_phrase
+from fuzzy_match import FuzzyMatcher
 
 
 # === Speak Function ===
 def nova_speak(text):
     print(f"\n🔊 Nova: {text}")
-    # Check if we're in a production environment
-    if os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true':
-        # In production, just print the text
-        return
-    else:
-        # In development, use text-to-speech
-        try:
-            # Only import playsound in development environment
-            try:
-                from playsound import playsound
-                tts = gTTS(text=text, lang='en')
-                filename = f"nova_{random.randint(1000,9999)}.mp3"
-                tts.save(filename)
-                playsound(filename)
-                os.remove(filename)
-            except ImportError:
-                # If playsound is not available, just print the text
-                print(f"Text-to-speech not available: {text}")
-        except Exception as e:
-            print(f"Text-to-speech error: {e}")
-            # Continue execution even if TTS fails
+    # Queued for playback in the background; in production nothing is played
+    return get_speech_output().say(text)
 
 # === Listen Function ===
+@timed("stt")
 def nova_listen():
     # Check if we're in a production environment
     if os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true':
@@ -51,23 +38,22 @@ def nova_listen():
         return "book a cab"
     
     try:
-        recognizer = sr.Recognizer()
+        # The shared session keeps the microphone open and calibrated between turns
+        session = get_audio_session()
         try:
-            with sr.Microphone() as mic:
-                print("🎙️ Listening...")
-                recognizer.adjust_for_ambient_noise(mic)
-                try:
-                    audio = recognizer.listen(mic, timeout=8, phrase_time_limit=10)
-                    query = recognizer.recognize_google(audio, language='en-IN')
-                    print(f"🗣️ You said: {query}")
-                    return query.lower()
-                except sr.WaitTimeoutError:
-                    print("⏱️ No response detected.")
-                    return ""
-                except Exception as e:
-                    print(f"Speech recognition error: {e}")
-                    nova_speak("Sorry, I didn't understand.")
-                    return ""
+            session.open()
+            print("🎙️ Listening...")
+            try:
+                query = session.transcribe(timeout=8, phrase_time_limit=10, language='en-IN')
+                print(f"🗣️ You said: {query}")
+                return query.lower()
+            except sr.WaitTimeoutError:
+                print("⏱️ No response detected.")
+                return ""
+            except Exception as e:
+                print(f"Speech recognition error: {e}")
+                nova_speak("Sorry, I didn't understand.")
+                return ""
         except Exception as e:
             print(f"Microphone initialization error: {e}")
             return "book a cab"  # Default response when microphone initialization fails
@@ -95,82 +81,76 @@ def nova_intro():
     nova_speak(random.choice(messages))
 
 # === Sleep Mode ===
+def wait_for_wake_word():
+    # The spotter only sends voiced audio to a recognizer; fall back to
+    # full transcription of every phrase if the microphone stream fails
+    try:
+        get_wake_spotter().wait()
+        return
+    except Exception as e:
+        print(f"Note: Wake word spotter unavailable, listening for full phrases: {e}")
+    while not is_wake_phrase(nova_listen()):
+        pass
+
 def sleep_mode():
     nova_speak("Entering sleep mode. Say 'wake up Nova' when you're ready.")
-    while True:
-        cmd = nova_listen()
-        if "wake up nova" in cmd or ("wake" in cmd and "nova" in cmd):
-            nova_speak("Nova is awake and ready.")
-            break
+    wait_for_wake_word()
+    nova_speak("Nova is awake and ready.")
+
+# === Browser Lane: Driver Checkout and Login ===
+def prepare_browser(pool, speak_func):
+    with span("driver_checkout"):
+        driver = pool.checkout()
+    try:
+        progress.step("driver_ready")
+        with span("login"):
+            click_login_button(driver, speak_func)
+    except BaseException:
+        pool.release(driver)
+        raise
+    return driver
 
 # === Open Uber Mobile Website with Persistence ===
 def open_uber_with_persistence():
     nova_speak("Opening Uber mobile website. Please wait...")
 
     try:
-        # Configure Chrome options for headless operation in production
-        options = uc.ChromeOptions()
-        options.add_argument(
-            "user-agent=Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
-            "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 "
-            "Mobile/15E148 Safari/604.1"
-        )
-        
-        # Add headless mode for production environment
-        if os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true':
+        if is_production:
             print("🤖 Running in headless mode for production environment")
-            options.add_argument('--headless')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--window-size=420,900')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-setuid-sandbox')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--disable-features=VizDisplayCompositor')
-            options.add_argument('--ignore-certificate-errors')
-        else:
-            # For local development, use persistent profile
-            username = getpass.getuser()
-            custom_profile = f"C:\\Users\\{username}\\clova-mobile-profile"
-            options.add_argument(f"--user-data-dir={custom_profile}")
-            options.add_argument("--profile-directory=Profile1")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
 
         try:
-            # Initialize Chrome driver with more flexible version handling
-            print("Initializing Chrome driver...")
+            # Launch or check out Chrome and log in on one lane while the
+            # trip details are collected on this one
+            pool = get_pool()
+            browser_speech = DeferredSpeech(nova_speak)
+            browser = Lane("browser", prepare_browser, pool, browser_speech).start()
+
+            with span("dialogue"):
+                pickup = get_valid_location("Where should I pick you up from?", nova_speak, nova_listen)
+                destination = None
+                if pickup:
+                    destination = get_valid_location("Where are you going?", nova_speak, nova_listen)
+
+            try:
+                driver = browser.result()
+            finally:
+                # Say what the browser lane held back, even if it failed
+                browser_speech.flush()
             try:
-                # Try with specific version first
-                driver = uc.Chrome(version_main=138, options=options)
-            except Exception as version_error:
-                print(f"Error with specific Chrome version: {version_error}")
-                # Fall back to automatic version detection
-                driver = uc.Chrome(options=options)
-                
-            # Set window size if not already set in options
-            if os.environ.get('RAILWAY_ENVIRONMENT') != 'production' and os.environ.get('RENDER') != 'true':
-                driver.set_window_size(420, 900)
-
-            # Open Uber mobile site with retry logic
-            print("Opening Uber mobile site...")
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    driver.get("https://m.uber.com/go/home")
-                    break
-                except Exception as page_error:
-                    if attempt < max_retries - 1:
-                        print(f"Error loading page (attempt {attempt+1}): {page_error}. Retrying...")
-                    else:
-                        raise
-
-            # Execute the Uber flow
-            click_login_button(driver, nova_speak)
-            enter_location_details(driver, nova_speak, nova_listen)
-            read_ride_options(driver)
-            confirm_and_request_ride(driver)
+                if not (pickup and destination):
+                    return
+                # Execute the rest of the Uber flow with the answers in hand
+                with span("location_entry"):
+                    enter_location_details(driver, nova_speak, nova_listen, pickup, destination)
+                with span("ride_selection"):
+                    read_ride_options(driver)
+                with span("confirm_request"):
+                    confirm_and_request_ride(driver)
+                progress.step("booking_finished")
+            finally:
+                pool.release(driver)
+            print_wait_report()
+            print_selector_report()
             
         except Exception as driver_error:
             print(f"⚠️ Chrome driver error: {driver_error}")
@@ -180,21 +160,30 @@ def open_uber_with_persistence():
         print(f"⚠️ Error in open_uber_with_persistence: {e}")
         nova_speak("Failed to open Uber mobile website.")
         # In production, we want to see the full error details
-        if os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true':
+        if is_production:
             import traceback
             traceback.print_exc()
 
 
 # === Command Handler ===
+COMMANDS = {
+    "introduce": ["introduce", "introduce yourself", "who are you"],
+    "sleep": ["sleep", "go to sleep"],
+    "exit": ["exit", "quit", "goodbye"],
+    "book": ["book a cab", "book a ride", "open uber"],
+}
+command_matcher = FuzzyMatcher(COMMANDS)
+
 def handle_command(cmd):
-    if "introduce" in cmd or "who are you" in cmd:
+    command = command_matcher.match(cmd)
+    if command == "introduce":
         nova_intro()
-    elif "sleep" in cmd:
+    elif command == "sleep":
         sleep_mode()
-    elif "exit" in cmd or "quit" in cmd:
+    elif command == "exit":
         nova_speak("Goodbye. Nova signing off.")
         return False
-    elif "book a cab" in cmd or "open uber" in cmd:
+    elif command == "book":
         open_uber_with_persistence()
     else:
         nova_speak("I didn't catch that.")
@@ -202,27 +191,34 @@ def handle_command(cmd):
 
 # === Assistant Loop ===
 def nova_loop():
+    # Start launching Chrome in the background so the first booking finds it warm
+    get_pool().start()
+    if not is_production:
+        # Render the fixed prompts while Nova waits for the wake phrase
+        start_prerender()
+        get_audio_session().open_in_background()
     nova_speak("Nova is standing by. Say 'wake up Nova' to begin.")
-    awake = False
 
     # In production, skip the wake-up command
-    if os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true':
-        awake = True
-        nova_speak(get_time_greeting())
+    if not is_production:
+        wait_for_wake_word()
+    nova_speak(get_time_greeting())
 
     while True:
         command = nova_listen()
-        if not awake:
-            if "wake up nova" in command or ("wake" in command and "nova" in command):
-                awake = True
-                nova_speak(get_time_greeting())
-                continue
-            else:
-                continue
-
         if not handle_command(command):
             break
 
+# === Session Entry ===
+def run_session():
+    """Run one Nova session and return its exit code.
+
+    Chrome, prerendering and the microphone are only started from here, so
+    nova_runtime.py can import this module once and fork it per session.
+    """
+    nova_loop()
+    return 0
+
 # === Start Nova ===
 if __name__ == "__main__":
-    nova_loop()
+    sys.exit(run_session())
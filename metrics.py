@@ -0,0 +1,185 @@
+# metrics.py
+
+import time
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+import progress
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HELP = {
+    "nova_stage_duration_seconds": "Time spent in each stage of the booking flow",
+    "nova_wait_seconds": "Time spent in event-driven waits, by wait label",
+    "nova_selector_depth": "Fallback selectors probed before the one that matched, by step",
+    "nova_stt_final_seconds": "Time from the end of speech to the final transcript, by STT backend",
+    "nova_wake_latency_seconds": "Time from the end of the wake phrase to listening for a command, by detector",
+    "nova_tts_first_audio_seconds": "Time from an utterance's turn to its first audio, by synthesis mode",
+    "nova_job_duration_seconds": "Run time of Nova sessions started from the web app",
+    "nova_jobs_total": "Nova sessions started from the web app, by final state",
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """In-process histograms, counters and gauges rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._collectors = []
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauge(self, name, callback, help_text=None):
+        """`callback` returns a number, or a list of (labels_dict, number) pairs."""
+        with self._lock:
+            self._gauges[name] = callback
+        if help_text:
+            HELP.setdefault(name, help_text)
+
+    def register_collector(self, callback, help_texts=None):
+        """`callback` returns {gauge name: value} for several gauges read from one
+        snapshot; it is called once per render. Values are as for register_gauge."""
+        with self._lock:
+            self._collectors.append(callback)
+        for name, help_text in (help_texts or {}).items():
+            HELP.setdefault(name, help_text)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            gauges = list(self._gauges.items())
+            collectors = list(self._collectors)
+
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), histogram in histograms:
+            declare(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        values = []
+        for name, callback in gauges:
+            try:
+                values.append((name, callback()))
+            except Exception:
+                continue
+        for collect in collectors:
+            try:
+                values.extend(collect().items())
+            except Exception:
+                continue
+
+        for name, value in sorted(values, key=lambda item: item[0]):
+            declare(name, "gauge")
+            samples = value if isinstance(value, list) else [({}, value)]
+            for labels, sample in samples:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(sample)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+    # Sessions run as app jobs forward samples to the app's registry
+    progress.emit("metric", name=name, value=value, labels=labels)
+
+
+_stages = threading.local()
+
+
+def current_stage():
+    """The innermost span open on this thread, or None."""
+    stack = getattr(_stages, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(stage):
+    """Time a stage of the booking flow into nova_stage_duration_seconds."""
+    started = time.perf_counter()
+    outcome = "ok"
+    stack = _stages.__dict__.setdefault("stack", [])
+    stack.append(stage)
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        stack.pop()
+        observe("nova_stage_duration_seconds", time.perf_counter() - started, stage=stage, outcome=outcome)
+
+
+def timed(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""
+Preforked Nova runtime
+
+A long-lived process that imports main.py and the heavy libraries it uses
+(gTTS, speech_recognition, Selenium, undetected-chromedriver) once, then
+forks a child per session. Children start with everything imported and
+share the imported code's memory pages with the runtime until they write
+to them.
+
+The job manager connects over a Unix socket and sends the session's
+environment; the forked child writes its output to the connection, and the
+runtime writes the child's exit code after it is reaped. To the job
+manager a forked session looks like a subprocess.Popen of main.py.
+
+Usage:
+    python nova_runtime.py --socket /tmp/nova-runtime.sock
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import random
+import argparse
+import importlib
+import selectors
+import subprocess
+import tempfile
+import threading
+import traceback
+
+# Forking needs POSIX; macOS system frameworks are not fork-safe once loaded
+PREFORK = os.environ.get('NOVA_PREFORK', '1' if sys.platform.startswith('linux') else '0') != '0'
+RUNTIME_SCRIPT = os.path.abspath(__file__)
+PRELOAD = ("main",)
+# Imported lazily by a session, so imported here explicitly
+PRELOAD_LIBRARIES = ("gtts", "speech_recognition", "selenium.webdriver", "undetected_chromedriver")
+ENTRY = "main:run_session"
+STARTUP_TIMEOUT = 60
+
+PID_PREFIX = "::nova-pid::"
+EXIT_PREFIX = "::nova-exit::"
+
+
+# === Runtime Process ===
+def preload(modules=PRELOAD):
+    for name in PRELOAD_LIBRARIES + tuple(modules):
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"Note: Could not preload {name}: {e}")
+
+
+def _load_entry(entry):
+    module_name, _, function_name = entry.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _run_child(conn, request, entry):
+    """In the forked child: run one session with its output on `conn`; never returns."""
+    code = 1
+    try:
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Every child would otherwise pick the same "random" greetings
+        random.seed()
+        os.environ.update(request.get("env", {}))
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(conn.fileno(), 1)
+        os.dup2(conn.fileno(), 2)
+        os.close(devnull)
+        conn.close()
+        # New streams, since the inherited ones may think they write to a seekable file
+        sys.stdout = open(1, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+        print(f"{PID_PREFIX}{os.getpid()}")
+        result = _load_entry(request.get("entry") or entry)()
+        code = result if isinstance(result, int) else 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            # Quit Chrome drivers and flush speech like a normal interpreter exit
+            import atexit
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _read_request(conn):
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data or b"{}")
+
+
+def serve(socket_path, entry=ENTRY, modules=PRELOAD):
+    """Preload, then fork a session per connection until the parent process exits."""
+    preload(modules)
+    parent = os.getppid()
+    # Let stop() clean up the socket file
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(16)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    children = {}
+    print(f"✅ Nova runtime {os.getpid()} ready on {socket_path}")
+    sys.stdout.flush()
+    # Single-threaded on purpose: forking a process with other threads can
+    # leave the child holding locks nobody will release
+    try:
+        while os.getppid() == parent:
+            if selector.select(timeout=0.2):
+                conn, _ = listener.accept()
+                try:
+                    request = _read_request(conn)
+                except (OSError, ValueError) as e:
+                    print(f"Note: Bad runtime request: {e}")
+                    conn.close()
+                    continue
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if pid == 0:
+                    listener.close()
+                    for other in children.values():
+                        other.close()
+                    _run_child(conn, request, entry)
+                children[pid] = conn
+            _reap(children)
+    finally:
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def _reap(children):
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        conn = children.pop(pid, None)
+        if conn is None:
+            continue
+        try:
+            conn.sendall(f"{EXIT_PREFIX}{os.waitstatus_to_exitcode(status)}\n".encode("utf-8"))
+        except OSError:
+            pass
+        conn.close()
+
+
+# === Job Manager Side ===
+class ForkedSession:
+    """A session forked by the runtime, with the parts of Popen the job manager uses."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._file = conn.makefile("r", encoding="utf-8", errors="replace", newline="\n")
+        first = self._file.readline()
+        if not first.startswith(PID_PREFIX):
+            rest = first + "".join(self._file)
+            conn.close()
+            raise RuntimeError(f"Nova runtime closed the connection before the session started: {rest[-500:]}")
+        self.pid = int(first[len(PID_PREFIX):])
+        self.returncode = None
+        self.stdout = self._lines()
+
+    def _lines(self):
+        try:
+            for line in self._file:
+                if line.startswith(EXIT_PREFIX):
+                    self.returncode = int(line[len(EXIT_PREFIX):])
+                    return
+                yield line
+        finally:
+            self._file.close()
+            self._conn.close()
+            if self.returncode is None:
+                # The runtime itself went away
+                self.returncode = -1
+
+    def wait(self):
+        for _ in self.stdout:
+            pass
+        return self.returncode
+
+    def kill(self):
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class NovaRuntime:
+    """Starts the runtime process on demand and forks sessions from it."""
+
+    def __init__(self, socket_path=None, entry=ENTRY, modules=PRELOAD, startup_timeout=STARTUP_TIMEOUT):
+        self.socket_path = socket_path or os.path.join(tempfile.gettempdir(), f"nova-runtime-{os.getpid()}.sock")
+        self.entry = entry
+        self.modules = modules
+        self.startup_timeout = startup_timeout
+        self._process = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Launch the runtime in the background if it is not running."""
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+                self._process = subprocess.Popen([
+                    sys.executable, "-u", RUNTIME_SCRIPT, "--socket", self.socket_path,
+                    "--entry", self.entry, "--preload", ",".join(self.modules),
+                ], env=dict(os.environ, PYTHONIOENCODING="utf-8"))
+        return self
+
+    def _connect(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conn.connect(self.socket_path)
+                return conn
+            except OSError:
+                conn.close()
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"Nova runtime exited with code {self._process.returncode}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Nova runtime did not start in time")
+                time.sleep(0.05)
+
+    def spawn(self, env, entry=None):
+        """Fork a session with `env` added to its environment."""
+        self.start()
+        conn = self._connect()
+        conn.sendall((json.dumps({"env": env, "entry": entry}) + "\n").encode("utf-8"))
+        return ForkedSession(conn)
+
+    def stop(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.terminate()
+                self._process.wait()
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """The process's Nova runtime, or None when sessions run as plain subprocesses."""
+    global _runtime
+    if not PREFORK or not hasattr(os, "fork"):
+        return None
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = NovaRuntime()
+        return _runtime
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", required=True, help="Unix socket to accept sessions on")
+    parser.add_argument("--entry", default=ENTRY, help="module:function each forked session runs")
+    parser.add_argument("--preload", default=",".join(PRELOAD), help="comma-separated modules to import up front")
+    args = parser.parse_args(argv)
+    serve(args.socket, args.entry, tuple(name for name in args.preload.split(",") if name))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
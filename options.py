@@ -1,37 +1,94 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from gtts import gTTS
 import os
-import time
 import speech_recognition as sr
+from waits import wait_for_element, wait_until, POPUP_WINDOW
+from locator import find_first
+from speech_output import get_speech_output
+from audio_session import get_audio_session
+import progress
+from metrics import timed
+from fuzzy_match import FuzzyMatcher
 
 # Check if we're in a production environment
 is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
 
+RIDE_OPTION_SELECTOR = "li[data-testid='product_selector.list_item']"
+
+# Reads every product card in one round trip. The name is the first line of
+# the card; price, ETA and capacity are recognised by their shape.
+EXTRACT_RIDE_OPTIONS_JS = """
+var items = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < items.length; i++) {
+    var lines = (items[i].innerText || '').split('\\n').map(function (l) { return l.trim(); })
+        .filter(function (l) { return l.length; });
+    if (!lines.length) continue;
+    var option = {name: lines[0], price: null, eta: null, capacity: null, index: i, element: items[i]};
+    for (var j = 1; j < lines.length; j++) {
+        var line = lines[j];
+        if (option.price === null && /[\u20b9$\u20ac\u00a3]\\s*\\d/.test(line)) option.price = line;
+        else if (option.eta === null && /\\d+\\s*min|\\d{1,2}:\\d{2}/i.test(line)) option.eta = line;
+        else if (option.capacity === null && /^\\d{1,2}$/.test(line)) option.capacity = parseInt(line, 10);
+    }
+    out.push(option);
+}
+return out;
+"""
+
+
+class RideOption:
+    __slots__ = ("name", "price", "eta", "capacity", "index", "element")
+
+    def __init__(self, name, price=None, eta=None, capacity=None, index=None, element=None):
+        self.name = name
+        self.price = price
+        self.eta = eta
+        self.capacity = capacity
+        self.index = index
+        self.element = element
+
+    @property
+    def key(self):
+        return self.name.lower()
+
+    def describe(self):
+        return f"{self.name} for {self.price}"
+
+    def to_dict(self):
+        return {"name": self.name, "price": self.price, "eta": self.eta, "capacity": self.capacity, "index": self.index}
+
+    def __repr__(self):
+        return f"RideOption({self.name!r}, price={self.price!r}, eta={self.eta!r}, index={self.index})"
+
+
+def extract_ride_options(driver):
+    """All product cards as RideOption records, in DOM order."""
+    raw_options = driver.execute_script(EXTRACT_RIDE_OPTIONS_JS, RIDE_OPTION_SELECTOR) or []
+    return [
+        RideOption(
+            raw["name"],
+            price=raw.get("price"),
+            eta=raw.get("eta"),
+            capacity=raw.get("capacity"),
+            index=raw.get("index"),
+            element=raw.get("element"),
+        )
+        for raw in raw_options
+    ]
+
+def ride_matcher(names):
+    """Matches spoken answers to ride positions by name or by number ("ride 2", "the second one")."""
+    return FuzzyMatcher({
+        index: [name, f"ride {index + 1}", f"option {index + 1}", str(index + 1)]
+        for index, name in enumerate(names)
+    })
+
 def nova_speak(text):
     print(f"🔊 Nova: {text}")
-    
-    # In production, just print the text
-    if is_production:
-        return
-        
-    # In development, use text-to-speech
-    try:
-        # Only import playsound in development environment
-        try:
-            from playsound import playsound
-            tts = gTTS(text=text, lang='en')
-            filename = "ride_options.mp3"
-            tts.save(filename)
-            playsound(filename)
-            os.remove(filename)
-        except ImportError:
-            print(f"Text-to-speech not available: playsound module not found")
-    except Exception as e:
-        print(f"Text-to-speech error: {e}")
-        # Continue execution even if TTS fails
+    return get_speech_output().say(text)
 
+@timed("stt")
 def listen_to_user():
     # In production, return a default response
     if is_production:
@@ -39,27 +96,26 @@ def listen_to_user():
         return "uberx"
         
     try:
-        recognizer = sr.Recognizer()
+        session = get_audio_session()
         try:
-            with sr.Microphone() as source:
-                while True:
-                    print("🎙️ Listening...")
+            session.open()
+            while True:
+                print("🎙️ Listening...")
+                try:
                     try:
-                        audio = recognizer.listen(source, timeout=8, phrase_time_limit=10)
-                        try:
-                            user_input = recognizer.recognize_google(audio)
-                            print(f"🗣️ You said: {user_input}")
-                            return user_input.lower()
-                        except sr.UnknownValueError:
-                            print("❌ Couldn't understand audio")
-                            nova_speak("Sorry, I didn't catch that. Please say it again.")
-                        except sr.RequestError:
-                            print("❌ Speech recognition service failed")
-                            nova_speak("There was a problem with speech recognition.")
-                            return "uberx"  # Default to UberX on error
-                    except sr.WaitTimeoutError:
-                        print("⏱️ No response detected.")
-                        return "uberx"  # Default to UberX on timeout
+                        user_input = session.transcribe(timeout=8, phrase_time_limit=10)
+                        print(f"🗣️ You said: {user_input}")
+                        return user_input.lower()
+                    except sr.UnknownValueError:
+                        print("❌ Couldn't understand audio")
+                        nova_speak("Sorry, I didn't catch that. Please say it again.")
+                    except sr.RequestError:
+                        print("❌ Speech recognition service failed")
+                        nova_speak("There was a problem with speech recognition.")
+                        return "uberx"  # Default to UberX on error
+                except sr.WaitTimeoutError:
+                    print("⏱️ No response detected.")
+                    return "uberx"  # Default to UberX on timeout
         except Exception as e:
             print(f"Microphone initialization error: {e}")
             return "uberx"  # Default to UberX on microphone error
@@ -68,64 +124,53 @@ def listen_to_user():
         return "uberx"  # Default to UberX on system error
 
 def read_ride_options(driver):
+    """Read the ride options aloud and book the one the user picks.
+
+    Returns the selected RideOption, or None if nothing was selected.
+    """
     try:
-        wait = WebDriverWait(driver, 15)
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "li[data-testid='product_selector.list_item']")))
+        wait_until(
+            driver,
+            EC.presence_of_element_located((By.CSS_SELECTOR, RIDE_OPTION_SELECTOR)),
+            timeout=15,
+            label="options.product_list",
+        )
 
-        ride_blocks = driver.find_elements(By.CSS_SELECTOR, "li[data-testid='product_selector.list_item']")
+        # Only rides with a price can be booked
+        rides = [ride for ride in extract_ride_options(driver) if ride.price]
 
-        if not ride_blocks:
+        if not rides:
             nova_speak("Sorry, I couldn't find any ride options.")
-            return
-
-        ride_options = []
-        ride_names = []
-
-        for ride in ride_blocks:
-            text = ride.text.strip()
-            if text:
-                ride_options.append(text)
-
-        refined_options = []
-        for raw_text in ride_options:
-            lines = raw_text.split("\n")
-            ride_name = None
-            price = None
-
-            for line in lines:
-                if not ride_name:
-                    ride_name = line.strip()
-                elif "₹" in line:
-                    price = line.strip()
-                    break
-
-            if ride_name and price:
-                ride_names.append(ride_name.lower())
-                refined_options.append(f"{ride_name} for {price}")
-
-        for idx, option in enumerate(refined_options, 1):
-            message = f"Ride {idx}: {option}"
+            return None
+
+        progress.step("ride_options", options=[ride.to_dict() for ride in rides])
+        messages = []
+        for idx, ride in enumerate(rides, 1):
+            message = f"Ride {idx}: {ride.describe()}."
             print(f"🔹 {message}")
-            nova_speak(message)
-            time.sleep(1)
+            messages.append(message)
+        # One utterance, so the list is streamed and the first ride is heard
+        # after one sentence's synthesis
+        nova_speak(" ".join(messages))
 
+        matcher = ride_matcher([ride.name for ride in rides])
+        question = "Which ride would you like to choose?"
         # Loop to ask for ride selection until successful
         while True:
-            nova_speak("Which ride would you like to choose?")
+            nova_speak(question)
             user_choice = listen_to_user()
             if not user_choice:
                 continue
 
-            matched_index = None
-            for idx, ride_name in enumerate(ride_names):
-                if ride_name in user_choice or user_choice in ride_name:
-                    matched_index = idx
-                    break
+            match = matcher.best(user_choice)
+            selected = rides[match.candidate] if match.confidence >= matcher.threshold else None
+            print(f"🔎 Best match for '{user_choice}': {match}")
 
-            if matched_index is not None:
-                selected_ride = ride_names[matched_index]
-                ride_blocks[matched_index].click()
+            if selected is not None:
+                selected_ride = selected.key
+                selected.element.click()
                 print(f"✅ '{selected_ride}' ride selected!")
+                progress.step("ride_selected", ride=selected_ride)
                 nova_speak(f"{selected_ride} selected!")
 
                 # Ask for confirmation to request the ride
@@ -134,24 +179,24 @@ def read_ride_options(driver):
 
                 if confirmation and ("yes" in confirmation or "confirm" in confirmation):
                     try:
-                        request_buttons = driver.find_elements(
-                            By.XPATH, '//*[@id="wrapper"]/div[1]/div[3]/main/div/section/div[3]/div/div/button'
+                        request_button = find_first(
+                            driver,
+                            ['//*[@id="wrapper"]/div[1]/div[3]/main/div/section/div[3]/div/div/button'],
+                            visible=True,
+                            enabled=True,
                         )
-                        for btn in request_buttons:
-                            if btn.is_displayed() and btn.is_enabled():
-                                btn.click()
-                                print("✅ Request button clicked!")
-                                nova_speak("Ride request sent.")
-                                break
+                        if request_button:
+                            request_button.click()
+                            print("✅ Request button clicked!")
+                            progress.step("request_sent")
+                            nova_speak("Ride request sent.")
                         else:
                             print("ℹ️ Optional request button not found.")
 
-                        # Wait for possible confirmation pop-up
-                        time.sleep(2)
-
-                        # Check for confirm/cancel popup
+                        # Check for confirm/cancel popup, continuing as soon as it renders
                         confirm_xpath = '//*[@id="wrapper"]/div[2]/div/div[2]/div/div/div/div/div/div/div[3]/div[2]/button'
                         cancel_xpath = '//*[@id="wrapper"]/div[2]/div/div[2]/div/div/div/div/div/div/div[3]/div[1]/button'
+                        wait_for_element(driver, [confirm_xpath], timeout=POPUP_WINDOW, label="options.confirm_popup")
                         confirm_buttons = driver.find_elements(By.XPATH, confirm_xpath)
 
                         if confirm_buttons:
@@ -161,6 +206,7 @@ def read_ride_options(driver):
                                 try:
                                     driver.find_element(By.XPATH, confirm_xpath).click()
                                     print("✅ Final confirm button clicked.")
+                                    progress.step("ride_confirmed")
                                     nova_speak("Your ride is confirmed.")
                                 except Exception as e:
                                     print("❌ Error clicking confirm:", e)
@@ -178,9 +224,14 @@ def read_ride_options(driver):
                         nova_speak("Sorry, I could not click the request button.")
                 else:
                     nova_speak("Okay, ride request cancelled.")
-                return
+                return selected
+            elif match.runner_up is not None and match.score >= matcher.threshold:
+                # Two rides fit about equally well; ask between just those
+                first, second = rides[match.candidate].name, rides[match.runner_up].name
+                question = f"Did you mean {first} or {second}?"
             else:
                 nova_speak("Sorry, I couldn't find the ride you asked for. Please say it again.")
+                question = "Which ride would you like to choose?"
 
     except Exception as e:
         print(f"❌ Failed to read ride options: {e}")
@@ -0,0 +1,88 @@
+# pipeline.py
+
+import threading
+
+
+class Lane:
+    """Runs one line of work on its own thread next to the caller's.
+
+    `result()` waits for the lane and returns its value, re-raising any
+    exception it failed with.
+    """
+
+    def __init__(self, name, func, *args, **kwargs):
+        self.name = name
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._value = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lane-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._value = self._func(*self._args, **self._kwargs)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Lane {self.name} did not finish within {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class Urgent(str):
+    """A message the user has to hear now, e.g. to log in by hand.
+
+    Plain speech functions take it like any string; DeferredSpeech says it
+    right away instead of holding it for the end of the dialogue.
+    """
+
+
+class DeferredSpeech:
+    """Speech function for a background lane.
+
+    Messages are held back while the foreground dialogue owns the speaker,
+    so the browser lane never talks over a question. Urgent messages are
+    said right away, after any held back before them. `flush()` says the
+    rest in order and lets later messages through directly.
+    """
+
+    def __init__(self, speak):
+        self._speak = speak
+        self._lock = threading.Lock()
+        self._pending = []
+        self._direct = False
+
+    def __call__(self, text):
+        with self._lock:
+            if not self._direct:
+                if not isinstance(text, Urgent):
+                    print(f"🔇 Deferred: {text}")
+                    self._pending.append(text)
+                    return
+                for pending in self._pending:
+                    self._speak(pending)
+                self._pending = []
+        self._speak(text)
+
+    def flush(self):
+        # Speak under the lock so a new message can't jump the queue
+        with self._lock:
+            for text in self._pending:
+                self._speak(text)
+            self._pending = []
+            self._direct = True
@@ -0,0 +1,186 @@
+# places.py
+
+import os
+import json
+import time
+import bisect
+import getpass
+import tempfile
+import threading
+from collections import OrderedDict
+from fuzzy_match import FuzzyMatcher, tokenize
+
+PLACES_DIR = os.environ.get(
+    'NOVA_PLACES_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'places')
+)
+PLACES_TTL = float(os.environ.get('NOVA_PLACES_TTL_DAYS', 90)) * 24 * 3600
+PLACES_MAX = int(os.environ.get('NOVA_PLACES_MAX', 200))
+# Shorter spoken prefixes ("con") would match too many places
+MIN_PREFIX_CHARS = 4
+
+# Words around a place name that don't tell places apart
+FILLER_WORDS = frozenset(
+    "a an the from to at near take me i im am going go pick up please my".split()
+)
+
+
+def normalize_place(text):
+    """Lowercase place words without filler: "Take me to the Airport" -> "airport"."""
+    words = [word for word in tokenize(text) if word not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def typed_text(suggestion):
+    """What to type for a remembered suggestion: its first line, the place name."""
+    return suggestion.split("\n", 1)[0].strip()
+
+
+class PlaceStore:
+    """Spoken place names mapped to the autocomplete suggestion picked for them.
+
+    Phrases are normalized before they are stored or looked up. A lookup
+    tries the exact phrase, then stored phrases it is a prefix of (or that
+    are a prefix of it), then a fuzzy match against all stored phrases.
+    Entries expire `ttl` seconds after they were last used and the least
+    recently used ones are evicted beyond `max_entries`. With `path=None`
+    nothing is written to disk.
+    """
+
+    def __init__(self, path, ttl=PLACES_TTL, max_entries=PLACES_MAX, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # phrase -> {"suggestion", "used_at", "uses"}, oldest first
+        self._sorted = []
+        self._matcher = None
+        self.stats = {"hits": 0, "misses": 0}
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Note: Ignoring unreadable places file {self.path}: {e}")
+            return
+        for phrase, entry in sorted(entries.items(), key=lambda item: item[1].get("used_at", 0)):
+            self._entries[phrase] = entry
+        self._expire()
+        self._reindex()
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Note: Could not save places: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _expire(self):
+        cutoff = self._clock() - self.ttl
+        expired = [phrase for phrase, entry in self._entries.items() if entry["used_at"] < cutoff]
+        for phrase in expired:
+            del self._entries[phrase]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return bool(expired)
+
+    def _reindex(self):
+        self._sorted = sorted(self._entries)
+        self._matcher = None
+
+    def _prefix_match(self, phrase):
+        # Stored phrases starting with what was said, most recently used first
+        if len(phrase) >= MIN_PREFIX_CHARS:
+            start = bisect.bisect_left(self._sorted, phrase)
+            longer = []
+            for stored in self._sorted[start:]:
+                if not stored.startswith(phrase):
+                    break
+                longer.append(stored)
+            if longer:
+                return max(longer, key=lambda stored: self._entries[stored]["used_at"])
+        # Stored phrases that what was said starts with, longest first
+        words = phrase.split()
+        for size in range(len(words) - 1, 0, -1):
+            stored = " ".join(words[:size])
+            if stored in self._entries and len(stored) >= MIN_PREFIX_CHARS:
+                return stored
+        return None
+
+    def _fuzzy_match(self, phrase):
+        if not self._entries:
+            return None
+        if self._matcher is None:
+            self._matcher = FuzzyMatcher(self._sorted)
+        return self._matcher.match(phrase)
+
+    def lookup(self, spoken):
+        """The suggestion text picked last time for this place, or None."""
+        phrase = normalize_place(spoken)
+        if not phrase:
+            return None
+        with self._lock:
+            if self._expire():
+                self._reindex()
+            stored = phrase if phrase in self._entries else None
+            stored = stored or self._prefix_match(phrase) or self._fuzzy_match(phrase)
+            if stored is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._entries.move_to_end(stored)
+            return self._entries[stored]["suggestion"]
+
+    def remember(self, spoken, suggestion):
+        """Record the suggestion the user ended up with for a spoken place."""
+        phrase = normalize_place(spoken)
+        if not phrase or not isinstance(suggestion, str) or not suggestion.strip():
+            return
+        with self._lock:
+            entry = self._entries.pop(phrase, {"uses": 0})
+            entry.update(suggestion=suggestion.strip(), used_at=self._clock(), uses=entry["uses"] + 1)
+            self._entries[phrase] = entry
+            self._expire()
+            self._reindex()
+            self._save()
+
+    def forget(self, spoken):
+        with self._lock:
+            if self._entries.pop(normalize_place(spoken), None) is not None:
+                self._reindex()
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def places_path(user=None):
+    user = user or os.environ.get('NOVA_USER') or getpass.getuser()
+    safe_user = "".join(char if char.isalnum() or char in "-_." else "_" for char in user)
+    return os.path.join(PLACES_DIR, f"{safe_user}.json")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_place_store(user=None):
+    """The place store of `user` (default: NOVA_USER or the login name)."""
+    path = places_path(user)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = PlaceStore(path)
+        return _stores[path]
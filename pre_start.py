@@ -4,12 +4,26 @@ Pre-start Script
 
 This script runs before the application starts to ensure all dependencies
 are properly configured and the environment is ready for deployment.
+
+Modules are looked up with importlib's finders and versions are read from
+the installed package metadata, so nothing is imported. Results are cached
+in a fingerprint file keyed on the interpreter and the installed
+distributions, and the checks only run again when either changes.
+
+Usage:
+    python pre_start.py
+    python pre_start.py --force
 """
 
 import os
 import sys
+import json
+import time
+import hashlib
 import logging
 import importlib.util
+import importlib.machinery
+from importlib import metadata
 
 # Configure logging
 logging.basicConfig(
@@ -18,59 +32,131 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_checks():
+CRITICAL_MODULES = [
+    ('flask', 'Flask web framework'),
+    ('werkzeug', 'WSGI utilities'),
+    ('werkzeug.urls', 'URL utilities from Werkzeug'),
+    ('gunicorn', 'WSGI HTTP Server'),
+    ('gtts', 'Google Text-to-Speech'),
+    ('speech_recognition', 'Speech recognition'),
+    ('selenium', 'Browser automation'),
+    ('undetected_chromedriver', 'Undetected ChromeDriver')
+]
+
+# "off" runs the checks on every start
+CACHE_PATH = os.environ.get(
+    'NOVA_PRESTART_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'pre_start.json')
+)
+# Bump when the checks change, so cached results from older checks are not reused
+CHECKS_VERSION = 1
+
+def find_module(module_name):
+    """The module's spec, found without importing it or its parent packages"""
+    parent_name, _, name = module_name.rpartition('.')
+    if not parent_name:
+        return importlib.util.find_spec(module_name)
+    parent = find_module(parent_name)
+    if parent is None or not parent.submodule_search_locations:
+        return None
+    return importlib.machinery.PathFinder.find_spec(module_name, parent.submodule_search_locations)
+
+def fingerprint():
+    """Hash of the interpreter and the name and version of every installed distribution"""
+    digest = hashlib.sha256(
+        f"{CHECKS_VERSION}\n{CRITICAL_MODULES!r}\n{sys.executable}\n{sys.version}\n".encode('utf-8')
+    )
+    for entry in sys.path:
+        try:
+            names = sorted(os.listdir(entry or '.'))
+        except OSError:
+            continue
+        # Metadata directory names carry the version, e.g. Flask-2.0.1.dist-info
+        for name in names:
+            if name.endswith(('.dist-info', '.egg-info')):
+                digest.update(f"{entry}/{name}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def check_modules():
+    """Availability of each critical module; a list of (module, description, ok, detail)"""
+    results = []
+    for module_name, description in CRITICAL_MODULES:
+        try:
+            spec = find_module(module_name)
+        except (ImportError, ValueError) as e:
+            spec, detail = None, str(e)
+        else:
+            detail = spec.origin if spec else "not found"
+        results.append((module_name, description, spec is not None, detail))
+
+    # werkzeug.urls.url_quote was removed in Werkzeug 3.0
+    try:
+        werkzeug_version = metadata.version('werkzeug')
+        ok = int(werkzeug_version.split('.')[0]) < 3
+        detail = f"Werkzeug {werkzeug_version}"
+    except metadata.PackageNotFoundError:
+        ok, detail = False, "Werkzeug is not installed"
+    except ValueError:
+        ok, detail = True, f"Werkzeug {werkzeug_version}"
+    results.append(('werkzeug.urls.url_quote', 'URL quoting used by Flask 2.0', ok, detail))
+    return results
+
+def load_cache(path, key):
+    if path == 'off':
+        return None
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get('fingerprint') == key else None
+
+def save_cache(path, key, results):
+    if path == 'off':
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': key, 'checked_at': time.time(), 'results': results}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not cache pre-start results: {e}")
+
+def run_checks(force=False, cache_path=None):
     """Run all pre-start checks"""
     logger.info("\n===== Running pre-start checks =====")
-    
+
     # Check if running on Render.com
     render_env = os.environ.get('RENDER')
     if render_env:
         logger.info("Running on Render.com platform")
     else:
         logger.info("Running in local environment")
-    
+
     # Check Python version
     logger.info(f"Python version: {sys.version}")
-    
-    # Check for critical modules
-    critical_modules = [
-        ('flask', 'Flask web framework'),
-        ('werkzeug', 'WSGI utilities'),
-        ('werkzeug.urls', 'URL utilities from Werkzeug'),
-        ('gunicorn', 'WSGI HTTP Server'),
-        ('gtts', 'Google Text-to-Speech'),
-        ('speech_recognition', 'Speech recognition'),
-        ('selenium', 'Browser automation'),
-        ('undetected_chromedriver', 'Undetected ChromeDriver')
-    ]
-    
+
+    # Check for critical modules, unless nothing was installed or removed since the last check
+    cache_path = cache_path or CACHE_PATH
+    key = fingerprint()
+    cached = None if force else load_cache(cache_path, key)
+    if cached:
+        results = [tuple(result) for result in cached['results']]
+        checked_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(cached['checked_at']))
+        logger.info(f"\nCritical modules unchanged since {checked_at} (cached in {cache_path})")
+    else:
+        results = check_modules()
+        save_cache(cache_path, key, results)
+        logger.info("\nChecking critical modules:")
+
     all_modules_available = True
-    logger.info("\nChecking critical modules:")
-    
-    for module_name, description in critical_modules:
-        try:
-            if '.' in module_name:
-                # For submodules like werkzeug.urls
-                parent_module, submodule = module_name.split('.', 1)
-                parent = __import__(parent_module, fromlist=[submodule])
-                getattr(parent, submodule)
-                logger.info(f"✅ {module_name} - Available ({description})")
-            else:
-                # For top-level modules
-                __import__(module_name)
-                logger.info(f"✅ {module_name} - Available ({description})")
-        except ImportError as e:
-            logger.error(f"❌ {module_name} - Not available: {e}")
+    for module_name, description, ok, detail in results:
+        if not ok:
+            logger.error(f"❌ {module_name} - Not available: {detail}")
             all_modules_available = False
-    
-    # Special check for werkzeug.urls.url_quote
-    try:
-        from werkzeug.urls import url_quote
-        logger.info("✅ werkzeug.urls.url_quote - Available")
-    except ImportError as e:
-        logger.error(f"❌ werkzeug.urls.url_quote - Not available: {e}")
-        all_modules_available = False
-    
+        elif not cached:
+            logger.info(f"✅ {module_name} - Available ({description})")
+
     # Check environment variables
     logger.info("\nChecking environment variables:")
     env_vars = ['PORT', 'RENDER', 'FLASK_ENV', 'FLASK_DEBUG']
@@ -80,7 +166,7 @@ def run_checks():
             logger.info(f"✅ {var}={value}")
         else:
             logger.info(f"ℹ️ {var} not set")
-    
+
     # Check for templates directory
     templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
     if os.path.isdir(templates_dir):
@@ -95,9 +181,9 @@ def run_checks():
     else:
         logger.error(f"❌ Templates directory not found: {templates_dir}")
         all_modules_available = False
-    
+
     logger.info("\n===== Pre-start checks complete =====")
-    
+
     if all_modules_available:
         logger.info("✅ All critical modules are available")
         return True
@@ -106,8 +192,8 @@ def run_checks():
         return False
 
 if __name__ == "__main__":
-    success = run_checks()
+    success = run_checks(force='--force' in sys.argv[1:])
     if not success:
         logger.error("Pre-start checks failed. Application may not function correctly.")
         # Don't exit with error code as this might prevent the app from starting
-        # sys.exit(1)
\ No newline at end of file
+        # sys.exit(1)
@@ -0,0 +1,53 @@
+# progress.py
+
+import os
+import sys
+import json
+import time
+import threading
+
+# Lines starting with this prefix on a Nova process's stdout carry structured
+# progress events for the job manager in app.py.
+EVENT_PREFIX = "::nova-event::"
+
+_emit_lock = threading.Lock()
+
+
+def events_enabled():
+    return bool(os.environ.get('NOVA_EVENTS'))
+
+
+def emit(event, **data):
+    """Report a progress event to the parent job, if there is one."""
+    if not events_enabled():
+        return
+    payload = {"event": event, "ts": time.time()}
+    payload.update(data)
+    line = EVENT_PREFIX + json.dumps(payload, default=str) + "\n"
+    # Metrics are emitted from any thread: write each line in one call, one
+    # thread at a time, so two events never interleave
+    with _emit_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def step(name, **data):
+    emit("step", step=name, **data)
+
+
+def split_event(line):
+    """(text, event) of a stdout line. A print() on another thread writes its
+    newline separately, so an event can follow its text on the same line."""
+    index = line.find(EVENT_PREFIX)
+    if index < 0:
+        return line, None
+    return line[:index], parse_event(line[index:])
+
+
+def parse_event(line):
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
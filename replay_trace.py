@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+Replay tool for WebDriver traces
+
+Reads a trace written by driver_trace.TracingDriver (NOVA_TRACE=1), replays
+its commands in order against a stub driver that takes as long as the
+recorded command did (times --scale) and returns a response of the
+recorded size, and prints a latency breakdown per command and per flow
+stage: count, total, mean, p50, p95 and max time, share of the session's
+WebDriver time, and bytes returned.
+
+Replaying re-records every command through the same tracing wrapper, so a
+replay checks that a trace is complete and, with --scale, shows what a
+uniformly faster or slower browser would do to the breakdown.
+
+--compare prints the change per command between two traces (for example
+before and after a selector change), the first command where their
+sequences differ, and the first command after which the page's DOM hash
+differs.
+
+Usage:
+    python replay_trace.py ~/.cache/nova/traces/webdriver.trace
+    python replay_trace.py webdriver.trace --session 3f2a9c --scale 0.5
+    python replay_trace.py before.trace --compare after.trace
+"""
+
+import sys
+import time
+import argparse
+from collections import defaultdict
+from driver_trace import TracingDriver, read_trace
+
+
+class ListWriter:
+    """Trace writer that keeps records in memory."""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+class VirtualClock:
+    """Clock that only moves when the stub driver sleeps, so replays are instant."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class StubDriver:
+    """Answers each command with the recorded duration and response size."""
+
+    def __init__(self, clock, scale=1.0):
+        self.clock = clock
+        self.scale = scale
+        self.record = None
+
+    def replay(self, record):
+        self.record = record
+        self.clock.sleep(record.get("ms", 0) / 1000 * self.scale)
+        if record.get("err"):
+            raise RuntimeError(record["err"])
+        size = record.get("n", 0)
+        # A JSON string of `size` bytes, so the re-recorded size matches
+        return "x" * (size - 2) if size >= 2 else None
+
+
+def replay(records, scale=1.0, clock=None):
+    """Re-issue `records` against a stub driver; returns the re-recorded trace."""
+    clock = clock or VirtualClock()
+    stub = StubDriver(clock, scale)
+    writer = ListWriter()
+    tracer = TracingDriver(stub, writer, dom="off", clock=clock.monotonic)
+    for record in records:
+        tracer._session = record.get("s")
+        try:
+            tracer._call(record["c"], lambda: stub.replay(record), (), {})
+        except RuntimeError:
+            pass
+        replayed = writer.records[-1]
+        replayed["c"] = record["c"]
+        for key in ("st", "sel", "dom", "err"):
+            if key in record:
+                replayed[key] = record[key]
+    return writer.records
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def breakdown(records, key="c"):
+    """{name: {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms, share, bytes, errors}} by `key`."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[record.get(key) or "-"].append(record)
+    total = sum(record.get("ms", 0) for record in records) or 1
+    rows = {}
+    for name, group in groups.items():
+        times = [record.get("ms", 0) for record in group]
+        rows[name] = {
+            "count": len(group),
+            "total_ms": sum(times),
+            "mean_ms": sum(times) / len(times),
+            "p50_ms": _percentile(times, 0.5),
+            "p95_ms": _percentile(times, 0.95),
+            "max_ms": max(times),
+            "share": sum(times) / total,
+            "bytes": sum(record.get("n", 0) for record in group),
+            "errors": sum(1 for record in group if record.get("err")),
+        }
+    return dict(sorted(rows.items(), key=lambda item: -item[1]["total_ms"]))
+
+
+def _signature(record):
+    selector = record.get("sel")
+    return record["c"], tuple(selector) if isinstance(selector, list) else selector
+
+
+def compare(before, after):
+    """Per-command changes between two traces and where their flows part ways."""
+    a, b = breakdown(before), breakdown(after)
+    deltas = {}
+    for name in list(a) + [name for name in b if name not in a]:
+        old, new = a.get(name, {}), b.get(name, {})
+        deltas[name] = {
+            "count": (old.get("count", 0), new.get("count", 0)),
+            "total_ms": (old.get("total_ms", 0), new.get("total_ms", 0)),
+            "delta_ms": new.get("total_ms", 0) - old.get("total_ms", 0),
+        }
+    divergence = next((index for index, (x, y) in enumerate(zip(before, after)) if _signature(x) != _signature(y)), None)
+    if divergence is None and len(before) != len(after):
+        divergence = min(len(before), len(after))
+    hashes = [[(index, record["dom"]) for index, record in enumerate(trace) if record.get("dom")] for trace in (before, after)]
+    dom_divergence = next((x[0] for x, y in zip(*hashes) if x[1] != y[1]), None)
+    return {
+        "commands": dict(sorted(deltas.items(), key=lambda item: item[1]["delta_ms"])),
+        "total_ms": (sum(r.get("ms", 0) for r in before), sum(r.get("ms", 0) for r in after)),
+        "divergence": divergence,
+        "dom_divergence": dom_divergence,
+    }
+
+
+def _describe(record):
+    selector = record.get("sel")
+    if isinstance(selector, list):
+        selector = selector[0] + (f" (+{len(selector) - 1})" if len(selector) > 1 else "")
+    return record["c"] + (f" {selector}" if selector else "")
+
+
+def print_breakdown(rows, title):
+    print(f"\n📊 {title}\n")
+    print(f"{'':<40} {'count':>6} {'total ms':>9} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8} {'share':>6} {'bytes':>8}")
+    for name, row in rows.items():
+        print(f"{name[:40]:<40} {row['count']:>6} {row['total_ms']:>9.0f} {row['mean_ms']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['max_ms']:>8.1f} {row['share']:>6.0%} {row['bytes']:>8}")
+
+
+def print_comparison(result, before, after):
+    print("\n📊 Change per command (after - before)\n")
+    print(f"{'':<40} {'count':>11} {'total ms':>19} {'delta ms':>9}")
+    for name, row in result["commands"].items():
+        count = f"{row['count'][0]} -> {row['count'][1]}"
+        total = f"{row['total_ms'][0]:.0f} -> {row['total_ms'][1]:.0f}"
+        print(f"{name[:40]:<40} {count:>11} {total:>19} {row['delta_ms']:>+9.0f}")
+    old, new = result["total_ms"]
+    print(f"\nWebDriver time: {old:.0f} ms -> {new:.0f} ms ({new - old:+.0f} ms)")
+    index = result["divergence"]
+    if index is None:
+        print("✅ Same command sequence")
+    else:
+        print(f"Flows differ from command {index}:")
+        print(f"  before: {_describe(before[index]) if index < len(before) else '(end of trace)'}")
+        print(f"  after:  {_describe(after[index]) if index < len(after) else '(end of trace)'}")
+    if result["dom_divergence"] is not None:
+        print(f"Pages differ after command {result['dom_divergence']} of the first trace: "
+              f"{_describe(before[result['dom_divergence']])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="trace file; its rotated files are read too")
+    parser.add_argument("--session", help="only this session (a job id, or pid-<pid>)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply recorded durations when replaying")
+    parser.add_argument("--compare", metavar="OTHER", help="compare against a second trace")
+    args = parser.parse_args(argv)
+
+    records = read_trace(args.trace, args.session)
+    if not records:
+        print(f"❌ No trace records in {args.trace}")
+        return 1
+    started = time.perf_counter()
+    replayed = replay(records, args.scale)
+    elapsed = time.perf_counter() - started
+    sessions = len({record.get("s") for record in records})
+    print(f"Replayed {len(replayed)} commands from {sessions} session(s) in {elapsed * 1000:.0f} ms")
+    print_breakdown(breakdown(replayed), "WebDriver time per command")
+    print_breakdown(breakdown(replayed, key="st"), "WebDriver time per flow stage")
+
+    if args.compare:
+        other = read_trace(args.compare, args.session)
+        print_comparison(compare(records, other), records, other)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# resource_policy.py
+
+import os
+import re
+
+
+def _extensions(*extensions):
+    """Patterns for files whose path ends in one of `extensions`, with or
+    without a query string. "*.ico*" would also block app.icons.chunk.js."""
+    return [pattern for extension in extensions for pattern in (f"*.{extension}", f"*.{extension}?*")]
+
+
+# Categories of requests the automation never needs. Patterns use Chrome's
+# Network.setBlockedURLs syntax: '*' is the only wildcard and the whole URL
+# must match, hence the trailing '*' after hosts.
+RESOURCE_CATEGORIES = {
+    "images": _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "ico"),
+    "fonts": _extensions("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extensions("mp4", "webm", "mp3", "m4a"),
+    "maps": [
+        "*maps.googleapis.com/maps/vt*",
+        "*maps.gstatic.com*",
+        "*api.mapbox.com/*tiles*",
+        "*tiles.mapbox.com*",
+        "*tile.openstreetmap.org*",
+        "*basemaps.cartocdn.com*",
+    ],
+    "analytics": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*connect.facebook.net*",
+        "*bat.bing.com*",
+        "*cdn.segment.com*",
+        "*api.segment.io*",
+        "*browser-intake-datadoghq.com*",
+    ],
+}
+DEFAULT_CATEGORIES = "images,fonts,media,maps,analytics"
+
+# Check if we're in a production environment
+is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
+
+# "none" turns blocking off; otherwise a comma-separated list of categories.
+# Headless production sessions have nobody looking at the page.
+BLOCK_RESOURCES = os.environ.get('NOVA_BLOCK_RESOURCES', DEFAULT_CATEGORIES if is_production else 'none')
+# Extra comma-separated URL patterns to block
+BLOCKED_URLS = os.environ.get('NOVA_BLOCKED_URLS', '')
+# "eager" returns from driver.get once the DOM is parsed instead of after every image
+PAGE_LOAD_STRATEGY = os.environ.get('NOVA_PAGE_LOAD_STRATEGY', 'eager')
+
+
+def blocked_url_patterns(categories=BLOCK_RESOURCES, extra=BLOCKED_URLS):
+    """The URL patterns to block for a category list like "images,fonts"."""
+    patterns = []
+    if categories and categories.strip().lower() != "none":
+        for category in (name.strip().lower() for name in categories.split(",")):
+            if not category:
+                continue
+            if category not in RESOURCE_CATEGORIES:
+                raise ValueError(
+                    f"Unknown resource category '{category}', expected one of {', '.join(RESOURCE_CATEGORIES)}"
+                )
+            patterns.extend(RESOURCE_CATEGORIES[category])
+    patterns.extend(pattern.strip() for pattern in (extra or "").split(",") if pattern.strip())
+    return patterns
+
+
+def _pattern_regex(pattern):
+    return re.compile(".*".join(re.escape(part) for part in pattern.split("*")) + r"\Z", re.IGNORECASE)
+
+
+def url_blocked(url, patterns):
+    """Whether Chrome would block `url` under `patterns`."""
+    return any(_pattern_regex(pattern).match(url) for pattern in patterns)
+
+
+def apply_resource_policy(driver, patterns=None):
+    """Block matching requests in this driver's browser; returns how many patterns apply."""
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    if not patterns:
+        return 0
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        # Only Chromium speaks CDP; other drivers load everything
+        print(f"Note: Could not apply resource policy: {e}")
+        return 0
+    return len(patterns)
@@ -0,0 +1,243 @@
+# selector_stats.py
+
+import os
+import json
+import time
+import random
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+import metrics
+
+STATS_PATH = os.environ.get(
+    'NOVA_SELECTOR_STATS', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'selector_stats.json')
+)
+# A hit or miss counts half as much after this long, so a DOM change is
+# learned within days and old layouts are forgotten
+HALF_LIFE = float(os.environ.get('NOVA_SELECTOR_HALF_LIFE_DAYS', 7)) * 24 * 3600
+# Pseudo-observations that start every selector at a hit rate of 0.5
+PRIOR = 1.0
+# Sessions are short; counts are also written when the process exits
+FLUSH_INTERVAL = 60
+# Share of lookups that use the written order, so selectors pushed back by
+# an outage get probed again and can win their place back
+EXPLORE = float(os.environ.get('NOVA_SELECTOR_EXPLORE', 0.1))
+
+COUNTERS = ("lookups", "found", "depth", "first", "seconds")
+
+
+def _decayed(entry, now, half_life):
+    """A copy of a step's counts decayed to `now`."""
+    factor = 0.5 ** (max(0.0, now - entry.get("at", now)) / half_life) if half_life > 0 else 1.0
+    return {
+        "at": now,
+        **{key: entry.get(key, 0.0) * factor for key in COUNTERS},
+        "selectors": {
+            selector: [hits * factor, misses * factor]
+            for selector, (hits, misses) in entry.get("selectors", {}).items()
+        },
+    }
+
+
+def _merge(a, b):
+    """Sum of two step entries decayed to the same time."""
+    merged = {"at": a["at"], **{key: a[key] + b[key] for key in COUNTERS}, "selectors": dict(a["selectors"])}
+    for selector, (hits, misses) in b["selectors"].items():
+        old_hits, old_misses = merged["selectors"].get(selector, (0.0, 0.0))
+        merged["selectors"][selector] = [old_hits + hits, old_misses + misses]
+    return merged
+
+
+class LastResort(str):
+    """A catch-all selector (e.g. "input") that always stays behind the specific ones.
+
+    It matches whenever anything like the element is on the page, so once
+    moved ahead it would win every lookup and hide the specific selectors.
+    """
+
+
+@contextmanager
+def _file_lock(path):
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SelectorStats:
+    """Which selector of each step's fallback list matched, and how deep.
+
+    For every step (e.g. "location.pickup_input") it keeps, per selector,
+    hits and misses that decay with `half_life`, and for the step the
+    number of lookups, how many found an element, the summed fallback
+    depth (selectors probed before the match), how many matched on the
+    first probe, and the time spent. `order()` puts the selectors that have
+    been matching first; selectors never tried keep their written order
+    between the ones that hit and the ones that missed. LastResort
+    selectors stay last, and an `explore` share of lookups uses the written
+    order so pushed-back selectors are probed again.
+
+    Sessions in other processes share the file: counts are kept as a delta
+    and added to what is on disk when flushed. With `path=None` nothing is
+    read or written.
+    """
+
+    def __init__(self, path, half_life=HALF_LIFE, clock=time.time, flush_interval=FLUSH_INTERVAL,
+                 explore=EXPLORE, random=random.random):
+        self.path = path
+        self.half_life = half_life
+        self.flush_interval = flush_interval
+        self.explore = explore
+        self._random = random
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._steps = {}
+        self._pending = {}
+        self._flushed_at = clock()
+        self._load()
+
+    def _read(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Note: Ignoring unreadable selector stats {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        self._steps = self._read()
+
+    def _write(self, steps):
+        directory = os.path.dirname(self.path)
+        # Write then rename, so a crash never leaves a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(steps, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Note: Could not save selector stats: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def flush(self):
+        """Add this process's counts to the file and pick up other processes' counts."""
+        if not self.path:
+            return
+        with self._lock:
+            self._flushed_at = self._clock()
+            if not self._pending:
+                return
+            now = self._clock()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                with _file_lock(self.path + ".lock"):
+                    steps = self._read()
+                    for step, pending in self._pending.items():
+                        steps[step] = _merge(_decayed(steps.get(step, {}), now, self.half_life),
+                                             _decayed(pending, now, self.half_life))
+                    self._write(steps)
+            except OSError as e:
+                print(f"Note: Could not save selector stats: {e}")
+                return
+            self._steps = steps
+            self._pending = {}
+
+    def _score(self, entry, selector):
+        hits, misses = entry["selectors"].get(selector, (0.0, 0.0))
+        return (hits + PRIOR / 2) / (hits + misses + PRIOR)
+
+    def _entry(self, step, now):
+        return _merge(_decayed(self._steps.get(step, {}), now, self.half_life),
+                      _decayed(self._pending.get(step, {}), now, self.half_life))
+
+    def order(self, step, selectors):
+        """`selectors` with the ones that have been matching for `step` first, catch-alls last."""
+        specific = [selector for selector in selectors if not isinstance(selector, LastResort)]
+        last = [selector for selector in selectors if isinstance(selector, LastResort)]
+        with self._lock:
+            now = self._clock()
+            entry = self._entry(step, now)
+            if not entry["selectors"] or self._random() < self.explore:
+                return specific + last
+            scores = {selector: self._score(entry, selector) for selector in specific}
+        # Stable, so ties keep their written order
+        return sorted(specific, key=lambda selector: -scores[selector]) + last
+
+    def record(self, step, probed, index, seconds):
+        """Count a lookup of `step` that tried `probed` in order and matched probed[index] (or None)."""
+        with self._lock:
+            now = self._clock()
+            pending = _decayed(self._pending.get(step, {}), now, self.half_life)
+            pending["lookups"] += 1
+            pending["seconds"] += seconds
+            missed = probed if index is None else probed[:index]
+            for selector in missed:
+                pending["selectors"].setdefault(selector, [0.0, 0.0])[1] += 1
+            if index is not None:
+                pending["selectors"].setdefault(probed[index], [0.0, 0.0])[0] += 1
+                pending["found"] += 1
+                pending["depth"] += index
+                pending["first"] += 1 if index == 0 else 0
+            self._pending[step] = pending
+            due = self.path and now - self._flushed_at >= self.flush_interval
+        if index is not None:
+            metrics.observe("nova_selector_depth", index, step=step)
+        if due:
+            self.flush()
+
+    def report(self):
+        """Per step: recent lookups, fallback depth, first-probe rate, lookup time and best selectors."""
+        with self._lock:
+            now = self._clock()
+            steps = {step: self._entry(step, now) for step in set(self._steps) | set(self._pending)}
+        report = {}
+        for step, entry in sorted(steps.items()):
+            if entry["lookups"] <= 0:
+                continue
+            found = entry["found"] or 1
+            ranked = sorted(entry["selectors"], key=lambda selector: -self._score(entry, selector))
+            report[step] = {
+                "lookups": entry["lookups"],
+                "found_rate": entry["found"] / entry["lookups"],
+                "depth": entry["depth"] / found,
+                "first_probe_rate": entry["first"] / found,
+                "ms": 1000 * entry["seconds"] / entry["lookups"],
+                "order": [(selector, round(self._score(entry, selector), 3)) for selector in ranked],
+            }
+        return report
+
+
+def print_selector_report(report=None):
+    report = get_selector_stats().report() if report is None else report
+    if not report:
+        return
+    print("🔎 Selector fallback depth per step (recent, decayed)")
+    for step, entry in report.items():
+        print(
+            f"   {step}: depth {entry['depth']:.2f}, {entry['first_probe_rate']:.0%} on the first probe, "
+            f"{entry['found_rate']:.0%} found, {entry['ms']:.0f} ms, first: {entry['order'][0][0]}"
+        )
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_selector_stats():
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = SelectorStats(None if STATS_PATH == 'off' else STATS_PATH)
+            atexit.register(_stats.flush)
+        return _stats
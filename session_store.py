@@ -0,0 +1,229 @@
+# session_store.py
+
+import os
+import json
+import time
+import base64
+import getpass
+import hashlib
+import tempfile
+import threading
+
+# Check if we're in a production environment
+is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
+
+# Headless production drivers have no persistent profile to keep the login in
+SESSION_SNAPSHOTS = os.environ.get('NOVA_SESSION_SNAPSHOTS', '1' if is_production else '0') != '0'
+SESSION_DIR = os.environ.get(
+    'NOVA_SESSION_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'sessions')
+)
+SESSION_KEY = os.environ.get('NOVA_SESSION_KEY')
+SESSION_MAX_AGE = float(os.environ.get('NOVA_SESSION_MAX_AGE_HOURS', 72)) * 3600
+# Snapshots older than this share of their lifetime are re-taken on the next logged-in check
+REFRESH_FRACTION = 0.5
+ORIGIN = "https://m.uber.com"
+# Fields Network.setCookies accepts
+_CDP_COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+READ_LOCAL_STORAGE_JS = "return Object.assign({}, window.localStorage);"
+
+# Runs before any page script. Values the page already has are left alone.
+RESTORE_LOCAL_STORAGE_JS = """
+(function (origin, items) {
+    if (location.origin !== origin) return;
+    try {
+        for (var key in items) {
+            if (localStorage.getItem(key) === null) localStorage.setItem(key, items[key]);
+        }
+    } catch (e) {}
+})(%s, %s);
+"""
+
+
+def fernet_cipher(secret):
+    """A Fernet cipher keyed by any secret string; needs the cryptography package."""
+    from cryptography.fernet import Fernet
+    key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+    return Fernet(key)
+
+
+class SessionStore:
+    """Encrypted snapshot of one user's Uber cookies and localStorage.
+
+    The file is a one-line plain JSON header with the snapshot's timestamps,
+    followed by the encrypted snapshot, so freshness is checked without
+    decrypting. `cipher` is anything with encrypt(bytes) and decrypt(bytes).
+    """
+
+    def __init__(self, path, cipher, max_age=SESSION_MAX_AGE, clock=time.time):
+        self.path = path
+        self.cipher = cipher
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    # --- file ---
+    def header(self):
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self):
+        header = self.header()
+        return header is not None and header.get("expires_at", 0) > self._clock()
+
+    def needs_refresh(self):
+        header = self.header()
+        if header is None:
+            return True
+        return self._clock() - header.get("saved_at", 0) > self.max_age * REFRESH_FRACTION
+
+    def load(self):
+        """The snapshot if it is fresh and decrypts, else None."""
+        if not self.is_fresh():
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                f.readline()
+                return json.loads(self.cipher.decrypt(f.read().strip()))
+        except Exception as e:
+            # Wrong key or a damaged file; a new login replaces it
+            print(f"Note: Discarding unreadable session snapshot: {e}")
+            self.clear()
+            return None
+
+    def save(self, snapshot):
+        now = self._clock()
+        expiries = [cookie["expires"] for cookie in snapshot["cookies"] if cookie.get("expires", -1) > 0]
+        expires_at = now + self.max_age
+        if expiries:
+            # Once the longest-lived cookie is gone there is nothing left to log in with
+            expires_at = min(expires_at, max(expiries))
+        header = {"saved_at": now, "expires_at": expires_at}
+        token = self.cipher.encrypt(json.dumps(snapshot).encode("utf-8"))
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            # Write then rename, so a crash never leaves a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(json.dumps(header).encode("utf-8") + b"\n" + token)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # --- browser ---
+    def capture(self, driver):
+        """Cookies of every domain (auth lives on more than one) and the site's localStorage."""
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception:
+            cookies = driver.get_cookies()
+            for cookie in cookies:
+                cookie["expires"] = cookie.pop("expiry", -1)
+        local_storage = driver.execute_script(READ_LOCAL_STORAGE_JS) or {}
+        return {"cookies": cookies, "local_storage": local_storage, "origin": ORIGIN}
+
+    def snapshot(self, driver):
+        try:
+            self.save(self.capture(driver))
+            print("✅ Session snapshot saved")
+            return True
+        except Exception as e:
+            print(f"Note: Could not save session snapshot: {e}")
+            return False
+
+    def restore(self, driver):
+        """Inject the snapshot into a driver that has not loaded a page yet."""
+        snapshot = self.load()
+        if snapshot is None:
+            return False
+        now = self._clock()
+        cookies = [
+            {key: value for key, value in cookie.items() if key in _CDP_COOKIE_FIELDS}
+            for cookie in snapshot["cookies"]
+            if not 0 < cookie.get("expires", -1) < now
+        ]
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+            if snapshot.get("local_storage"):
+                source = RESTORE_LOCAL_STORAGE_JS % (json.dumps(snapshot["origin"]), json.dumps(snapshot["local_storage"]))
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        except Exception as e:
+            print(f"Note: Could not restore session snapshot: {e}")
+            return False
+        print(f"✅ Restored session with {len(cookies)} cookies")
+        return True
+
+
+def session_path(user=None):
+    user = user or os.environ.get('NOVA_USER') or getpass.getuser()
+    safe_user = "".join(char if char.isalnum() or char in "-_." else "_" for char in user)
+    return os.path.join(SESSION_DIR, f"{safe_user}.session")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+_restored = set()
+_restored_lock = threading.Lock()
+
+
+def _open_store(path):
+    # Cookies are credentials; without encryption they are not stored at all
+    if not SESSION_KEY:
+        print("Note: NOVA_SESSION_KEY is not set; session snapshots are disabled")
+        return None
+    try:
+        return SessionStore(path, fernet_cipher(SESSION_KEY))
+    except ImportError:
+        print("Note: cryptography is not installed; session snapshots are disabled")
+        return None
+
+
+def get_session_store(user=None):
+    """The session store of `user`, or None when snapshots are off or can't be encrypted."""
+    if not SESSION_SNAPSHOTS:
+        return None
+    path = session_path(user)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = _open_store(path)
+        return _stores[path]
+
+
+def restore_session(driver):
+    """Before the first navigation: log the driver in from the saved snapshot."""
+    store = get_session_store()
+    if store is None or not store.restore(driver):
+        return False
+    with _restored_lock:
+        _restored.add(getattr(driver, "session_id", id(driver)))
+    return True
+
+
+def take_restored(driver):
+    """True once for a driver whose session was restored from a fresh snapshot."""
+    with _restored_lock:
+        key = getattr(driver, "session_id", id(driver))
+        if key in _restored:
+            _restored.discard(key)
+            return True
+        return False
+
+
+def save_session(driver, force=False):
+    """Snapshot a logged-in driver, unless a recent snapshot exists."""
+    store = get_session_store()
+    if store is None or (not force and not store.needs_refresh()):
+        return False
+    return store.snapshot(driver)
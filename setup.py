@@ -10,6 +10,8 @@ import os
 import sys
 import subprocess
 import platform
+import importlib
+import importlib.util
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -32,10 +34,10 @@ def check_python_version():
 def check_werkzeug_compatibility():
     """Check if werkzeug version is compatible with Flask"""
     try:
-        import pkg_resources
-        
-        flask_version = pkg_resources.get_distribution("flask").version
-        werkzeug_version = pkg_resources.get_distribution("werkzeug").version
+        from importlib import metadata
+
+        flask_version = metadata.version("flask")
+        werkzeug_version = metadata.version("werkzeug")
         
         print(f"\n🔍 Checking Flask and Werkzeug compatibility...")
         print(f"   Flask version: {flask_version}")
@@ -57,7 +59,7 @@ def check_werkzeug_compatibility():
                 return False
         
         return True
-    except (pkg_resources.DistributionNotFound, ImportError) as e:
+    except (metadata.PackageNotFoundError, ImportError) as e:
         print(f"⚠️ Could not check Flask/Werkzeug compatibility: {e}")
         print("   This check will be performed after dependencies are installed")
         return True
@@ -157,10 +159,11 @@ def main():
     
     # If undetected-chromedriver installation failed, try manual installation
     if deps_ok:
-        try:
-            import undetected_chromedriver
+        # Packages pip just installed are not in the finders' caches yet
+        importlib.invalidate_caches()
+        if importlib.util.find_spec("undetected_chromedriver") is not None:
             print("✅ undetected-chromedriver is installed correctly")
-        except ImportError:
+        else:
             print("❌ undetected-chromedriver not found, trying manual installation")
             undetected_ok = install_undetected_chromedriver_manually()
     
@@ -0,0 +1,241 @@
+# speech_output.py
+
+import os
+import re
+import time
+import atexit
+import threading
+from queue import Queue
+from concurrent.futures import Future, InvalidStateError, CancelledError
+from tts_cache import speech_file, cached_speech_file
+from metrics import span, observe
+
+# Check if we're in a production environment
+is_production = os.environ.get('RAILWAY_ENVIRONMENT') == 'production' or os.environ.get('RENDER') == 'true'
+
+STREAMING = os.environ.get('NOVA_TTS_STREAMING', '1') != '0'
+SYNTH_WORKERS = max(1, int(os.environ.get('NOVA_TTS_WORKERS', 3)))
+# Shorter texts are synthesized whole, which keeps the phrase bank cacheable
+STREAM_MIN_CHARS = 100
+CHUNK_MAX_CHARS = 80
+CHUNK_MIN_CHARS = 12
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def play_file(path):
+    # Only import playsound in development environment
+    from playsound import playsound
+    playsound(path)
+
+
+def split_for_streaming(text, max_chars=CHUNK_MAX_CHARS, min_chars=CHUNK_MIN_CHARS):
+    """Split text at sentence, then clause, boundaries into speakable chunks."""
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                pieces.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            pieces.append(current)
+
+    # Fold fragments like "Ride 1:" into their neighbour
+    chunks = []
+    for piece in pieces:
+        if chunks and (len(piece) < min_chars or len(chunks[-1]) < min_chars):
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+class Chunk:
+    __slots__ = ("text", "lang", "future")
+
+    def __init__(self, text, lang):
+        self.text = text
+        self.lang = lang
+        self.future = Future()
+
+
+class Utterance:
+    __slots__ = ("text", "lang", "future", "chunks")
+
+    def __init__(self, text, lang='en'):
+        self.text = text
+        self.lang = lang
+        self.future = Future()
+        self.chunks = []
+
+    def cancel(self):
+        for chunk in self.chunks:
+            chunk.future.cancel()
+        return self.future.cancel()
+
+
+class SpeechOutput:
+    """Speaks queued utterances in order on background threads.
+
+    `say()` returns a Future that resolves to True once the text has been
+    played (False if synthesis or playback failed), so callers can keep
+    working while Nova talks. Long texts are split at sentence and clause
+    boundaries and the chunks are synthesized in parallel on a small worker
+    pool; playback starts as soon as the first chunk is ready. Queued
+    utterances can be cancelled; the chunk that is playing always finishes.
+    """
+
+    def __init__(self, synthesize=speech_file, player=play_file, enabled=None,
+                 streaming=STREAMING, workers=SYNTH_WORKERS, lookup=cached_speech_file):
+        self.enabled = (not is_production) if enabled is None else enabled
+        self.streaming = streaming
+        self.workers = workers
+        self._synthesize = synthesize
+        self._player = player
+        self._lookup = lookup
+        self._synth_queue = Queue()
+        self._play_queue = Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = []
+        self._threads = []
+        self._closed = False
+
+    def _start(self):
+        if self._threads:
+            return
+        targets = [("speech-play", self._play_loop)]
+        targets += [(f"speech-synth-{index}", self._synth_loop) for index in range(self.workers)]
+        for name, target in targets:
+            # Daemon threads, so queued speech never blocks interpreter exit
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _chunks_for(self, text, lang):
+        if not self.streaming or len(text) < STREAM_MIN_CHARS:
+            return [text]
+        # A text rendered whole before plays straight from the cache
+        try:
+            if self._lookup and self._lookup(text, lang):
+                return [text]
+        except Exception:
+            pass
+        return split_for_streaming(text) or [text]
+
+    # --- public API ---
+    def say(self, text, lang='en'):
+        utterance = Utterance(text, lang)
+        if not self.enabled or not text or not text.strip():
+            utterance.future.set_result(True)
+            return utterance.future
+        utterance.chunks = [Chunk(chunk, lang) for chunk in self._chunks_for(text, lang)]
+        with self._lock:
+            if self._closed:
+                utterance.cancel()
+                return utterance.future
+            self._start()
+            self._pending.append(utterance)
+        # Workers take chunks first come, first served, so earlier
+        # utterances are synthesized first
+        for chunk in utterance.chunks:
+            self._synth_queue.put(chunk)
+        self._play_queue.put(utterance)
+        return utterance.future
+
+    def cancel(self):
+        """Drop all queued utterances; returns how many."""
+        with self._lock:
+            pending = list(self._pending)
+        return sum(1 for utterance in pending if utterance.cancel())
+
+    flush = cancel
+
+    def wait_idle(self, timeout=None):
+        """Block until everything queued so far has been played or dropped."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def is_idle(self):
+        with self._lock:
+            return not self._pending
+
+    def close(self, drain_timeout=30):
+        # Let the last words (e.g. the goodbye) finish before dropping the rest
+        self.wait_idle(drain_timeout)
+        with self._lock:
+            self._closed = True
+        self.cancel()
+
+    # --- workers ---
+    def _finish(self, utterance, result=None):
+        for chunk in utterance.chunks:
+            chunk.future.cancel()
+        try:
+            utterance.future.set_result(result)
+        except InvalidStateError:
+            pass  # cancelled by the caller
+        with self._idle:
+            if utterance in self._pending:
+                self._pending.remove(utterance)
+            self._idle.notify_all()
+
+    def _synth_loop(self):
+        while True:
+            chunk = self._synth_queue.get()
+            if not chunk.future.set_running_or_notify_cancel():
+                continue
+            try:
+                chunk.future.set_result(self._synthesize(chunk.text, chunk.lang))
+            except Exception as e:
+                chunk.future.set_exception(e)
+
+    def _play_loop(self):
+        while True:
+            utterance = self._play_queue.get()
+            # Returns False if the utterance was cancelled while queued
+            if not utterance.future.set_running_or_notify_cancel():
+                self._finish(utterance)
+                continue
+            try:
+                with span("tts"):
+                    # Silence between the previous utterance ending and this one starting
+                    turn_started = time.monotonic()
+                    for index, chunk in enumerate(utterance.chunks):
+                        audio = chunk.future.result()
+                        if index == 0:
+                            observe(
+                                "nova_tts_first_audio_seconds",
+                                time.monotonic() - turn_started,
+                                mode="stream" if len(utterance.chunks) > 1 else "whole",
+                            )
+                        self._player(audio)
+                self._finish(utterance, True)
+            except CancelledError:
+                self._finish(utterance, False)
+            except ImportError:
+                print("Text-to-speech not available: playsound module not found")
+                self._finish(utterance, False)
+            except Exception as e:
+                print(f"Text-to-speech error: {e}")
+                self._finish(utterance, False)
+
+
+_output = None
+_output_lock = threading.Lock()
+
+
+def get_speech_output():
+    global _output
+    with _output_lock:
+        if _output is None:
+            _output = SpeechOutput()
+            atexit.register(_output.close)
+        return _output
@@ -1,6 +1,6 @@
 #!/bin/bash
 
-# Startup script for Nova AI application on Render.com
+# Startup script for Nova AI application on Render.com, Railway and Heroku
 # This script ensures proper environment setup before starting the application
 
 echo "===== Starting Nova AI application setup ====="
@@ -9,18 +9,33 @@ echo "===== Starting Nova AI application setup ====="
 echo "Python version:"
 python --version
 
-# Ensure correct werkzeug version is installed
-echo "\nInstalling werkzeug==2.0.3..."
-pip install werkzeug==2.0.3
+# werkzeug and setuptools are pinned in requirements.txt and installed by
+# the build, so nothing is installed here
 
-# Pin setuptools to avoid pkg_resources deprecation warning
-echo "\nInstalling setuptools<81.0.0..."
-pip install "setuptools<81.0.0"
-
-# Run pre-start checks
+# Run pre-start checks; the results are cached, so workers booting
+# afterwards only compare the fingerprint
 echo "\nRunning pre-start checks..."
 python pre_start.py
 
+# Workers enqueue sessions into one queue file; a separate runner process
+# starts them, so NOVA_MAX_SESSIONS holds however many workers there are.
+# The runner shares the queue file with gunicorn, so it runs in this
+# container and is restarted here if it exits; /health reports 503 while
+# no runner is alive.
+export NOVA_JOB_QUEUE="${NOVA_JOB_QUEUE:-1}"
+if [ "$NOVA_JOB_QUEUE" != "0" ]; then
+    echo "\nStarting Nova job runner..."
+    (
+        while true; do
+            python job_runner.py
+            echo "Nova job runner exited with status $?; restarting in 5s"
+            sleep 5
+        done
+    ) &
+fi
+
 # Start the application with gunicorn
+# Threaded workers keep the /jobs/<id>/events progress streams from
+# tying up a whole worker each
 echo "\n===== Starting application with gunicorn ====="
-exec gunicorn app:app
\ No newline at end of file
+exec gunicorn app:app --workers "${WEB_CONCURRENCY:-2}" --worker-class gthread --threads 8
\ No newline at end of file
@@ -0,0 +1,230 @@
+# stt_backends.py
+
+import os
+import json
+import time
+import queue
+import threading
+import multiprocessing
+import speech_recognition as sr
+from metrics import observe
+
+STT_BACKEND = os.environ.get('NOVA_STT_BACKEND', 'google')
+VOSK_MODEL = os.environ.get('NOVA_VOSK_MODEL', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'vosk-model'))
+# How long to wait for the worker's final result after the user stops talking
+FINAL_TIMEOUT = 3.0
+
+
+class RecognizerBackend:
+    """Turns one spoken phrase from an AudioSession into text.
+
+    `transcribe` raises sr.WaitTimeoutError if nobody speaks, and
+    sr.UnknownValueError if the speech could not be understood.
+    """
+
+    name = None
+    streaming = False
+
+    def available(self):
+        return True
+
+    def transcribe(self, session, timeout=None, phrase_time_limit=None, language='en-US', on_partial=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GoogleBackend(RecognizerBackend):
+    """Records the whole phrase, then uploads it to Google's recognizer."""
+
+    name = "google"
+
+    def transcribe(self, session, timeout=None, phrase_time_limit=None, language='en-US', on_partial=None):
+        audio = session.listen(timeout=timeout, phrase_time_limit=phrase_time_limit)
+        ended = time.monotonic()
+        try:
+            return session.recognize(audio, language=language)
+        finally:
+            observe("nova_stt_final_seconds", time.monotonic() - ended, backend=self.name)
+
+
+# === Vosk Worker Process ===
+def _vosk_worker(model_path, requests, results):
+    # Runs in its own process so decoding never competes with the
+    # capture thread for the GIL. The model is loaded once and reused.
+    try:
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+        SetLogLevel(-1)
+        model = Model(model_path)
+    except Exception as e:
+        results.put(("error", None, f"Could not load Vosk model: {e}"))
+        return
+    results.put(("ready", None, None))
+
+    recognizer, utterance, segments, last_partial = None, None, [], ""
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+        kind, utterance_id, payload = message
+        if kind == "start":
+            sample_rate, grammar = payload
+            if grammar:
+                # Restricting the vocabulary makes keyword spotting cheap and precise
+                recognizer = KaldiRecognizer(model, sample_rate, grammar)
+            else:
+                recognizer = KaldiRecognizer(model, sample_rate)
+            utterance, segments, last_partial = utterance_id, [], ""
+        elif recognizer is None or utterance_id != utterance:
+            continue  # audio of an abandoned utterance
+        elif kind == "audio":
+            if recognizer.AcceptWaveform(payload):
+                # Vosk settled a segment at a short pause inside the phrase
+                segments.append(json.loads(recognizer.Result()).get("text", ""))
+                partial = ""
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+            hypothesis = " ".join(part for part in segments + [partial] if part)
+            if hypothesis and hypothesis != last_partial:
+                last_partial = hypothesis
+                results.put(("partial", utterance_id, hypothesis))
+        elif kind == "end":
+            segments.append(json.loads(recognizer.FinalResult()).get("text", ""))
+            results.put(("final", utterance_id, " ".join(part for part in segments if part)))
+            recognizer = None
+
+
+class VoskBackend(RecognizerBackend):
+    """Local streaming recognizer; works without a network connection.
+
+    Audio is sent to a Vosk worker process chunk by chunk while it is being
+    captured, so only the last chunk is left to decode when the user stops
+    talking. Partial hypotheses are passed to `on_partial` as they arrive.
+    The language is whatever the model at NOVA_VOSK_MODEL was trained on.
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL, worker=_vosk_worker):
+        self.model_path = model_path
+        self._worker = worker
+        self._lock = threading.Lock()
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._utterance = 0
+
+    def available(self):
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        return os.path.isdir(self.model_path)
+
+    def start(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return self
+            context = multiprocessing.get_context("spawn")
+            self._requests = context.Queue()
+            self._results = context.Queue()
+            self._process = context.Process(
+                target=self._worker,
+                args=(self.model_path, self._requests, self._results),
+                name="vosk-worker",
+                daemon=True,
+            )
+            self._process.start()
+            # Loading a model takes a few seconds; later calls reuse it
+            kind, _, error = self._results.get(timeout=60)
+            if kind == "error":
+                self._process = None
+                raise RuntimeError(error)
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                self._requests.put(None)
+                self._process.join(timeout=2)
+            self._process = None
+
+    def _drain(self, utterance_id, on_partial, block_until_final=False):
+        deadline = time.monotonic() + FINAL_TIMEOUT
+        while True:
+            try:
+                if block_until_final:
+                    kind, result_id, text = self._results.get(timeout=max(0.0, deadline - time.monotonic()))
+                else:
+                    kind, result_id, text = self._results.get_nowait()
+            except queue.Empty:
+                if block_until_final:
+                    raise sr.RequestError("Vosk worker did not return a result in time")
+                return None
+            if result_id != utterance_id:
+                continue
+            if kind == "final":
+                return text
+            if kind == "partial" and on_partial is not None:
+                on_partial(text)
+
+    # --- one utterance at a time ---
+    def open_utterance(self, sample_rate, grammar=None):
+        """Start decoding a new utterance; `grammar` is a list of allowed phrases."""
+        self.start()
+        with self._lock:
+            self._utterance += 1
+            utterance_id = self._utterance
+        self._requests.put(("start", utterance_id, (sample_rate, json.dumps(grammar) if grammar else None)))
+        return utterance_id
+
+    def feed(self, utterance_id, chunk, on_partial=None):
+        self._requests.put(("audio", utterance_id, chunk))
+        self._drain(utterance_id, on_partial)
+
+    def finish(self, utterance_id, on_partial=None):
+        self._requests.put(("end", utterance_id, None))
+        return self._drain(utterance_id, on_partial, block_until_final=True)
+
+    def transcribe(self, session, timeout=None, phrase_time_limit=None, language='en-US', on_partial=None):
+        utterance_id = None
+        for chunk in session.stream(timeout=timeout, phrase_time_limit=phrase_time_limit):
+            if utterance_id is None:
+                utterance_id = self.open_utterance(session.sample_rate)
+            self.feed(utterance_id, chunk, on_partial)
+        if utterance_id is None:
+            raise sr.WaitTimeoutError("No speech captured")
+        ended = time.monotonic()
+        text = self.finish(utterance_id, on_partial)
+        observe("nova_stt_final_seconds", time.monotonic() - ended, backend=self.name)
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, VoskBackend)}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown STT backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+
+_recognizer = None
+_recognizer_lock = threading.Lock()
+
+
+def get_recognizer():
+    global _recognizer
+    with _recognizer_lock:
+        if _recognizer is None:
+            backend = get_backend(STT_BACKEND)
+            if not backend.available():
+                print(f"Note: STT backend '{backend.name}' is not installed, using Google speech recognition")
+                backend = GoogleBackend()
+            _recognizer = backend
+        return _recognizer
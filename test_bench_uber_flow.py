@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Test script for the offline flow benchmark
+
+This script replays the recorded Uber flow against the fake WebDriver and
+fails if round trips, virtual latency or sleep time regress against
+bench_baseline.json.
+"""
+
+import time
+import threading
+from bench_uber_flow import run_benchmark, compare, load_baseline
+from fake_webdriver import VirtualClock
+
+def test_bench_uber_flow():
+    """Test the recorded flow completes without regressing the baseline"""
+    baseline = load_baseline()
+    assert baseline is not None, "bench_baseline.json is missing"
+
+    result = run_benchmark(iterations=50, rtt=baseline["rtt"])
+    print(f"✅ Benchmark: {result['steps']['total']}")
+    assert result["completed"] == 50, "every run should reach the requested trip page"
+
+    regressions = compare(result, baseline)
+    assert not regressions, "\n".join(regressions)
+
+    # A slower flow must be reported
+    faster = {"steps": {name: {metric: value * 0.5 for metric, value in step.items()}
+                        for name, step in baseline["steps"].items()}}
+    assert compare(result, faster), "regressions against a faster baseline should be reported"
+
+def test_virtual_clock_only_on_installing_thread():
+    """Test background threads keep real time while the virtual clock is installed"""
+    clock = VirtualClock()
+    seen = {}
+
+    def background():
+        started = time.monotonic()
+        time.sleep(0.05)
+        seen["elapsed"] = time.monotonic() - started
+
+    with clock.installed():
+        time.sleep(30)
+        thread = threading.Thread(target=background)
+        thread.start()
+        thread.join()
+        assert time.monotonic() == 30.0
+    assert clock.slept == 30.0 and clock.sleeps == 1
+    assert 0.04 < seen["elapsed"] < 5, seen
+    print("✅ Virtual time on the bench thread, real time elsewhere")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing offline flow benchmark\n")
+    test_bench_uber_flow()
+    test_virtual_clock_only_on_installing_thread()
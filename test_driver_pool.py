@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Test script for the warm driver pool
+
+This script exercises checkout, release, recycling and health checks
+of driver_pool.DriverPool using a fake driver instead of Chrome.
+"""
+
+import time
+from driver_pool import DriverPool, HOME_URL
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = HOME_URL
+        self.alive = True
+        self.quit_called = False
+        self.delay = 0
+
+    def get(self, url):
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        time.sleep(self.delay)
+        return "complete"
+
+    def quit(self):
+        self.quit_called = True
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_driver_pool():
+    """Test warm checkout, reset on return and recycling"""
+    launched = []
+
+    def factory():
+        driver = FakeDriver()
+        launched.append(driver)
+        return driver
+
+    pool = DriverPool(size=1, max_uses=2, health_interval=0.05, factory=factory).start()
+    try:
+        assert wait_for(lambda: pool.stats()["idle"] == 1), "pool never warmed up"
+
+        with pool.driver() as driver:
+            driver.current_url = "https://m.uber.com/go/product-selection"
+        assert wait_for(lambda: pool.stats()["idle"] == 1)
+        assert driver.current_url == HOME_URL, "returned driver was not reset to home"
+
+        # Second use reaches max_uses, so the driver is recycled and replaced
+        with pool.driver() as same_driver:
+            assert same_driver is driver
+        assert wait_for(lambda: pool.stats()["recycled"] == 1)
+        assert driver.quit_called
+        assert wait_for(lambda: pool.stats()["idle"] == 1)
+
+        # A dead idle driver is replaced by the health check
+        launched[-1].alive = False
+        assert wait_for(lambda: pool.stats()["health_failures"] == 1)
+
+        stats = pool.stats()
+        print(f"✅ Driver pool stats: {stats}")
+        assert stats["hits"] == 2 and stats["misses"] == 0
+    finally:
+        pool.close()
+
+def test_checkout_during_health_check():
+    """Test a checkout during a slow health check waits for the driver instead of launching Chrome"""
+    launched = []
+
+    def factory():
+        driver = FakeDriver()
+        launched.append(driver)
+        return driver
+
+    pool = DriverPool(size=1, health_interval=0.05, factory=factory).start()
+    try:
+        assert wait_for(lambda: pool.stats()["idle"] == 1), "pool never warmed up"
+        launched[0].delay = 0.3
+        assert wait_for(lambda: pool._checking == 1), "health check never started"
+        driver = pool.checkout(timeout=5)
+        assert driver is launched[0] and len(launched) == 1, "checkout cold-launched during a health check"
+        pool.release(driver)
+        assert pool.stats()["live"] == 1
+        print("✅ Checkout waited for the driver being health-checked")
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    print("\n🔍 Testing driver pool\n")
+    test_driver_pool()
+    test_checkout_during_health_check()
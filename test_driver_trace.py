@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Test script for WebDriver tracing and replay
+
+This script traces the booking flow against the recorded fake Uber page,
+to check that commands, selectors, stages and DOM hashes are recorded,
+that the trace file rotates, and that replay_trace reproduces the
+recorded timings and compares traces.
+"""
+
+import os
+import tempfile
+from unittest import mock
+from contextlib import redirect_stdout
+from io import StringIO
+from bench_uber_flow import run_once, RECORDING
+from fake_webdriver import load_recording
+from driver_trace import TraceWriter, read_trace, trace_files
+import driver_trace
+from replay_trace import replay, breakdown, compare
+
+def traced_flow(path, dom="changes"):
+    writer = TraceWriter(path)
+    with redirect_stdout(StringIO()), mock.patch.object(driver_trace, "TRACE_DOM", dom):
+        run_once(load_recording(RECORDING), trace=writer)
+    writer.close()
+    return read_trace(path)
+
+def test_trace_records_flow():
+    """Test a traced run records its commands with selectors, stages and DOM hashes"""
+    with tempfile.TemporaryDirectory() as directory:
+        records = traced_flow(os.path.join(directory, "flow.trace"))
+        assert records and all(record["s"] == "bench" for record in records)
+        commands = {record["c"] for record in records}
+        assert {"script:locate", "script:observe", "find_element", "element.click"} <= commands, commands
+        locate = next(record for record in records if record["c"] == "script:locate")
+        assert isinstance(locate["sel"], list) and locate["st"] == "login" and locate["n"] > 0
+        clicks = [record for record in records if record["c"] == "element.click"]
+        assert all(":" in record["dom"] for record in clicks)
+        assert len({record["dom"] for record in clicks}) > 1, "clicks that change the page must change its hash"
+        untraced = traced_flow(os.path.join(directory, "plain.trace"), dom="off")
+        assert not any("dom" in record for record in untraced) and len(untraced) == len(records)
+        print(f"✅ {len(records)} commands traced across stages {sorted({r.get('st') for r in records})}")
+
+def test_rotation():
+    """Test the trace rotates past its size limit and is read back oldest first"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "small.trace")
+        writer = TraceWriter(path, max_bytes=500, backups=2)
+        for index in range(40):
+            writer.write({"s": "rotate", "c": "find_element", "ms": 1.0, "n": index})
+        writer.close()
+        files = trace_files(path)
+        assert files == [f"{path}.2", f"{path}.1", path]
+        assert all(os.path.getsize(file_path) <= 500 for file_path in files)
+        sizes = [record["n"] for record in read_trace(path)]
+        assert sizes == sorted(sizes) and sizes[-1] == 39 and sizes[0] > 0, "oldest records must be dropped"
+        print(f"✅ Rotated into {len(files)} files keeping the last {len(sizes)} records")
+
+def test_replay_and_compare():
+    """Test replay reproduces the recorded breakdown and identical traces compare equal"""
+    with tempfile.TemporaryDirectory() as directory:
+        records = traced_flow(os.path.join(directory, "flow.trace"))
+        replayed = replay(records)
+        original, again = breakdown(records), breakdown(replayed)
+        assert original.keys() == again.keys()
+        for name, row in original.items():
+            assert row["count"] == again[name]["count"] and row["bytes"] == again[name]["bytes"], name
+            assert abs(row["total_ms"] - again[name]["total_ms"]) < 0.01, name
+        halved = breakdown(replay(records, scale=0.5))
+        assert abs(sum(r["total_ms"] for r in halved.values()) * 2 - sum(r["total_ms"] for r in original.values())) < 0.1
+
+        same = compare(records, replayed)
+        assert same["divergence"] is None and same["dom_divergence"] is None
+        assert all(abs(row["delta_ms"]) < 0.01 for row in same["commands"].values())
+        shorter = compare(records, records[:-3])
+        assert shorter["divergence"] == len(records) - 3
+        print(f"✅ Replayed {len(replayed)} commands with the recorded latency breakdown")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing WebDriver tracing\n")
+    test_trace_records_flow()
+    test_rotation()
+    test_replay_and_compare()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Test script for the fuzzy ride and command matcher
+
+This script checks typical recognizer slips against ride names and
+commands, and that the matcher beats the old substring checks on the
+recorded transcript corpus without picking wrong answers.
+"""
+
+from fuzzy_match import FuzzyMatcher
+from options import ride_matcher
+from bench_matcher import run_benchmark
+
+RIDES = ["Uber Go", "Go Sedan", "Premier", "Uber XL", "Uber Auto", "Moto"]
+
+def test_ride_names():
+    """Test partial, misheard and numbered ride names"""
+    matcher = ride_matcher(RIDES)
+    for transcript, expected in [("uber go", "Uber Go"), ("auto", "Uber Auto"), ("uber excel", "Uber XL"),
+                                 ("premiere", "Premier"), ("the second one", "Go Sedan"), ("ride 6", "Moto")]:
+        match = matcher.best(transcript)
+        print(f"✅ {transcript!r} -> {RIDES[match.candidate]} ({match.confidence:.2f})")
+        assert RIDES[match.candidate] == expected
+        assert matcher.match(transcript) == match.candidate
+
+def test_run_together_words():
+    """Test letters said one by one match the name they spell, not a shorter prefix"""
+    names = ["UberX", "Comfort", "UberXL", "Uber Green", "Black"]
+    matcher = ride_matcher(names)
+    for transcript, expected in [("uber x l", "UberXL"), ("uber x", "UberX"), ("ubergreen", "Uber Green")]:
+        match = matcher.best(transcript)
+        print(f"✅ {transcript!r} -> {names[match.candidate]} ({match.confidence:.2f})")
+        assert matcher.match(transcript) == names.index(expected), match
+
+def test_low_confidence():
+    """Test unrelated and ambiguous answers are re-prompted"""
+    matcher = ride_matcher(RIDES)
+    assert matcher.match("what was that") is None
+    assert matcher.match("") is None
+    # Fits "Uber Go" and "Go Sedan" equally well
+    ambiguous = matcher.best("uber go sedan")
+    assert ambiguous.confidence < matcher.threshold
+    assert {RIDES[ambiguous.candidate], RIDES[ambiguous.runner_up]} == {"Uber Go", "Go Sedan"}
+    print("✅ Low-confidence answers rejected")
+
+def test_commands():
+    """Test commands given as candidate lists"""
+    matcher = FuzzyMatcher({"book": ["book a cab", "open uber"], "exit": ["exit", "quit"]})
+    assert matcher.match("book a cap") == "book"
+    assert matcher.match("open over") == "book"
+    assert matcher.match("quits") == "exit"
+    assert matcher.match("hello") is None
+    print("✅ Commands matched")
+
+def test_transcript_corpus():
+    """Test the fuzzy matcher has fewer errors than substring checks and no mismatches"""
+    result = run_benchmark()
+    fuzzy, substring = result["fuzzy"]["total"], result["substring"]["total"]
+    print(f"✅ Error rate {fuzzy['error_rate']:.1%} vs {substring['error_rate']:.1%} with substring checks")
+    assert fuzzy["error_rate"] < substring["error_rate"] / 2
+    assert fuzzy["mismatch"] == 0, result["failures"]
+
+if __name__ == "__main__":
+    print("\n🔍 Testing fuzzy matcher...\n")
+    test_ride_names()
+    test_run_together_words()
+    test_low_confidence()
+    test_commands()
+    test_transcript_corpus()
+    print("\n✅ All matcher tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Test script for the Nova job queue
+
+This script runs a small stand-in for main.py through two runners sharing
+one queue file, to check the global session limit, idempotency keys,
+status and event streams read from another connection, recovery from a
+runner that stopped sending heartbeats, and the queue statistics and
+their gauges.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from job_queue import JobQueue, RUNNER_TIMEOUT, register_queue_gauges
+from job_runner import JobRunner
+from jobs import QUEUED, SUCCEEDED, FAILED
+from fakes import FakeClock
+from metrics import Registry
+
+FAKE_NOVA = """
+import time
+from progress import step
+print("Nova starting")
+step("driver_ready")
+time.sleep(0.3)
+print("Nova done")
+"""
+
+def wait_until_finished(queue, job_ids, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(queue.get(job_id).finished for job_id in job_ids):
+            return
+        time.sleep(0.05)
+
+def test_shared_queue():
+    """Test two runners never exceed the global limit and any worker can follow a job"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jobs.db")
+        web = JobQueue(path, max_running=2)
+        other_web = JobQueue(path, max_running=2)
+
+        job, created = web.submit("click-1")
+        duplicate, duplicate_created = other_web.submit("click-1")
+        assert created and not duplicate_created and duplicate.id == job.id, "same key across workers must not launch twice"
+        job_ids = [job.id] + [web.submit()[0].id for _ in range(4)]
+        subscription = other_web.get(job.id).subscribe()
+        assert web.stats()["depth"] == 5
+
+        command = [sys.executable, "-c", FAKE_NOVA]
+        runners = [JobRunner(JobQueue(path, max_running=2), slots=2, command=command, poll_interval=0.02).start()
+                   for _ in range(2)]
+        peak = 0
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and not all(web.get(job_id).finished for job_id in job_ids):
+            peak = max(peak, web.counts()["running"])
+            time.sleep(0.01)
+        for runner in runners:
+            runner.stop()
+        print(f"✅ Peak of {peak} sessions with 4 runner slots and a limit of 2")
+        assert 0 < peak <= 2
+
+        streamed = []
+        event = subscription.get(timeout=1)
+        while event:
+            streamed.append(event["type"])
+            event = subscription.get(timeout=0.1)
+        print(f"✅ Streamed events from another worker: {streamed}")
+        assert streamed == ["state", "step", "end"]
+
+        status = other_web.get(job.id).to_dict()
+        assert status["state"] == SUCCEEDED
+        assert status["output"] == ["Nova starting", "Nova done"]
+        assert [s["step"] for s in status["steps"]] == ["driver_ready"]
+
+        stats = web.stats()
+        print(f"✅ Queue stats: {stats}")
+        assert stats["depth"] == 0 and stats["finished"][SUCCEEDED] == 5 and stats["started"] == 5
+        assert stats["wait_p95_seconds"] >= stats["wait_p50_seconds"] > 0
+        assert stats["throughput_per_minute"] > 0
+
+def test_dead_runner_recovered():
+    """Test a job left running by a runner that stopped sending heartbeats is failed, not run again"""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory:
+        queue = JobQueue(os.path.join(directory, "jobs.db"), max_running=1, clock=clock)
+        job, _ = queue.submit()
+        assert queue.claim(runner="old-runner").id == job.id
+        clock.now += RUNNER_TIMEOUT * 0.75
+        queue.heartbeat("old-runner")
+        clock.now += RUNNER_TIMEOUT * 0.75
+        assert queue.claim() is None, "a runner still sending heartbeats keeps its slot"
+        # The container restarts: the new runner may get the same PID, never the same token
+        clock.now += RUNNER_TIMEOUT + 1
+        waiting, _ = queue.submit()
+        claimed = queue.claim()
+        assert claimed is not None and claimed.id == waiting.id, "the dead runner's slot is freed"
+        lost = queue.get(job.id)
+        assert lost.state == FAILED and lost.finished and "Runner exited" in lost.error
+        assert queue.get(waiting.id).state != QUEUED
+        assert [runner["id"] for runner in queue.runners()] == [queue.runner]
+    print("✅ Job of a silent runner failed and its slot reused")
+
+def test_one_stats_query_per_scrape():
+    """Test a /metrics scrape reads the queue statistics once for all queue gauges"""
+    with tempfile.TemporaryDirectory() as directory:
+        queue = JobQueue(os.path.join(directory, "jobs.db"), max_running=3)
+        queue.submit()
+        calls = []
+        stats = queue.stats
+        queue.stats = lambda: calls.append(1) or stats()
+        registry = Registry()
+        register_queue_gauges(registry, queue)
+        text = registry.render()
+    assert len(calls) == 1, calls
+    assert "nova_queue_depth 1" in text and "nova_queue_capacity 3" in text
+    assert 'nova_queue_wait_seconds{quantile="0.95"}' in text
+    print("✅ Six queue gauges rendered from one stats query")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing job queue\n")
+    test_shared_queue()
+    test_dead_runner_recovered()
+    test_one_stats_query_per_scrape()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Test script for the Nova job manager
+
+This script runs a small stand-in for main.py through jobs.JobManager to
+check job states, step events, output streaming, idempotency keys, and
+metric events emitted from several threads.
+"""
+
+import sys
+import time
+from jobs import JobManager, SUCCEEDED, FAILED
+from metrics import registry
+
+FAKE_NOVA = """
+import time
+from progress import step
+time.sleep(0.2)
+print("Nova starting")
+step("driver_ready")
+time.sleep(0.2)
+step("ride_options", options=[{"name": "Uber Go", "price": "₹120"}])
+print("Nova done")
+"""
+
+THREADED_NOVA = """
+import threading
+import metrics
+def work(index):
+    for n in range(200):
+        print(f"worker {index} line {n}")
+        metrics.observe("test_threaded_events_seconds", 0.01, worker=str(index))
+threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+"""
+
+def wait_until_finished(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+def test_job_manager():
+    """Test that jobs report and stream steps, and duplicate keys reuse the running job"""
+    manager = JobManager(max_workers=1, command=[sys.executable, "-c", FAKE_NOVA])
+
+    job, created = manager.submit("click-1")
+    subscription = job.subscribe()
+    duplicate, duplicate_created = manager.submit("click-1")
+    assert created and not duplicate_created and duplicate is job, "same key must not launch twice"
+
+    wait_until_finished(job)
+    streamed = []
+    event = subscription.get(timeout=1)
+    while event:
+        streamed.append(event)
+        event = subscription.get(timeout=0.1)
+    print(f"✅ Streamed events: {[e['type'] for e in streamed]}")
+    steps = [e for e in streamed if e["type"] == "step"]
+    assert len(steps) == 2 and streamed[-1]["type"] == "end"
+    assert steps[1]["data"]["options"][0]["price"] == "₹120"
+    status = job.to_dict()
+    print(f"✅ Job status: {status}")
+    assert status["state"] == SUCCEEDED
+    assert [s["step"] for s in status["steps"]] == ["driver_ready", "ride_options"]
+    assert status["output"] == ["Nova starting", "Nova done"], "event lines are not part of the output"
+    assert manager.get(job.id) is job
+
+    failing = JobManager(max_workers=1, command=[sys.executable, "-c", "raise SystemExit(3)"])
+    failed_job, _ = failing.submit()
+    wait_until_finished(failed_job)
+    assert failed_job.state == FAILED and failed_job.returncode == 3
+
+def test_events_from_threads():
+    """Test metric events emitted from several threads next to print() all reach the job manager"""
+    manager = JobManager(max_workers=1, command=[sys.executable, "-u", "-c", THREADED_NOVA])
+    job, _ = manager.submit()
+    wait_until_finished(job)
+    assert job.state == SUCCEEDED, job.error
+    text = registry.render()
+    counts = [line for line in text.splitlines() if line.startswith("test_threaded_events_seconds_count")]
+    assert len(counts) == 4 and all(line.endswith(" 200") for line in counts), counts
+    assert not any("::nova-event::" in line for line in job.output), "an event was taken for output"
+    print("✅ 800 events from 4 threads parsed next to their print() output")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing job manager\n")
+    test_job_manager()
+    test_events_from_threads()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Test script for booking-flow metrics
+
+This script checks span timing, Prometheus text rendering and the per-span
+overhead of metrics.py.
+"""
+
+import time
+from metrics import Registry, registry, span
+
+def test_prometheus_render():
+    """Test histogram buckets, counters and gauges in the text format"""
+    local = Registry()
+    local.observe("nova_stage_duration_seconds", 0.2, stage="login", outcome="ok")
+    local.observe("nova_stage_duration_seconds", 3.0, stage="login", outcome="ok")
+    local.inc("nova_jobs_total", state="succeeded")
+    local.register_gauge("nova_jobs", lambda: [({"state": "running"}, 1)])
+
+    text = local.render()
+    print(text)
+    assert "# TYPE nova_stage_duration_seconds histogram" in text
+    assert 'nova_stage_duration_seconds_bucket{outcome="ok",stage="login",le="0.25"} 1' in text
+    assert 'nova_stage_duration_seconds_bucket{outcome="ok",stage="login",le="+Inf"} 2' in text
+    assert 'nova_stage_duration_seconds_count{outcome="ok",stage="login"} 2' in text
+    assert 'nova_jobs_total{state="succeeded"} 1' in text
+    assert 'nova_jobs{state="running"} 1' in text
+
+def test_span_overhead():
+    """Test that spans record errors and cost only microseconds"""
+    try:
+        with span("test_stage"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert 'stage="test_stage"' in registry.render() and 'outcome="error"' in registry.render()
+
+    iterations = 10000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with span("overhead"):
+            pass
+    per_span_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"✅ Span overhead: {per_span_us:.1f}µs")
+    assert per_span_us < 100
+
+if __name__ == "__main__":
+    print("\n🔍 Testing metrics\n")
+    test_prometheus_render()
+    test_span_overhead()
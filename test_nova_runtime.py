@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Test script for the preforked Nova runtime
+
+This script forks stand-in sessions from a runtime through
+jobs.JobManager, to check that output, step events and exit codes arrive
+as they do from a main.py subprocess, and that timeouts kill the session.
+"""
+
+import os
+import time
+import tempfile
+from jobs import JobManager, SUCCEEDED, FAILED
+from nova_runtime import NovaRuntime
+
+def fake_session():
+    import progress
+    print("Nova starting")
+    progress.step("driver_ready", pid=os.getpid())
+    print("Nova done")
+    return 0
+
+def failing_session():
+    print("Nova starting")
+    raise SystemExit(3)
+
+def stuck_session():
+    print("Nova starting")
+    time.sleep(60)
+
+def wait_until_finished(job, timeout=15):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+def make_runtime(directory, entry):
+    return NovaRuntime(os.path.join(directory, "runtime.sock"), entry=f"test_nova_runtime:{entry}",
+                       modules=("test_nova_runtime",))
+
+def test_forked_sessions():
+    """Test forked sessions report like subprocesses and each runs in its own process"""
+    with tempfile.TemporaryDirectory() as directory:
+        runtime = make_runtime(directory, "fake_session")
+        try:
+            manager = JobManager(max_workers=2, runtime=runtime)
+            jobs = [manager.submit()[0] for _ in range(2)]
+            for job in jobs:
+                wait_until_finished(job)
+            pids = set()
+            for job in jobs:
+                status = job.to_dict()
+                assert status["state"] == SUCCEEDED, status
+                assert status["output"] == ["Nova starting", "Nova done"]
+                assert status["steps"][0]["step"] == "driver_ready"
+                pids.add(status["steps"][0]["data"]["pid"])
+            assert len(pids) == 2 and runtime._process.pid not in pids
+            print(f"✅ Sessions forked as {sorted(pids)} from runtime {runtime._process.pid}")
+        finally:
+            runtime.stop()
+
+def test_exit_code_and_timeout():
+    """Test exit codes are passed through and a stuck session is killed"""
+    with tempfile.TemporaryDirectory() as directory:
+        runtime = make_runtime(directory, "failing_session")
+        try:
+            job, _ = JobManager(max_workers=1, runtime=runtime).submit()
+            wait_until_finished(job)
+            assert job.state == FAILED and job.returncode == 3
+
+            runtime.entry = "test_nova_runtime:stuck_session"
+            runtime.stop()
+            job, _ = JobManager(max_workers=1, runtime=runtime, timeout=1).submit()
+            wait_until_finished(job)
+            assert job.state == FAILED and job.returncode == -9 and "Timed out" in job.error
+        finally:
+            runtime.stop()
+    print("✅ Exit code passed through and stuck session killed")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing Nova runtime\n")
+    test_forked_sessions()
+    test_exit_code_and_timeout()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Test script for the booking pipeline lanes
+
+This script checks that the browser lane runs alongside the dialogue, that
+lane errors reach the caller and that deferred speech keeps its order.
+"""
+
+import time
+from pipeline import Lane, DeferredSpeech, Urgent
+
+def test_lanes_overlap():
+    """Test the total time is close to the slower lane, not the sum"""
+    started = time.monotonic()
+    browser = Lane("browser", lambda: time.sleep(0.3) or "driver").start()
+    time.sleep(0.3)  # the dialogue
+    assert browser.result(timeout=5) == "driver"
+    elapsed = time.monotonic() - started
+    print(f"✅ Both lanes finished in {elapsed:.2f}s")
+    assert elapsed < 0.5, "lanes should overlap"
+
+    def fail():
+        raise RuntimeError("chrome crashed")
+
+    failing = Lane("browser", fail).start()
+    try:
+        failing.result(timeout=5)
+        assert False, "the lane's error should be re-raised"
+    except RuntimeError as e:
+        assert "chrome crashed" in str(e)
+
+def test_deferred_speech():
+    """Test background messages wait for the dialogue and keep their order"""
+    spoken = []
+    speech = DeferredSpeech(spoken.append)
+    speech("You're already logged in.")
+    spoken.append("Where should I pick you up from?")
+    speech.flush()
+    speech("Login detected.")
+    print(f"✅ Spoken: {spoken}")
+    assert spoken == ["Where should I pick you up from?", "You're already logged in.", "Login detected."]
+
+def test_urgent_speech():
+    """Test urgent messages are said during the dialogue, after those held before them"""
+    spoken = []
+    speech = DeferredSpeech(spoken.append)
+    speech("Checking your login.")
+    speech(Urgent("Please complete the login process manually."))
+    speech("Login detected.")
+    assert spoken == ["Checking your login.", "Please complete the login process manually."]
+    speech.flush()
+    assert spoken[-1] == "Login detected."
+    print(f"✅ Spoken: {spoken}")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing booking pipeline\n")
+    test_lanes_overlap()
+    test_deferred_speech()
+    test_urgent_speech()
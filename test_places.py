@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Test script for the frequent-places cache
+
+This script checks lookups by exact, partial and misheard place names, TTL
+and LRU eviction, persistence, and that the location flow selects the
+suggestion remembered for a place on the recorded Uber session.
+"""
+
+import os
+import tempfile
+from unittest import mock
+from fake_webdriver import FakeDriver, VirtualClock, load_recording
+from bench_uber_flow import RECORDING
+from location import enter_location_details
+from places import PlaceStore, normalize_place
+from fakes import FakeClock
+from selector_stats import SelectorStats
+import selector_stats
+
+METRO = "Connaught Place Metro Station\nRajiv Chowk, New Delhi"
+AIRPORT = "Indira Gandhi International Airport Terminal 3\nNew Delhi, Delhi"
+
+def test_lookup():
+    """Test exact, prefix and fuzzy lookups of spoken places"""
+    store = PlaceStore(None)
+    store.remember("Connaught Place", METRO)
+    store.remember("Airport Terminal 3", AIRPORT)
+    assert normalize_place("Take me to the Airport Terminal three") == "airport terminal 3"
+    assert store.lookup("connaught place") == METRO
+    assert store.lookup("from Connaught Place please") == METRO
+    assert store.lookup("airport") == AIRPORT  # said less
+    assert store.lookup("connaught place new delhi") == METRO  # said more
+    assert store.lookup("conaught plaice") == METRO  # misheard
+    assert store.lookup("india gate") is None
+    print(f"✅ Lookups: {store.stats}")
+
+def test_eviction_and_persistence():
+    """Test entries expire, the least recently used go first, and survive a restart"""
+    clock = FakeClock(1000.0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "user.json")
+        store = PlaceStore(path, ttl=100, max_entries=2, clock=clock)
+        store.remember("home", "Home\nSector 21, Gurugram")
+        clock.now += 10
+        store.remember("office", "Cyber Hub\nGurugram")
+        clock.now += 10
+        store.lookup("home")  # now the most recently used
+        store.remember("gym", "Gold's Gym\nGurugram")
+        assert store.lookup("office") is None and len(store) == 2
+
+        reloaded = PlaceStore(path, ttl=100, max_entries=2, clock=clock)
+        assert reloaded.lookup("gym") == "Gold's Gym\nGurugram"
+        clock.now += 95
+        assert reloaded.lookup("home") is None, "home was last used over the TTL ago"
+        assert reloaded.lookup("gym") is not None
+    print("✅ TTL, LRU eviction and persistence work")
+
+def test_flow_selects_remembered_suggestion():
+    """Test the location flow picks the remembered suggestion, not the first one"""
+    recording = load_recording(RECORDING)
+    store = PlaceStore(None)
+    store.remember("Connaught Place", METRO)
+    clock = VirtualClock()
+    driver = FakeDriver(recording, clock)
+    spoken = []
+    # No learned selector order read from or written to disk
+    with clock.installed(), mock.patch.object(selector_stats, "_stats", SelectorStats(None)):
+        enter_location_details(driver, spoken.append, lambda: "", "connaught place", "airport terminal 3", places=store)
+    assert driver.state == "product_list", driver.state
+    # The second pickup suggestion was clicked; the first destination one on a miss
+    assert store.lookup("connaught place") == METRO
+    assert store.lookup("airport terminal 3") == AIRPORT
+    print("✅ Remembered suggestion selected and new place learned")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing frequent-places cache...\n")
+    test_lookup()
+    test_eviction_and_persistence()
+    test_flow_selects_remembered_suggestion()
+    print("\n✅ All places tests passed")
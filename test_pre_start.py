@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Test script for the pre-start checks
+
+This script checks that the checks import none of the modules they look
+for, and that their results are reused until the fingerprint changes.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from unittest import mock
+import pre_start
+
+PROBE = """
+import sys, pre_start
+pre_start.run_checks(cache_path=sys.argv[1])
+heavy = [name for name, _ in pre_start.CRITICAL_MODULES if name in sys.modules]
+print(",".join(heavy))
+"""
+
+def test_checks_import_nothing():
+    """Test modules are found without being imported"""
+    with tempfile.TemporaryDirectory() as directory:
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, os.path.join(directory, "pre_start.json")],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", f"imported by the checks: {result.stdout.strip()}"
+    assert pre_start.find_module("werkzeug.urls") is not None
+    assert pre_start.find_module("werkzeug.not_a_module") is None
+    print("✅ Critical modules found without importing them")
+
+def test_results_cached_by_fingerprint():
+    """Test the checks only run again when the fingerprint changes"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "pre_start.json")
+        with mock.patch.object(pre_start, "check_modules", wraps=pre_start.check_modules) as checks:
+            assert pre_start.run_checks(cache_path=cache_path)
+            assert pre_start.run_checks(cache_path=cache_path)
+            assert checks.call_count == 1, "second run uses the cached results"
+            with mock.patch.object(pre_start, "fingerprint", lambda: "after pip install"):
+                pre_start.run_checks(cache_path=cache_path)
+            assert checks.call_count == 2
+            pre_start.run_checks(force=True, cache_path=cache_path)
+            assert checks.call_count == 3
+        with open(cache_path) as f:
+            assert json.load(f)["fingerprint"] == pre_start.fingerprint()
+    print("✅ Checks reused until the installed packages change")
+
+def test_missing_module_reported():
+    """Test a missing module fails the checks, cached or not"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "pre_start.json")
+        modules = pre_start.CRITICAL_MODULES + [("nova_missing_module", "Not installed")]
+        with mock.patch.object(pre_start, "CRITICAL_MODULES", modules):
+            assert not pre_start.run_checks(cache_path=cache_path)
+            assert not pre_start.run_checks(cache_path=cache_path)
+    print("✅ Missing module reported")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing pre-start checks\n")
+    test_checks_import_nothing()
+    test_results_cached_by_fingerprint()
+    test_missing_module_reported()
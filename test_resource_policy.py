@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Test script for the resource policy
+
+This script checks the blocked URL patterns and loads the recorded Uber
+home page from the local stand-in with and without the policy.
+"""
+
+from resource_policy import blocked_url_patterns, url_blocked, apply_resource_policy
+from bench_page_load import run_report
+
+class CDPDriver:
+    def __init__(self):
+        self.cdp = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+        return {}
+
+def test_patterns():
+    """Test heavy assets are blocked and the app itself is not"""
+    patterns = blocked_url_patterns("images,fonts,maps,analytics", extra="*hotjar.com*")
+    for url in ["https://m.uber.com/_next/static/media/hero.webp",
+                "https://m.uber.com/_next/static/media/car.png?v=3",
+                "https://m.uber.com/favicon.ico",
+                "https://d3i4yxtzktqr9n.cloudfront.net/web/fonts/UberMove.woff2",
+                "https://maps.googleapis.com/maps/vt?pb=!1m5",
+                "https://api.mapbox.com/styles/v1/uber/tiles/256/12/2048/1361",
+                "https://www.googletagmanager.com/gtm.js?id=GTM-1",
+                "https://static.hotjar.com/c/hotjar.js"]:
+        assert url_blocked(url, patterns), url
+    for url in ["https://m.uber.com/go/home",
+                "https://m.uber.com/_next/static/chunks/main.js",
+                "https://m.uber.com/api/getProducts",
+                "https://m.uber.com/go/tiles/ride-options.js",
+                "https://m.uber.com/_next/static/chunks/app.icons.chunk.js",
+                "https://m.uber.com/_next/static/css/brand.iconfont.css?v=2",
+                "https://m.uber.com/_next/static/chunks/gif.worker.js"]:
+        assert not url_blocked(url, patterns), url
+    assert blocked_url_patterns("none") == []
+    print(f"✅ {len(patterns)} patterns block assets and analytics only")
+
+def test_apply_policy():
+    """Test the policy is sent to Chrome through CDP"""
+    driver = CDPDriver()
+    assert apply_resource_policy(driver, ["*.png*"]) == 1
+    assert driver.cdp[-1] == ("Network.setBlockedURLs", {"urls": ["*.png*"]})
+    assert apply_resource_policy(object(), ["*.png*"]) == 0, "drivers without CDP load everything"
+    print("✅ Policy applied through CDP")
+
+def test_page_load_report():
+    """Test the policy cuts bytes and eager loading returns before the load event"""
+    report = run_report(iterations=1, latency=0.01, kb_per_second=5000)
+    rows = report["configurations"]
+    before, after = rows["no policy, normal"], rows["policy, eager"]
+    print(f"✅ {before['bytes']} -> {after['bytes']} bytes, get() {before['get']:.3f}s -> {after['get']:.3f}s")
+    assert after["bytes"] < before["bytes"] / 2
+    assert not any(path.endswith((".png", ".webp", ".woff2")) for path in after["paths"])
+    assert rows["no policy, eager"]["get"] < rows["no policy, normal"]["get"]
+    assert after["get"] < before["get"]
+
+if __name__ == "__main__":
+    print("\n🔍 Testing resource policy...\n")
+    test_patterns()
+    test_apply_policy()
+    test_page_load_report()
+    print("\n✅ All resource policy tests passed")
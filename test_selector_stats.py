@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Test script for adaptive selector ordering
+
+This script looks up elements through locator.locate on a stub page whose
+DOM changes, to check that the selector that matches moves to the front,
+that old hits decay so a later DOM change is picked up, that catch-all
+selectors stay last, that exploring lookups let a pushed-back selector
+recover, that the fallback depth is reported per step, and that sessions
+sharing the stats file add up their counts.
+"""
+
+import os
+import tempfile
+from unittest import mock
+from locator import locate
+from selector_stats import SelectorStats, LastResort, HALF_LIFE
+import selector_stats
+from fakes import FakeClock
+
+SELECTORS = ['[data-testid="pickup"]', 'input[placeholder*="Pickup"]', "input"]
+
+class StubPage:
+    """Answers LOCATE_JS from the set of selectors present on the page."""
+
+    def __init__(self, present):
+        self.present = set(present)
+
+    def execute_script(self, script, selectors, options):
+        for index, selector in enumerate(selectors):
+            if selector in self.present:
+                return [f"element for {selector}", index]
+        return None
+
+def test_learns_order_and_decays():
+    """Test the matching selector moves first and a DOM change is learned after decay"""
+    clock = FakeClock()
+    stats = SelectorStats(None, clock=clock, explore=0)
+    page = StubPage({SELECTORS[2]})
+    with mock.patch.object(selector_stats, "_stats", stats):
+        _, selector = locate(page, SELECTORS, step="pickup_input")
+        assert selector == "input"
+        assert stats.report()["pickup_input"]["depth"] == 2
+        assert stats.order("pickup_input", SELECTORS)[0] == "input"
+        for _ in range(4):
+            locate(page, SELECTORS, step="pickup_input")
+        report = stats.report()["pickup_input"]
+        assert report["first_probe_rate"] > 0.75 and report["depth"] < 0.5, report
+        print(f"✅ Learned 'input' first; depth {report['depth']:.2f} after 5 lookups")
+
+        # Uber changes its DOM: the learned selector is gone
+        page.present = {SELECTORS[1]}
+        clock.now += 10 * HALF_LIFE
+        _, selector = locate(page, SELECTORS, step="pickup_input")
+        assert selector == SELECTORS[1]
+        assert stats.order("pickup_input", SELECTORS)[0] == SELECTORS[1]
+        print("✅ Old hits decayed and the new selector took over after one lookup")
+
+def test_catch_all_stays_last():
+    """Test a catch-all that matched during an outage never moves ahead of the specific selectors"""
+    stats = SelectorStats(None, explore=0)
+    selectors = SELECTORS[:2] + [LastResort("input")]
+    page = StubPage({"input"})
+    with mock.patch.object(selector_stats, "_stats", stats):
+        for _ in range(2):
+            assert locate(page, selectors, step="pickup_input")[1] == "input"
+        # The specific field is back, next to other inputs
+        page.present = {SELECTORS[0], "input"}
+        picked = {locate(page, selectors, step="pickup_input")[1] for _ in range(50)}
+    assert picked == {SELECTORS[0]}, picked
+    assert stats.order("pickup_input", selectors)[-1] == "input"
+    print("✅ Catch-all kept last; the specific selector matched in all 50 runs")
+
+def test_exploring_recovers_pushed_back_selector():
+    """Test a selector pushed back by an outage is probed again and wins its place back"""
+    clock = FakeClock()
+    exploring = []
+    stats = SelectorStats(None, clock=clock, explore=0.1, random=lambda: 0.0 if exploring else 1.0)
+    page = StubPage({SELECTORS[1]})
+    with mock.patch.object(selector_stats, "_stats", stats):
+        for _ in range(3):
+            locate(page, SELECTORS, step="pickup_button")
+        assert stats.order("pickup_button", SELECTORS)[0] == SELECTORS[1]
+        page.present = set(SELECTORS[:2])
+        # Without exploring, the learned order keeps probing the second selector first
+        assert locate(page, SELECTORS, step="pickup_button")[1] == SELECTORS[1]
+        # Exploring lookups use the written order and find the first one again
+        exploring.append(True)
+        found = [locate(page, SELECTORS, step="pickup_button")[1] for _ in range(3)]
+    assert found == [SELECTORS[0]] * 3
+    hits, misses = stats._entry("pickup_button", clock())["selectors"][SELECTORS[0]]
+    assert hits == 3, (hits, misses)
+    print(f"✅ Pushed-back selector probed again and matched {hits:.0f} times")
+
+def test_missing_step_keeps_written_order():
+    """Test selectors never seen keep their written order and lookups without a step are not recorded"""
+    stats = SelectorStats(None)
+    with mock.patch.object(selector_stats, "_stats", stats):
+        assert stats.order("unknown", SELECTORS) == SELECTORS
+        locate(StubPage(SELECTORS), SELECTORS)
+        assert stats.report() == {}
+    print("✅ Written order kept without statistics")
+
+def test_shared_file():
+    """Test two sessions' counts add up in the shared stats file"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "selector_stats.json")
+        page = StubPage({"input"})
+        first, second = SelectorStats(path), SelectorStats(path)
+        for stats, lookups in ((first, 3), (second, 2)):
+            with mock.patch.object(selector_stats, "_stats", stats):
+                for _ in range(lookups):
+                    locate(page, SELECTORS, step="pickup_input")
+        first.flush()
+        second.flush()
+        report = SelectorStats(path).report()["pickup_input"]
+        assert round(report["lookups"], 3) == 5, report
+        assert report["order"][0][0] == "input"
+        print(f"✅ {report['lookups']:.0f} lookups from two sessions in the shared file")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing adaptive selector ordering\n")
+    test_learns_order_and_decays()
+    test_catch_all_stays_last()
+    test_exploring_recovers_pushed_back_selector()
+    test_missing_step_keeps_written_order()
+    test_shared_file()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Test script for session snapshots
+
+This script checks that a snapshot round-trips through an encrypted file,
+that freshness is read from the header without decrypting, and that a
+restored driver is logged in through CDP and skips the login flow.
+"""
+
+import os
+import tempfile
+from unittest import mock
+import session_store
+from session_store import SessionStore
+from fakes import FakeClock
+from login import click_login_button
+
+class XorCipher:
+    """Stands in for Fernet; counts decryptions"""
+    def __init__(self):
+        self.decrypted = 0
+
+    def encrypt(self, data):
+        return bytes(byte ^ 0x5A for byte in data).hex().encode()
+
+    def decrypt(self, token):
+        self.decrypted += 1
+        return bytes(byte ^ 0x5A for byte in bytes.fromhex(token.decode()))
+
+class CDPDriver:
+    """Only what a freshly launched Chrome is asked before its first page load"""
+    session_id = "session-1"
+
+    def __init__(self, cookies=None):
+        self.cookies = cookies or []
+        self.cdp = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+        if command == "Network.getAllCookies":
+            return {"cookies": self.cookies}
+        return {}
+
+    def execute_script(self, script):
+        return {"persist:auth": "{\"loggedIn\":true}"}
+
+def make_store(directory, clock):
+    return SessionStore(os.path.join(directory, "user.session"), XorCipher(), max_age=3600, clock=clock)
+
+def test_snapshot_round_trip():
+    """Test a snapshot is encrypted at rest and freshness needs no decryption"""
+    clock = FakeClock(1_700_000_000.0)
+    cookies = [
+        {"name": "sid", "value": "secret-token", "domain": ".uber.com", "path": "/", "expires": clock.now + 7200},
+        {"name": "csid", "value": "short", "domain": ".uber.com", "path": "/", "expires": clock.now + 60},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, clock)
+        assert store.snapshot(CDPDriver(cookies))
+        with open(store.path, "rb") as f:
+            assert b"secret-token" not in f.read()
+
+        assert store.is_fresh() and not store.needs_refresh()
+        assert store.cipher.decrypted == 0
+        clock.now += 1900
+        assert store.needs_refresh(), "past half its lifetime"
+
+        driver = CDPDriver()
+        assert store.restore(driver)
+        commands = dict(driver.cdp)
+        # The cookie that expired in the meantime is not injected
+        assert [c["name"] for c in commands["Network.setCookies"]["cookies"]] == ["sid"]
+        assert "persist:auth" in commands["Page.addScriptToEvaluateOnNewDocument"]["source"]
+
+        clock.now += 2000
+        assert not store.is_fresh() and not store.restore(CDPDriver())
+    print("✅ Snapshot encrypted, checked for freshness and restored")
+
+def test_restored_driver_skips_login():
+    """Test login is skipped entirely for a driver restored from a snapshot"""
+    clock = FakeClock(1_700_000_000.0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, clock)
+        cookies = [{"name": "sid", "value": "x", "domain": ".uber.com", "path": "/", "expires": clock.now + 7200}]
+        store.snapshot(CDPDriver(cookies))
+        driver = CDPDriver()
+        spoken = []
+        with mock.patch.object(session_store, "get_session_store", lambda user=None: store):
+            assert session_store.restore_session(driver)
+            # CDPDriver has no page to wait on; any login check would fail
+            click_login_button(driver, spoken.append)
+        assert spoken == ["You're already logged in. Skipping login."]
+        assert not session_store.take_restored(driver), "only the first booking skips the check"
+    print("✅ Login skipped on a restored session")
+
+def test_unreadable_snapshot_discarded():
+    """Test a snapshot encrypted with another key is dropped"""
+    clock = FakeClock(1_700_000_000.0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = make_store(directory, clock)
+        store.snapshot(CDPDriver([]))
+        with open(store.path, "ab") as f:
+            f.write(b"zz")
+        assert store.load() is None
+        assert not os.path.exists(store.path)
+    print("✅ Damaged snapshot discarded")
+
+if __name__ == "__main__":
+    print("\n🔍 Testing session snapshots...\n")
+    test_snapshot_round_trip()
+    test_restored_driver_skips_login()
+    test_unreadable_snapshot_discarded()
+    print("\n✅ All session snapshot tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Test script for the speech output service
+
+This script checks that speaking doesn't block the caller, that utterances
+play in order, that queued utterances can be cancelled, and that long
+texts such as the ride list are streamed.
+"""
+
+import time
+from unittest import mock
+from speech_output import SpeechOutput, split_for_streaming
+from fake_webdriver import FakeDriver, VirtualClock, load_recording
+from bench_uber_flow import RECORDING
+from selector_stats import SelectorStats
+import selector_stats
+import options
+
+def test_speech_output():
+    """Test non-blocking playback, ordering, cancellation and failures"""
+    played = []
+
+    def player(audio):
+        time.sleep(0.1)
+        played.append(audio)
+
+    def synthesize(text, lang):
+        if text == "broken":
+            raise RuntimeError("gTTS unavailable")
+        return text.upper()
+
+    output = SpeechOutput(synthesize=synthesize, player=player, enabled=True)
+
+    started = time.monotonic()
+    first = output.say("where should i pick you up from?")
+    output.say("where are you going?")
+    third = output.say("locations entered successfully.")
+    assert time.monotonic() - started < 0.05, "say() should return before playback"
+
+    assert first.result(timeout=5) is True
+    assert output.cancel() >= 1, "queued utterances should be dropped"
+    assert third.cancelled()
+    assert output.wait_idle(timeout=5)
+    print(f"✅ Played: {played}")
+    assert played[0] == "WHERE SHOULD I PICK YOU UP FROM?"
+    assert "LOCATIONS ENTERED SUCCESSFULLY." not in played
+
+    assert output.say("broken").result(timeout=5) is False, "failed synthesis resolves to False"
+    assert SpeechOutput(enabled=False).say("hello").result(timeout=1) is True
+
+def test_streaming_first_audio():
+    """Test long texts start playing after one chunk's synthesis, not the whole text's"""
+    text = ("Ride 1: Uber Go for 245 rupees, arriving in 4 minutes. "
+            "Ride 2: Premier for 312 rupees, arriving in 6 minutes. "
+            "Ride 3: Uber XL for 498 rupees, arriving in 9 minutes.")
+    chunks = split_for_streaming(text)
+    assert len(chunks) == 3 and chunks[0].startswith("Ride 1:")
+
+    def synthesize(text, lang):
+        time.sleep(len(text) * 0.002)  # synthesis time grows with length
+        return text
+
+    first_audio = {}
+
+    def timed_player(mode):
+        def player(audio):
+            first_audio.setdefault(mode, time.monotonic() - started)
+        return player
+
+    for mode, streaming in (("whole", False), ("stream", True)):
+        output = SpeechOutput(synthesize=synthesize, player=timed_player(mode), enabled=True,
+                              streaming=streaming, lookup=None)
+        started = time.monotonic()
+        assert output.say(text).result(timeout=5) is True
+
+    print(f"✅ Time to first audio: {first_audio}")
+    assert first_audio["stream"] < first_audio["whole"] * 0.6
+
+def test_ride_list_streamed():
+    """Test read_ride_options speaks the ride list as one streamed utterance"""
+    synthesized = []
+
+    def synthesize(text, lang):
+        synthesized.append(text)
+        return text
+
+    output = SpeechOutput(synthesize=synthesize, player=lambda audio: None, enabled=True, lookup=None)
+    said = []
+    say = output.say
+    output.say = lambda text: said.append(text) or say(text)
+    clock = VirtualClock()
+    driver = FakeDriver(dict(load_recording(RECORDING), start="product_list"), clock)
+    answers = iter(["uber go"])
+    with clock.installed(), \
+            mock.patch.object(selector_stats, "_stats", SelectorStats(None)), \
+            mock.patch.object(options, "get_speech_output", lambda: output), \
+            mock.patch.object(options, "listen_to_user", lambda: next(answers, "no")):
+        selected = options.read_ride_options(driver)
+    assert output.wait_idle(timeout=5)
+    assert selected is not None and selected.name == "Uber Go", selected
+    ride_list = [text for text in said if text.startswith("Ride ")]
+    assert len(ride_list) == 1 and ride_list[0].count("Ride ") == 4, said
+    rides = [text for text in synthesized if text.startswith("Ride ")]
+    print(f"✅ Ride list said once and synthesized as {len(rides)} streamed chunks: {rides}")
+    assert len(rides) >= 2 and all(text.count("Ride ") == 1 for text in rides), synthesized
+
+if __name__ == "__main__":
+    print("\n🔍 Testing speech output service\n")
+    test_speech_output()
+    test_streaming_first_audio()
+    test_ride_list_streamed()
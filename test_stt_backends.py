@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Test script for the streaming speech recognition path
+
+This script checks phrase endpointing on a fake microphone and the worker
+process protocol of the streaming backend, using an echo decoder instead
+of a Vosk model so no model download or network is needed.
+"""
+
+import time
+from audio_session import AudioSession
+from stt_backends import VoskBackend
+from fakes import FakeSource
+
+def _echo_worker(model_path, requests, results):
+    """Stands in for the Vosk worker: each audio chunk carries one word"""
+    results.put(("ready", None, None))
+    words, utterance = [], None
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+        kind, utterance_id, payload = message
+        if kind == "start":
+            words, utterance = [], utterance_id  # payload: (sample_rate, grammar)
+        elif kind == "audio" and utterance_id == utterance:
+            words.append(payload.decode())
+            results.put(("partial", utterance_id, " ".join(words)))
+        elif kind == "end" and utterance_id == utterance:
+            results.put(("final", utterance_id, " ".join(words)))
+
+class FakeSession:
+    sample_rate = 16000
+
+    def stream(self, timeout=None, phrase_time_limit=None):
+        for word in ("book", "a", "cab"):
+            time.sleep(0.02)  # the user is still talking
+            yield word.encode()
+
+def test_phrase_endpointing():
+    """Test the stream starts at speech onset and stops after the pause threshold"""
+    session = AudioSession(recalibrate_interval=0)
+    session.recognizer.energy_threshold = 300
+    session._source = FakeSource([0] * 5 + [2000] * 10 + [0] * 20)
+    chunks = list(session.stream(timeout=2, phrase_time_limit=10))
+    print(f"✅ Captured {len(chunks)} chunks of 0.1s")
+    # 10 loud chunks, the pre-roll before them and ~0.8s of trailing silence
+    assert 10 < len(chunks) < 25
+
+def test_streaming_worker():
+    """Test partial hypotheses arrive during capture and the final follows quickly"""
+    backend = VoskBackend(model_path="unused", worker=_echo_worker)
+    try:
+        backend.start()
+        partials = []
+        text = backend.transcribe(FakeSession(), on_partial=partials.append)
+        started = time.monotonic()
+        text_again = backend.transcribe(FakeSession())
+        final_latency = time.monotonic() - started - 0.06
+    finally:
+        backend.close()
+    print(f"✅ Final: {text!r}, partials: {partials}")
+    assert text == text_again == "book a cab"
+    assert partials and partials[-1].startswith("book")
+    assert final_latency < 1.0, "final result should follow end of speech within a second"
+
+if __name__ == "__main__":
+    print("\n🔍 Testing streaming speech recognition\n")
+    test_phrase_endpointing()
+    test_streaming_worker()
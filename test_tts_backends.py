@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Test script for the TTS backends
+
+This script checks the latency-budget fallback to a local engine and the
+audio duration helpers used by the TTS benchmark, with fake backends.
+"""
+
+import io
+import time
+import wave
+from tts_backends import TTSBackend, TTSEngine, audio_duration
+
+class SlowCloud(TTSBackend):
+    name = "cloud"
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def synthesize(self, text, lang='en'):
+        time.sleep(self.delay)
+        return b"cloud:" + text.encode()
+
+class Local(TTSBackend):
+    name = "local"
+    ext = "wav"
+    local = True
+
+    def synthesize(self, text, lang='en'):
+        return b"local:" + text.encode()
+
+def test_budget_fallback():
+    """Test slow cloud synthesis falls back locally and is cached once it arrives"""
+    late = []
+    engine = TTSEngine(SlowCloud(0.3), Local(), budget=0.05, degraded_seconds=60)
+
+    started = time.monotonic()
+    backend, data = engine.synthesize("Where are you going?", on_late=lambda b, d: late.append(d))
+    assert backend.name == "local" and data == b"local:Where are you going?"
+    assert time.monotonic() - started < 0.2, "the caller should not wait for the slow backend"
+
+    # While degraded the cloud backend is skipped outright
+    backend, _ = engine.synthesize("Which ride would you like to choose?")
+    assert backend.name == "local" and engine.degraded()
+
+    time.sleep(0.4)
+    print(f"✅ Engine stats: {engine.stats}, late results: {late}")
+    assert late == [b"cloud:Where are you going?"]
+    assert engine.stats["over_budget"] == 1 and engine.stats["fallback"] == 2
+
+    fast = TTSEngine(SlowCloud(0), Local(), budget=1)
+    assert fast.synthesize("Hello")[0].name == "cloud"
+
+def test_audio_duration():
+    """Test wav and mp3 lengths are measured from the audio itself"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\0\0" * 8000)
+    assert abs(audio_duration(buffer.getvalue(), "wav") - 0.5) < 1e-6
+
+    # Ten MPEG-2 layer III frames at 32 kbps / 24 kHz, like gTTS output
+    frame = bytes([0xFF, 0xF3, 0x44, 0xC4]) + b"\0" * 92
+    assert abs(audio_duration(frame * 10, "mp3") - 0.24) < 1e-6
+
+if __name__ == "__main__":
+    print("\n🔍 Testing TTS backends\n")
+    test_budget_fallback()
+    test_audio_duration()
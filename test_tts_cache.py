@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Test script for the TTS audio cache
+
+This script checks cache hits, key separation and LRU eviction using a
+fake synthesizer, so no network access is needed.
+"""
+
+import os
+import tempfile
+from tts_cache import AudioCache
+
+def test_tts_cache():
+    """Test that repeated phrases skip synthesis and old entries are evicted"""
+    calls = []
+
+    def fake_synthesize(text, lang):
+        calls.append((text, lang))
+        return b"x" * 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(directory, max_bytes=250)
+
+        first = cache.get_or_create("Where are you going?", synthesize=fake_synthesize)
+        again = cache.get_or_create("Where are you going?", synthesize=fake_synthesize)
+        assert first == again and len(calls) == 1, "second request should be a cache hit"
+
+        cache.get_or_create("Where are you going?", lang="hi", synthesize=fake_synthesize)
+        assert len(calls) == 2, "language is part of the cache key"
+
+        # Touch the English phrase so the Hindi one becomes least recently used
+        cache.get_or_create("Where are you going?", synthesize=fake_synthesize)
+        cache.get_or_create("Which ride would you like to choose?", synthesize=fake_synthesize)
+        stats = cache.stats()
+        print(f"✅ Cache stats: {stats}")
+        assert stats["entries"] == 2 and stats["bytes"] <= 250
+        assert os.path.exists(first), "recently played phrase must survive eviction"
+
+        # A fresh instance rebuilds the index from disk
+        reloaded = AudioCache(directory, max_bytes=250)
+        assert reloaded.stats()["entries"] == 2
+
+if __name__ == "__main__":
+    print("\n🔍 Testing TTS audio cache\n")
+    test_tts_cache()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Test script for the wait engine
+
+This script checks that waits return as soon as their condition holds and
+that the wait report accounts for the fixed sleeps they replaced.
+"""
+
+from selenium.common.exceptions import WebDriverException
+from waits import wait_for_element, wait_until, wait_report, reset_wait_stats
+
+class FakeElement:
+    def is_displayed(self):
+        return True
+
+class FakeDriver:
+    """Driver without async script support, so waits fall back to polling"""
+
+    def __init__(self, ready_after):
+        self.polls = 0
+        self.ready_after = ready_after
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        raise WebDriverException("async scripts disabled")
+
+    def find_elements(self, by, selector):
+        self.polls += 1
+        return [FakeElement()] if self.polls >= self.ready_after else []
+
+def test_waits():
+    """Test early return, timeouts and the latency report"""
+    reset_wait_stats()
+
+    driver = FakeDriver(ready_after=2)
+    element = wait_for_element(driver, ['[role="option"]'], timeout=2, label="suggestions", replaced=3)
+    assert element is not None, "element should be found once it renders"
+
+    result = wait_until(FakeDriver(ready_after=99), lambda d: False, timeout=0.2, label="never", replaced=1)
+    assert result is None, "timed out waits return None instead of raising"
+
+    report = wait_report()
+    print(f"✅ Wait report: {report}")
+    assert report["suggestions"]["timeouts"] == 0
+    assert report["suggestions"]["saved_seconds"] > 2
+    assert report["never"]["timeouts"] == 1
+
+if __name__ == "__main__":
+    print("\n🔍 Testing wait engine\n")
+    test_waits()
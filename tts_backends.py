@@ -0,0 +1,260 @@
+# tts_backends.py
+
+import io
+import os
+import time
+import wave
+import shutil
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+TTS_BACKEND = os.environ.get('NOVA_TTS_BACKEND', 'gtts')
+# "auto" picks the first local engine that is installed; "none" disables fallback
+TTS_FALLBACK = os.environ.get('NOVA_TTS_FALLBACK', 'auto')
+TTS_BUDGET = float(os.environ.get('NOVA_TTS_BUDGET', 1.5))
+# After going over budget, the primary backend is skipped for this long
+DEGRADED_SECONDS = 60
+
+
+class TTSBackend:
+    """Turns text into audio bytes in the format named by `ext`."""
+
+    name = None
+    ext = "mp3"
+    local = False
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang='en'):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+    ext = "mp3"
+
+    def available(self):
+        try:
+            import gtts  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def synthesize(self, text, lang='en'):
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+    ext = "wav"
+    local = True
+
+    def _binary(self):
+        return shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self._binary() is not None
+
+    def synthesize(self, text, lang='en'):
+        binary = self._binary()
+        if binary is None:
+            raise RuntimeError("espeak is not installed")
+        result = subprocess.run(
+            [binary, "-v", lang, "-s", "165", "--stdout", text],
+            capture_output=True,
+            timeout=30,
+            check=True,
+        )
+        return result.stdout
+
+
+class Pyttsx3Backend(TTSBackend):
+    name = "pyttsx3"
+    ext = "wav"
+    local = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def available(self):
+        try:
+            import pyttsx3  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def synthesize(self, text, lang='en'):
+        import pyttsx3
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            # The driver's event loop is not re-entrant
+            with self._lock:
+                engine = pyttsx3.init()
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+BACKENDS = {backend.name: backend for backend in (GTTSBackend, EspeakBackend, Pyttsx3Backend)}
+LOCAL_PREFERENCE = ("espeak", "pyttsx3")
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+
+def local_backend():
+    for name in LOCAL_PREFERENCE:
+        backend = get_backend(name)
+        if backend.available():
+            return backend
+    return None
+
+
+def audio_duration(data, ext):
+    """Playback length of wav or mp3 bytes in seconds, or None if unknown."""
+    if ext == "wav":
+        with wave.open(io.BytesIO(data)) as w:
+            return w.getnframes() / float(w.getframerate())
+    if ext == "mp3":
+        return _mp3_duration(data)
+    return None
+
+
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_duration(data):
+    # Walk the layer III frame headers; gTTS output has no Xing/VBR header
+    position, seconds = 0, 0.0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9]
+        position = 10 + size
+    while position + 4 <= len(data):
+        header = int.from_bytes(data[position:position + 4], "big")
+        if header >> 21 != 0x7FF:
+            position += 1
+            continue
+        version = (header >> 19) & 3
+        bitrate_index = (header >> 12) & 15
+        rate_index = (header >> 10) & 3
+        if version == 1 or bitrate_index in (0, 15) or rate_index == 3 or (header >> 17) & 3 != 1:
+            position += 1
+            continue
+        bitrate = _MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        padding = (header >> 9) & 1
+        position += samples // 8 * bitrate // sample_rate + padding
+        seconds += samples / float(sample_rate)
+    return seconds or None
+
+
+class TTSEngine:
+    """Routes synthesis to the configured backend, with a local fallback.
+
+    When the primary (cloud) backend fails or does not answer within
+    `budget` seconds, the utterance is synthesized by the fallback instead
+    and the primary is skipped for `degraded_seconds`. A primary result that
+    arrives late is still handed to `on_late` so it can be cached.
+    """
+
+    def __init__(self, primary, fallback=None, budget=TTS_BUDGET, degraded_seconds=DEGRADED_SECONDS):
+        self.primary = primary
+        self.fallback = fallback
+        self.budget = budget
+        self.degraded_seconds = degraded_seconds
+        self._degraded_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"primary": 0, "fallback": 0, "over_budget": 0, "errors": 0}
+
+    def backends(self):
+        """Backends whose cached audio may be played, best first."""
+        return [backend for backend in (self.primary, self.fallback) if backend is not None]
+
+    def degraded(self):
+        return time.monotonic() < self._degraded_until
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _degrade(self, reason):
+        self._count(reason)
+        with self._lock:
+            self._degraded_until = time.monotonic() + self.degraded_seconds
+
+    def synthesize(self, text, lang='en', on_late=None):
+        """Returns (backend, audio bytes)."""
+        if self.fallback is None:
+            self._count("primary")
+            return self.primary, self.primary.synthesize(text, lang)
+        if self.degraded():
+            self._count("fallback")
+            return self.fallback, self.fallback.synthesize(text, lang)
+
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self.primary.synthesize(text, lang))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"tts-{self.primary.name}", daemon=True).start()
+        try:
+            data = future.result(timeout=self.budget)
+            self._count("primary")
+            return self.primary, data
+        except FutureTimeout:
+            self._degrade("over_budget")
+            if on_late is not None:
+                def deliver(done):
+                    if done.exception() is None:
+                        on_late(self.primary, done.result())
+                future.add_done_callback(deliver)
+        except Exception as e:
+            print(f"Note: {self.primary.name} synthesis failed, using {self.fallback.name}: {e}")
+            self._degrade("errors")
+        self._count("fallback")
+        return self.fallback, self.fallback.synthesize(text, lang)
+
+
+def build_engine(backend=TTS_BACKEND, fallback=TTS_FALLBACK, budget=TTS_BUDGET):
+    primary = get_backend(backend)
+    if fallback == "none" or primary.local:
+        fallback_backend = None
+    elif fallback == "auto":
+        fallback_backend = local_backend()
+    else:
+        fallback_backend = get_backend(fallback)
+    return TTSEngine(primary, fallback_backend, budget)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = build_engine()
+        return _engine
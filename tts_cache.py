@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Text-to-Speech Audio Cache
+
+Synthesized speech is stored on disk under a hash of (text, lang, engine),
+so repeated prompts play straight from the cache without calling the TTS
+backend.
+The cache is capped in size and evicts the least recently played files.
+Run this script to pre-render the fixed phrase bank ahead of time.
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from tts_backends import get_backend, get_engine
+
+CACHE_DIR = os.environ.get(
+    'NOVA_TTS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'nova', 'tts')
+)
+MAX_BYTES = int(float(os.environ.get('NOVA_TTS_CACHE_MAX_MB', 50)) * 1024 * 1024)
+DEFAULT_ENGINE = 'gtts'
+AUDIO_EXTENSIONS = ('mp3', 'wav')
+
+# Fixed prompts spoken on every booking
+PHRASE_BANK = [
+    "Nova is standing by. Say 'wake up Nova' to begin.",
+    "Good morning",
+    "Good afternoon",
+    "Good evening",
+    "Hello, I'm NovaCab. Your voice is my command.",
+    "I'm Nova, designed by Sahil to assist you with cabs and conversation.",
+    "Nova here! Ready to make your travels smooth and easy.",
+    "Entering sleep mode. Say 'wake up Nova' when you're ready.",
+    "Nova is awake and ready.",
+    "I didn't catch that.",
+    "Sorry, I didn't understand.",
+    "Goodbye. Nova signing off.",
+    "Opening Uber mobile website. Please wait...",
+    "Failed to open Uber mobile website.",
+    "You're already logged in. Skipping login.",
+    "It looks like you're not logged in yet. Attempting to log in.",
+    "Please complete the login process manually.",
+    "Login detected. You're now logged in.",
+    "Where should I pick you up from?",
+    "Where are you going?",
+    "I didn't catch that. Please say it again.",
+    "Locations entered successfully.",
+    "Which ride would you like to choose?",
+    "Sorry, I couldn't find the ride you asked for. Please say it again.",
+    "Do you want to confirm and request this ride?",
+    "Ride request sent.",
+    "Do you want to confirm the booking?",
+    "Your ride is confirmed.",
+    "Okay, ride request cancelled.",
+    "Sorry, I didn't catch that. Please say it again.",
+    "Should I request the ride?",
+    "Should I confirm and request the ride?",
+    "Sorry, I didn't catch that. Please say yes or no.",
+    "Your ride has been requested.",
+]
+
+
+def cache_key(text, lang='en', engine=DEFAULT_ENGINE):
+    payload = f"{engine}\0{lang}\0{text.strip()}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def synthesize_gtts(text, lang='en'):
+    return get_backend('gtts').synthesize(text, lang)
+
+
+class AudioCache:
+    """Content-addressed audio store with a byte cap and LRU eviction.
+
+    Entries are keyed by file name, i.e. the cache key plus the backend's
+    audio extension.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        # Rebuild recency order from modification times, which hits refresh
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.rpartition('.')[2] in AUDIO_EXTENSIONS:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+
+    def path_for(self, key, ext='mp3'):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def get(self, key, ext='mp3'):
+        name = f"{key}.{ext}"
+        path = self.path_for(key, ext)
+        with self._lock:
+            if name not in self._index:
+                return None
+            if not os.path.exists(path):
+                # Evicted by another process sharing the directory
+                self._total -= self._index.pop(name)
+                return None
+            self._index.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key, data, ext='mp3'):
+        name = f"{key}.{ext}"
+        path = self.path_for(key, ext)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total -= self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self._total += len(data)
+            self._evict(keep=name)
+        return path
+
+    def _evict(self, keep):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            name, size = next(iter(self._index.items()))
+            if name == keep:
+                break
+            del self._index[name]
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def get_or_create(self, text, lang='en', engine=DEFAULT_ENGINE, synthesize=synthesize_gtts, ext='mp3'):
+        key = cache_key(text, lang, engine)
+        path = self.get(key, ext)
+        self.count_lookup(path is not None)
+        if path:
+            return path
+        return self.put(key, synthesize(text, lang), ext)
+
+    def count_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, text, lang, backends):
+        """Path of the first backend's cached rendering of `text`, or None."""
+        for backend in backends:
+            path = self.get(cache_key(text, lang, backend.name), backend.ext)
+            if path:
+                return path
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
+
+
+def cached_speech_file(text, lang='en'):
+    """Path to an already rendered audio file of `text`, or None."""
+    return get_cache().lookup(text, lang, get_engine().backends())
+
+
+def speech_file(text, lang='en'):
+    """Path to an audio file of `text`, synthesizing it only on a cache miss.
+
+    The configured backend's rendering is preferred; the local fallback's
+    is used when the backend is over its latency budget.
+    """
+    cache = get_cache()
+    engine = get_engine()
+    path = cache.lookup(text, lang, engine.backends())
+    cache.count_lookup(path is not None)
+    if path:
+        return path
+
+    def store(backend, data):
+        return cache.put(cache_key(text, lang, backend.name), data, backend.ext)
+
+    # A late answer from the cloud backend still lands in the cache
+    return store(*engine.synthesize(text, lang, on_late=store))
+
+
+def prerender(phrases=PHRASE_BANK, lang='en'):
+    cache = get_cache()
+    # Pre-render with the configured backend only; there is no one waiting
+    backend = get_engine().primary
+    rendered = 0
+    for phrase in phrases:
+        if cache.get(cache_key(phrase, lang, backend.name), backend.ext):
+            continue
+        try:
+            cache.get_or_create(phrase, lang, backend.name, backend.synthesize, backend.ext)
+            rendered += 1
+        except Exception as e:
+            print(f"Note: Could not pre-render '{phrase}': {e}")
+    return rendered
+
+
+def start_prerender():
+    thread = threading.Thread(target=prerender, name="tts-prerender", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    print("\n🔊 Pre-rendering Nova phrase bank\n")
+    count = prerender()
+    print(f"✅ Rendered {count} new phrases into {CACHE_DIR}")
+    print(f"   Cache: {get_cache().stats()}")
@@ -0,0 +1,175 @@
+# waits.py
+
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from locator import FIND_FN_JS, locator_options
+from selector_stats import get_selector_stats
+import metrics
+
+POLL_FREQUENCY = 0.1
+# How long to watch for a popup that only sometimes follows a click. Most
+# bookings get none and pay the whole window; the recorded fare popup
+# renders 0.6s after its click.
+POPUP_WINDOW = 1.0
+
+# Resolves with the first element matching any of the selectors. Checks the
+# DOM once, then re-checks on every mutation instead of polling on a timer.
+OBSERVE_JS = FIND_FN_JS + """
+var selectors = arguments[0], timeoutMs = arguments[1], opts = arguments[2];
+var done = arguments[arguments.length - 1];
+function find() {
+    var match = novaFind(selectors, opts);
+    return match ? match[0] : null;
+}
+var found = find();
+if (found) return done(found);
+var timer = null;
+var observer = new MutationObserver(function () {
+    var el = find();
+    if (el) { observer.disconnect(); clearTimeout(timer); done(el); }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+timer = setTimeout(function () { observer.disconnect(); done(find()); }, timeoutMs);
+"""
+
+# Resolves once the DOM has seen no mutations for quietMs.
+DOM_QUIET_JS = """
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var quietTimer = null, hardTimer = null;
+var observer = new MutationObserver(function () {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quietMs);
+});
+function finish() { observer.disconnect(); clearTimeout(quietTimer); clearTimeout(hardTimer); done(true); }
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+quietTimer = setTimeout(finish, quietMs);
+hardTimer = setTimeout(finish, timeoutMs);
+"""
+
+# === Wait Statistics ===
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def record_wait(label, elapsed, replaced=0.0, timed_out=False):
+    metrics.observe("nova_wait_seconds", elapsed, label=label)
+    with _stats_lock:
+        entry = _stats.setdefault(label, {
+            "count": 0,
+            "timeouts": 0,
+            "waited_seconds": 0.0,
+            "max_seconds": 0.0,
+            "replaced_seconds": 0.0,
+        })
+        entry["count"] += 1
+        entry["timeouts"] += 1 if timed_out else 0
+        entry["waited_seconds"] += elapsed
+        entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+        entry["replaced_seconds"] += replaced
+
+
+def wait_report():
+    """Per-label wait totals, including the fixed sleep time each wait replaced."""
+    with _stats_lock:
+        report = {label: dict(entry) for label, entry in _stats.items()}
+    for entry in report.values():
+        entry["saved_seconds"] = entry["replaced_seconds"] - entry["waited_seconds"]
+    return report
+
+
+def reset_wait_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def print_wait_report():
+    report = wait_report()
+    if not report:
+        return
+    waited = sum(entry["waited_seconds"] for entry in report.values())
+    replaced = sum(entry["replaced_seconds"] for entry in report.values())
+    print(f"⏱️ Waited {waited:.1f}s in total, replacing {replaced:.1f}s of fixed sleeps")
+    for label, entry in sorted(report.items()):
+        print(
+            f"   {label}: {entry['count']}x, {entry['waited_seconds']:.2f}s waited, "
+            f"{entry['saved_seconds']:.2f}s saved, {entry['timeouts']} timeouts"
+        )
+
+
+# === Wait Primitives ===
+def wait_until(driver, condition, timeout=10, label="wait", replaced=0.0, poll=POLL_FREQUENCY):
+    """Wait for `condition(driver)` to be truthy; returns its value, or None on timeout."""
+    started = time.monotonic()
+    timed_out = False
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        timed_out = True
+        return None
+    finally:
+        record_wait(label, time.monotonic() - started, replaced, timed_out)
+
+
+def _find_first(driver, selectors, visible):
+    for selector in selectors:
+        by = By.XPATH if selector.startswith(("/", "(")) else By.CSS_SELECTOR
+        try:
+            for element in driver.find_elements(by, selector):
+                if not visible or element.is_displayed():
+                    return element
+        except WebDriverException:
+            continue
+    return None
+
+
+def wait_for_element(driver, selectors, timeout=10, label="element", replaced=0.0, visible=True, step=None):
+    """Wait for the first element matching any CSS/XPath selector, or None on timeout.
+
+    The check runs inside the page on a MutationObserver, so it returns as
+    soon as the element is rendered rather than on the next poll. With a
+    `step` name the selectors are checked in the order learned for it.
+    """
+    selectors = get_selector_stats().order(step, selectors) if step else list(selectors)
+    started = time.monotonic()
+    try:
+        driver.set_script_timeout(timeout + 5)
+        element = driver.execute_async_script(
+            OBSERVE_JS, selectors, int(timeout * 1000), locator_options(visible=visible)
+        )
+    except WebDriverException:
+        # Pages that block async scripts fall back to WebDriverWait polling
+        remaining = max(0.0, timeout - (time.monotonic() - started))
+        try:
+            element = WebDriverWait(driver, remaining, poll_frequency=POLL_FREQUENCY).until(
+                lambda d: _find_first(d, selectors, visible)
+            )
+        except TimeoutException:
+            element = None
+    record_wait(label, time.monotonic() - started, replaced, element is None)
+    return element
+
+
+def wait_for_dom_quiet(driver, quiet=0.3, timeout=5, label="dom_quiet", replaced=0.0):
+    """Wait until the page stops mutating for `quiet` seconds."""
+    started = time.monotonic()
+    try:
+        driver.set_script_timeout(timeout + 5)
+        driver.execute_async_script(DOM_QUIET_JS, int(quiet * 1000), int(timeout * 1000))
+    except WebDriverException:
+        time.sleep(min(quiet, timeout))
+    elapsed = time.monotonic() - started
+    record_wait(label, elapsed, replaced, elapsed >= timeout)
+
+
+def wait_for_page_ready(driver, timeout=15, label="page_ready", replaced=0.0, states=("complete",)):
+    return wait_until(
+        driver,
+        lambda d: d.execute_script("return document.readyState") in states,
+        timeout=timeout,
+        label=label,
+        replaced=replaced,
+    )
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Wake Word Spotter
+
+Waits for "wake up nova" without sending background noise to the cloud.
+The microphone stream is gated on energy, so silence costs one RMS per
+chunk. Only voiced segments reach a keyword detector: a Vosk recognizer
+limited to the wake phrase when a local model is installed, otherwise one
+Google request per voiced segment. Full recognition starts only after the
+spotter fires.
+
+Usage (measures steady-state CPU use; stay quiet, or say the phrase to stop):
+    python wake_word.py [seconds]
+"""
+
+import sys
+import time
+import audioop
+import threading
+import speech_recognition as sr
+from audio_session import get_audio_session
+from stt_backends import VoskBackend
+from metrics import observe
+
+WAKE_PHRASE = "wake up nova"
+# Wake phrases are short; cut longer segments off early
+SEGMENT_LIMIT = 3
+# How long one stream() call waits for speech before the loop checks its deadline
+LISTEN_SLICE = 2
+
+
+def is_wake_phrase(text):
+    text = (text or "").lower()
+    return WAKE_PHRASE in text or ("wake" in text and "nova" in text)
+
+
+class VoskKeywordDetector:
+    """Decodes voiced segments against a grammar of just the wake phrase."""
+
+    name = "vosk"
+
+    def __init__(self, backend=None, phrase=WAKE_PHRASE):
+        self.backend = backend or VoskBackend()
+        self.grammar = [phrase, "[unk]"]
+        self._utterance = None
+        self._hit = False
+
+    def start_segment(self, sample_rate, sample_width):
+        self._hit = False
+        self._utterance = self.backend.open_utterance(sample_rate, self.grammar)
+
+    def _check(self, text):
+        if is_wake_phrase(text):
+            self._hit = True
+
+    def feed(self, chunk):
+        # Partials arrive while the user is still talking, so the spotter can
+        # fire without waiting for the end-of-phrase pause
+        self.backend.feed(self._utterance, chunk, on_partial=self._check)
+        return self._hit
+
+    def end_segment(self):
+        if not self._hit:
+            self._check(self.backend.finish(self._utterance, on_partial=self._check))
+        return self._hit
+
+
+class GoogleKeywordDetector:
+    """Fallback without a local model: one cloud request per voiced segment."""
+
+    name = "google"
+
+    def __init__(self, session=None):
+        self.session = session or get_audio_session()
+        self._chunks = []
+
+    def start_segment(self, sample_rate, sample_width):
+        self._chunks = []
+        self._format = (sample_rate, sample_width)
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        return False
+
+    def end_segment(self):
+        audio = sr.AudioData(b"".join(self._chunks), *self._format)
+        try:
+            return is_wake_phrase(self.session.recognize(audio))
+        except (sr.UnknownValueError, sr.RequestError):
+            return False
+
+
+class WakeWordSpotter:
+    def __init__(self, session=None, detector=None):
+        self.session = session or get_audio_session()
+        self.detector = detector
+        self.stats = {"segments": 0, "detections": 0, "listening_seconds": 0.0, "cpu_seconds": 0.0}
+
+    def _detector(self):
+        if self.detector is None:
+            backend = VoskBackend()
+            self.detector = VoskKeywordDetector(backend) if backend.available() else GoogleKeywordDetector(self.session)
+        return self.detector
+
+    def cpu_percent(self):
+        listening = self.stats["listening_seconds"]
+        return 100.0 * self.stats["cpu_seconds"] / listening if listening else 0.0
+
+    def wait(self, timeout=None):
+        """Block until the wake phrase is heard; False if `timeout` passes first."""
+        detector = self._detector()
+        started, cpu_started = time.monotonic(), time.process_time()
+        deadline = started + timeout if timeout else None
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    if self._listen_once(detector):
+                        return True
+                except sr.WaitTimeoutError:
+                    continue
+            return False
+        finally:
+            self.stats["listening_seconds"] += time.monotonic() - started
+            self.stats["cpu_seconds"] += time.process_time() - cpu_started
+
+    def _listen_once(self, detector):
+        session = self.session
+        fired, last_voiced = False, None
+        stream = session.stream(timeout=LISTEN_SLICE, phrase_time_limit=SEGMENT_LIMIT)
+        try:
+            for chunk in stream:
+                if last_voiced is None:
+                    detector.start_segment(session.sample_rate, session.sample_width)
+                    self.stats["segments"] += 1
+                if last_voiced is None or audioop.rms(chunk, session.sample_width) > session.recognizer.energy_threshold:
+                    last_voiced = time.monotonic()
+                if detector.feed(chunk):
+                    fired = True
+                    break
+        finally:
+            # Hand the microphone back right away for the command that follows
+            stream.close()
+        if last_voiced is None:
+            return False
+        fired = detector.end_segment() or fired
+        if fired:
+            self.stats["detections"] += 1
+            # From the last voiced audio to being ready for the command
+            observe("nova_wake_latency_seconds", time.monotonic() - last_voiced, detector=detector.name)
+        return fired
+
+
+_spotter = None
+_spotter_lock = threading.Lock()
+
+
+def get_wake_spotter():
+    global _spotter
+    with _spotter_lock:
+        if _spotter is None:
+            _spotter = WakeWordSpotter()
+        return _spotter
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    print(f"\n💤 Listening for '{WAKE_PHRASE}' for up to {seconds:.0f}s, stay quiet to measure idle CPU\n")
+    spotter = get_wake_spotter()
+    woke = spotter.wait(timeout=seconds)
+    print(f"{'✅ Wake phrase heard' if woke else '⏱️ No wake phrase'} using the {spotter.detector.name} detector")
+    print(f"   {spotter.stats['segments']} voiced segments checked, {spotter.cpu_percent():.1f}% CPU while listening")